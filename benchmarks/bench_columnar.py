@@ -0,0 +1,71 @@
+"""
+CSV vs columnar load times for a large statement panel. "cold" is the first load
+in a fresh interpreter, "warm" the best of repeated loads in one process.
+Statements carry extra non-required columns so column projection matters.
+
+Usage: python benchmarks/bench_columnar.py [n_companies] [n_periods]
+"""
+import subprocess
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from benchmarks.synthetic import make_panel, write_panel_csv
+from src.io.columnar import FORMATS, convert_csv_to_columnar
+from src.io.loaders import load_data
+
+N_EXTRA_COLUMNS = 12
+
+COLD_SNIPPET = """
+import sys, time
+sys.path.append({root!r})
+from pathlib import Path
+from src.io.loaders import load_data
+start = time.perf_counter()
+load_data(Path({data_dir!r}), fmt={fmt!r})
+print(time.perf_counter() - start)
+"""
+
+def cold_load(data_dir: Path, fmt: str) -> float:
+    code = COLD_SNIPPET.format(root=str(ROOT_DIR), data_dir=str(data_dir), fmt=fmt)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def main() -> None:
+    n_companies = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    n_periods = int(sys.argv[2]) if len(sys.argv) > 2 else 80
+    panel = make_panel(n_companies, n_periods)
+    rng = np.random.default_rng(1)
+    for df in panel.values():
+        for k in range(N_EXTRA_COLUMNS):
+            df[f"extra_{k}"] = rng.normal(size=len(df))
+            
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_dir = write_panel_csv(panel, Path(tmp) / "data")
+        print(f"{n_companies:,} companies x {n_periods} periods = {n_companies * n_periods:,} rows per statement")
+        print(f"{'format':<10} {'convert s':>10} {'cold s':>8} {'warm s':>8} {'vs csv (warm)':>14}")
+        
+        csv_warm = min(timeit.repeat(lambda: load_data(csv_dir), number=1, repeat=3))
+        print(f"{'csv':<10} {'-':>10} {cold_load(csv_dir, 'csv'):>8.3f} {csv_warm:>8.3f} {1.0:>13.1f}x")
+        
+        for fmt in FORMATS:
+            fmt_dir = Path(tmp) / fmt
+            fmt_dir.mkdir()
+            for path in csv_dir.glob("*.csv"):
+                (fmt_dir / path.name).symlink_to(path)
+            try:
+                convert = timeit.timeit(lambda: convert_csv_to_columnar(fmt_dir, fmt), number=1)
+            except ImportError as e:
+                print(f"{fmt:<10} skipped ({e})")
+                continue
+            warm = min(timeit.repeat(lambda: load_data(fmt_dir, fmt="columnar"), number=1, repeat=5))
+            print(f"{fmt:<10} {convert:>10.3f} {cold_load(fmt_dir, 'columnar'):>8.3f} {warm:>8.4f} {csv_warm / warm:>13.1f}x")
+
+if __name__ == "__main__":
+    main()
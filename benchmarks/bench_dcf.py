@@ -0,0 +1,117 @@
+"""
+Allocations and time of the DCF core, before and after it moved to in-place
+NumPy: the previous calculate_dcf (deep copy, three column inserts, iloc row
+reads) and calculate_dcf_arrays (temporary per operation) are reproduced
+below. Allocation is the tracemalloc peak above the live baseline during one
+call (temporaries plus outputs) and the number of memory blocks each returned
+result keeps alive. Results are checked to be bit-identical.
+
+Usage: python benchmarks/bench_dcf.py [calls] [draws]
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from config import SETTINGS
+from src.finance.dcf import ValuationResult, calculate_dcf, calculate_dcf_arrays, dcf_buffers, terminal_share_warning
+from src.finance.discounting import discount_factors, discount_times
+
+def legacy_calculate_dcf(projections, scenario, net_debt, scenario_name):
+    wacc, g = scenario.wacc, scenario.terminal_g
+    projections = projections.copy()
+    projections["period"] = range(1, len(projections) + 1)
+    projections["discount_factor"] = discount_factors(wacc, discount_times(len(projections), projections["year"].iloc[0]))
+    projections["pv_fcf"] = projections["fcf"] * projections["discount_factor"]
+    pv_explicit = projections["pv_fcf"].sum()
+    terminal_value = projections.iloc[-1]["fcf"] * (1 + g) / (wacc - g)
+    pv_terminal = terminal_value * projections.iloc[-1]["discount_factor"]
+    enterprise_value = pv_explicit + pv_terminal
+    share = pv_terminal / enterprise_value if enterprise_value != 0 else 0
+    return ValuationResult(scenario_name, enterprise_value, enterprise_value - net_debt, terminal_value, pv_explicit, pv_terminal, projections, wacc, g, share, terminal_share_warning(share))
+
+def legacy_dcf_arrays(fcf, wacc, g, net_debt, times):
+    invalid = g >= wacc
+    if np.any(invalid):
+        raise ValueError("g must be less than wacc")
+    factors = discount_factors(wacc, times)
+    pv_explicit = (fcf * factors).sum(axis=-1)
+    terminal_value = fcf[..., -1] * (1 + g) / (wacc - g)
+    pv_terminal = terminal_value * factors[..., -1]
+    enterprise_value = pv_explicit + pv_terminal
+    equity_value = enterprise_value - net_debt
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share = np.where(enterprise_value != 0, pv_terminal / enterprise_value, 0.0)
+    return {"enterprise_value": enterprise_value, "equity_value": equity_value, "terminal_value": terminal_value,
+            "pv_explicit": pv_explicit, "pv_terminal": pv_terminal, "terminal_share_pct": share, "discount_factors": factors}
+
+def measure(fn, calls: int) -> tuple:
+    """(best seconds per call, peak KiB allocated during a call, blocks each result keeps)."""
+    fn()
+    seconds = float("inf")
+    for _ in range(3):  # best of three
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        seconds = min(seconds, (time.perf_counter() - start) / calls)
+
+    tracemalloc.start()
+    fn()  # warm tracemalloc's own structures
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    before = tracemalloc.take_snapshot()
+    kept = [fn() for _ in range(10)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    del kept
+    return seconds, (peak - base) / 1024, blocks / 10
+
+def report(label: str, result: tuple, baseline: tuple = None) -> None:
+    seconds, kib, blocks = result
+    speedup = f"  {baseline[0] / seconds:5.1f}x" if baseline else ""
+    print(f"{label:<30} {seconds * 1e6:10.1f} us  peak {kib:9.1f} KiB  {blocks:6.1f} blocks/result{speedup}")
+
+def main() -> None:
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    draws = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    scenario = SETTINGS.scenarios["base"]
+    rng = np.random.default_rng(0)
+
+    for years in (5, 100):
+        projections = pd.DataFrame({"year": 2024.0 + np.arange(years), "revenue": rng.uniform(900, 1100, years), "fcf": rng.uniform(50, 150, years)})
+        old, new = legacy_calculate_dcf(projections, scenario, 100.0, "base"), calculate_dcf(projections, scenario, 100.0, "base")
+        assert old.enterprise_value == new.enterprise_value and old.projections.equals(new.projections)
+        print(f"calculate_dcf, {years} years")
+        before = measure(lambda: legacy_calculate_dcf(projections, scenario, 100.0, "base"), calls)
+        report("  copy + iloc (before)", before)
+        report("  array core, shared columns", measure(lambda: calculate_dcf(projections, scenario, 100.0, "base"), calls), before)
+
+    # A Monte Carlo / solver style loop: same shape, new rates every call
+    years = SETTINGS.years_forecast
+    fcf = rng.uniform(50, 150, (draws, years))
+    wacc = rng.uniform(0.08, 0.12, draws)
+    g = rng.uniform(0.01, 0.03, draws)
+    times = discount_times(years)
+    buffers = dcf_buffers((draws,), years)
+    expected = legacy_dcf_arrays(fcf, wacc, g, 100.0, times)
+    for result in (calculate_dcf_arrays(fcf, wacc, g, 100.0, times), calculate_dcf_arrays(fcf, wacc, g, 100.0, times, out=buffers)):
+        assert all(np.array_equal(result[name], expected[name]) for name in expected)
+
+    print(f"calculate_dcf_arrays, {draws:,} draws x {years} years")
+    loop_calls = max(calls // 100, 5)
+    before = measure(lambda: legacy_dcf_arrays(fcf, wacc, g, 100.0, times), loop_calls)
+    report("  temporaries (before)", before)
+    report("  in place", measure(lambda: calculate_dcf_arrays(fcf, wacc, g, 100.0, times), loop_calls), before)
+    report("  in place, preallocated out", measure(lambda: calculate_dcf_arrays(fcf, wacc, g, 100.0, times, out=buffers), loop_calls), before)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Executor scaling benchmark: wall time of the parallel fan-outs for 1..N workers
+on each backend (Monte Carlo chunks, company batch, sensitivity grid rows).
+
+Usage: python benchmarks/bench_executor.py [max_workers]
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from config import SETTINGS
+from src.io.loaders import load_data, stack_panel
+from src.finance.batch import run_batch
+from src.finance.montecarlo import run_monte_carlo
+from src.finance.sensitivity import calculate_sensitivity_grid
+from src.runtime.executor import Executor
+
+def worker_counts(max_workers: int):
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    return counts + [max_workers]
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main() -> None:
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    history = pd.DataFrame([{"year": 2023, "revenue": 62000.0}])
+    data = load_data(ROOT_DIR / "data")
+    panel = stack_panel({f"C{i:05d}": data for i in range(2_000)})
+    projections = pd.DataFrame({"fcf": np.linspace(10_000, 13_000, SETTINGS.years_forecast)})
+    
+    original_grid = (SETTINGS.sensitivity.wacc_values, SETTINGS.sensitivity.terminal_g_values)
+    SETTINGS.sensitivity.wacc_values = list(np.linspace(0.06, 0.16, 400))
+    SETTINGS.sensitivity.terminal_g_values = list(np.linspace(0.0, 0.05, 400))
+    
+    workloads = {
+        "monte_carlo 1M": lambda ex: run_monte_carlo(history, SETTINGS.net_debt, n_draws=1_000_000, chunk_size=50_000, executor=ex),
+        "batch 2k companies": lambda ex: run_batch(panel, executor=ex),
+        "grid 400x400": lambda ex: calculate_sensitivity_grid(projections, ex),
+    }
+    
+    try:
+        print(f"{'workload':<20} {'backend':<8} {'workers':>7} {'seconds':>9} {'speedup':>8}")
+        for name, work in workloads.items():
+            serial = timed(lambda: work(None))
+            print(f"{name:<20} {'serial':<8} {1:>7} {serial:>9.3f} {1.0:>7.2f}x")
+            for backend in ["thread", "process"]:
+                for n in worker_counts(max_workers):
+                    with Executor(backend, n) as ex:
+                        work(ex)  # warm the pool
+                        elapsed = timed(lambda: work(ex))
+                    print(f"{name:<20} {backend:<8} {n:>7} {elapsed:>9.3f} {serial / elapsed:>7.2f}x")
+    finally:
+        SETTINGS.sensitivity.wacc_values, SETTINGS.sensitivity.terminal_g_values = original_grid
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Batch export: in-memory (run_batch, then one projections frame and one CSV)
+vs streaming (iter_batch chunks through StreamWriter) for growing company
+counts. Reports wall time, traced peak memory above the loaded panel and file
+size per projections format. The panel and its merged metrics are still held
+whole; the streamed outputs stay at one chunk.
+
+Usage: python benchmarks/bench_export.py [n_companies ...]
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from benchmarks.synthetic import make_panel
+from src.finance.batch import iter_batch, run_batch
+from src.io.columnar import _require_pyarrow
+from src.reporting.stream import StreamWriter, batch_projection_frame
+
+def in_memory(panel, out_dir: Path) -> Path:
+    batch = run_batch(panel)
+    batch.to_frame().to_csv(out_dir / "batch_results.csv", index=False)
+    path = out_dir / "batch_projections.csv"
+    batch_projection_frame(batch).to_csv(path, index=False)
+    return path
+
+def streaming(panel, out_dir: Path, fmt: str) -> Path:
+    with StreamWriter(out_dir, fmt) as writer:
+        for chunk in iter_batch(panel, chunk_size=1_000):
+            writer.write_batch(chunk)
+    return writer.projections_path
+
+def measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    path = func(*args)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2**20, path.stat().st_size / 2**20
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [2_000, 8_000]
+    formats = ["csv", "bin"]
+    try:
+        _require_pyarrow()
+        formats += ["arrow", "parquet"]
+    except ImportError:
+        pass
+
+    print(f"{'companies':>10} {'mode':<16} {'seconds':>9} {'peak MiB':>10} {'file MiB':>10}")
+    for n_companies in sizes:
+        panel = make_panel(n_companies, 20)
+        runs = [("in-memory csv", in_memory)] + [(f"stream {fmt}", lambda p, d, fmt=fmt: streaming(p, d, fmt)) for fmt in formats]
+        for label, func in runs:
+            with tempfile.TemporaryDirectory() as tmp:
+                seconds, peak, size = measure(func, panel, Path(tmp))
+            print(f"{n_companies:>10,} {label:<16} {seconds:>9.3f} {peak:>10.1f} {size:>10.1f}")
+
+if __name__ == "__main__":
+    main()
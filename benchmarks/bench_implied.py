@@ -0,0 +1,53 @@
+"""
+Implied WACC for many market-cap targets: the vectorized safeguarded-Newton
+solver vs scanning a WACC grid with calculate_dcf_arrays and interpolating
+(the grid approach the sensitivity tables allow).
+
+Usage: python benchmarks/bench_implied.py [n_targets] [grid_points]
+"""
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from config import SETTINGS
+from src.finance.dcf import calculate_dcf_arrays
+from src.finance.implied import solve_implied
+from src.finance.projections import project_arrays
+
+def grid_scan(targets: np.ndarray, revenue: np.ndarray, params: dict, net_debt: float, points: int) -> np.ndarray:
+    grid = np.linspace(params["terminal_g"] + 1e-3, 0.5, points)
+    fcf = project_arrays(revenue, params["revenue_growth"], params["ebit_margin"], params["capex_pct_rev"], params["depreciation_pct_capex"], params["nwc_pct_rev_change"]).fcf
+    equity = calculate_dcf_arrays(fcf[:, None, :], grid[None, :], params["terminal_g"], net_debt)["equity_value"]
+    # equity falls with wacc: interpolate on the reversed curve
+    return np.array([np.interp(t, row[::-1], grid[::-1]) for t, row in zip(targets, equity)])
+
+def main() -> None:
+    n_targets = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    points = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    rng = np.random.default_rng(0)
+    targets = rng.uniform(1e4, 1e6, n_targets)
+    revenue = rng.uniform(1e3, 1e5, n_targets)
+    params = asdict(SETTINGS.scenarios["base"])
+
+    start = time.perf_counter()
+    solution = solve_implied("wacc", targets, revenue, params, SETTINGS.net_debt)
+    solver_s = time.perf_counter() - start
+    start = time.perf_counter()
+    scanned = grid_scan(targets, revenue, params, SETTINGS.net_debt, points)
+    grid_s = time.perf_counter() - start
+
+    # Compare where the root lies inside the scanned range
+    ok = solution.converged & (solution.value > params["terminal_g"] + 1e-3) & (solution.value < 0.5)
+    error = np.abs(scanned[ok] - solution.value[ok])
+    print(f"{n_targets:,} targets; {solution.summary()}")
+    print(f"{'solver':<24} {solver_s:>8.3f} s")
+    print(f"{f'grid scan ({points} pts)':<24} {grid_s:>8.3f} s  max |wacc error| {error.max():.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Edit-to-result latency: full run_all versus the incremental engine for typical
+analyst edits (WACC nudge, revised non-final year, revised final year).
+
+Usage: python benchmarks/bench_incremental.py
+"""
+import contextlib
+import io
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from config import SETTINGS
+from src.pipeline.orchestrator import run_all
+from src.pipeline.incremental import IncrementalValuation
+
+REPEAT = 5
+
+def edit_revenue(data_dir: Path, year: int, delta: float) -> None:
+    path = data_dir / "ambev_income_statement.csv"
+    df = pd.read_csv(path)
+    df.loc[df["year"] == year, "revenue"] += delta
+    df.to_csv(path, index=False)
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = Path(tmp)
+        shutil.copytree(ROOT_DIR / "data", base_dir / "data")
+        last_year = int(pd.read_csv(base_dir / "data" / "ambev_income_statement.csv")["year"].max())
+        base = SETTINGS.scenarios["base"]
+        original_wacc = base.wacc
+        
+        timings = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            run_all(base_dir)
+            timings["run_all (full, with plots)"] = [time.perf_counter() - start]
+            
+        engine = IncrementalValuation(base_dir)
+        timings["incremental: cold"] = [engine.run().seconds]
+        
+        edits = {
+            "incremental: no change": lambda i: None,
+            "incremental: wacc nudge": lambda i: setattr(base, "wacc", original_wacc + 0.001 * (i + 1)),
+            f"incremental: revise {last_year - 1} revenue": lambda i: edit_revenue(base_dir / "data", last_year - 1, 10.0),
+            f"incremental: revise {last_year} revenue": lambda i: edit_revenue(base_dir / "data", last_year, 10.0),
+        }
+        reports = {}
+        try:
+            for name, edit in edits.items():
+                timings[name] = []
+                for i in range(REPEAT):
+                    edit(i)
+                    report = engine.run()
+                    timings[name].append(report.seconds)
+                reports[name] = report
+        finally:
+            base.wacc = original_wacc
+            
+    print(f"{'scenario':<38} {'median ms':>10}  stages recomputed")
+    for name, values in timings.items():
+        recomputed = len(reports[name].recomputed) if name in reports else "all"
+        print(f"{name:<38} {statistics.median(values) * 1e3:>10.2f}  {recomputed}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Per-span cost of the instrumentation surface: disabled (shared no-op), enabled
+with timers only, and enabled with tracemalloc. Also times run_all with and
+without instrumentation (charts off).
+
+Usage: python benchmarks/bench_instrumentation.py [n_spans]
+"""
+import shutil
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from config import SETTINGS
+from src.runtime.instrumentation import count, instrumented, span
+from src.pipeline.orchestrator import run_all
+
+def spans(n: int) -> None:
+    for _ in range(n):
+        with span("stage"):
+            count("rows")
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    baseline = min(timeit.repeat(lambda: [None for _ in range(n)], number=1, repeat=5))
+    print(f"{'mode':<18} {'ns/span':>10}")
+    for label, enabled, memory in [("disabled", False, False), ("timers", True, False), ("timers+tracemalloc", True, True)]:
+        def run():
+            with instrumented(enabled=enabled, trace_memory=memory):
+                spans(n)
+        seconds = min(timeit.repeat(run, number=1, repeat=5))
+        print(f"{label:<18} {(seconds - baseline) / n * 1e9:>10.0f}")
+        
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copytree(ROOT_DIR / "data", Path(tmp) / "data")
+        for enabled in (False, True):
+            SETTINGS.instrumentation.enabled = enabled
+            seconds = min(timeit.repeat(lambda: run_all(Path(tmp), charts="off"), number=1, repeat=3))
+            print(f"run_all instrumentation={'on' if enabled else 'off'}: {seconds * 1e3:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Monte Carlo kernel throughput in draws/sec: the fused projection + DCF kernel
+(enterprise_values) for each available backend, with constant and scheduled
+(faded) drivers at 5 and 30 forecast years, plus end-to-end run_monte_carlo.
+The numba backend is skipped when numba is not installed; its first call
+(JIT compilation, cached on disk afterwards) is reported separately.
+
+Usage: python benchmarks/bench_kernels.py [draws]
+"""
+import sys
+import time
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from config import SETTINGS, DriverSchedule
+from src.finance import kernels
+from src.finance.discounting import discount_times
+from src.finance.kernels import enterprise_values
+from src.finance.montecarlo import run_monte_carlo
+from src.finance.projections import schedule_path
+
+HORIZONS = [5, 30]
+
+def best_of(func, number: int = 1, repeat: int = 5) -> float:
+    """Best per-call time in seconds."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+def main() -> None:
+    draws = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    available = ["numpy"] + (["numba"] if kernels.numba is not None else [])
+    if kernels.numba is None:
+        print("numba is not installed: only the NumPy kernel is measured (pip install numba)")
+    base = SETTINGS.scenarios["base"]
+    rng = np.random.default_rng(0)
+    growth = rng.normal(base.revenue_growth, 0.015, draws)
+    margin = rng.normal(base.ebit_margin, 0.02, draws)
+    wacc = rng.normal(0.11, 0.01, draws)
+    g = np.minimum(rng.triangular(0.01, 0.03, 0.04, draws), wacc - 0.01)
+
+    print(f"{'horizon':>8} {'drivers':>10} {'kernel':>7} {'draws/sec':>14} {'speedup':>9}")
+    for years in HORIZONS:
+        times = discount_times(years)
+        for label, schedules in [("constant", None), ("faded", {"revenue_growth": schedule_path(DriverSchedule("linear"), growth, g, years)})]:
+            run = lambda kernel: enterprise_values(1000.0, growth, margin, base.capex_pct_rev, base.depreciation_pct_capex, base.nwc_pct_rev_change, wacc, g, times, schedules=schedules, kernel=kernel)
+            reference = run("numpy")
+            baseline = None
+            for kernel in available:
+                if kernel == "numba":
+                    start = time.perf_counter()
+                    np.testing.assert_allclose(run(kernel), reference, rtol=1e-12)
+                    print(f"{'':>8} {'':>10} {kernel:>7} first call {time.perf_counter() - start:.2f} s (compile or cache load)")
+                seconds = best_of(lambda: run(kernel))
+                baseline = baseline or seconds
+                print(f"{years:>8} {label:>10} {kernel:>7} {draws / seconds:>14,.0f} {baseline / seconds:>8.1f}x")
+
+    history = pd.DataFrame([{"year": 2023, "revenue": 62000.0}])
+    print(f"\nrun_monte_carlo, {draws:,} draws (sampling + kernel + statistics)")
+    for kernel in available:
+        seconds = best_of(lambda: run_monte_carlo(history, SETTINGS.net_debt, n_draws=draws, kernel=kernel), repeat=3)
+        print(f"{kernel:>7} {draws / seconds:>14,.0f} draws/sec")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Projection kernel benchmark: legacy per-year dict loop vs the array kernel.
+
+Usage: python benchmarks/bench_projections.py
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from config import SETTINGS
+from src.finance.projections import project_arrays, project_financials
+
+HORIZONS = [5, 30, 100]
+N_SCENARIOS = 10_000
+
+def project_financials_loop(history_df: pd.DataFrame, scenario, years: int) -> pd.DataFrame:
+    """Reference copy of the original per-year dict loop."""
+    last_year = history_df.iloc[-1]
+    projections = []
+    current_rev = last_year["revenue"]
+    for i in range(1, years + 1):
+        rev = current_rev * (1 + scenario.revenue_growth)
+        delta_rev = rev - current_rev
+        current_rev = rev
+        ebit = rev * scenario.ebit_margin
+        nopat = ebit * (1 - SETTINGS.tax_rate)
+        capex = rev * scenario.capex_pct_rev
+        depreciation = capex * scenario.depreciation_pct_capex
+        delta_nwc = delta_rev * scenario.nwc_pct_rev_change
+        fcf = nopat + depreciation - capex - delta_nwc
+        projections.append({
+            "year": last_year["year"] + i, "revenue": rev, "ebit": ebit, "nopat": nopat,
+            "depreciation": depreciation, "capex": capex, "delta_nwc": delta_nwc, "fcf": fcf
+        })
+    return pd.DataFrame(projections)
+
+def best_of(func, number: int, repeat: int = 5) -> float:
+    """Best per-call time in seconds."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+def main() -> None:
+    history = pd.DataFrame([{"year": 2023, "revenue": 62000.0}])
+    base = SETTINGS.scenarios["base"]
+    rng = np.random.default_rng(0)
+    growth = rng.normal(base.revenue_growth, 0.01, N_SCENARIOS)
+    margin = rng.normal(base.ebit_margin, 0.02, N_SCENARIOS)
+    
+    print(f"{'horizon':>8} {'loop (1 scen)':>15} {'wrapper (1 scen)':>17} {'loop x N':>12} {'kernel (N)':>12} {'speedup':>9}")
+    original_years = SETTINGS.years_forecast
+    try:
+        for years in HORIZONS:
+            SETTINGS.years_forecast = years
+            loop = best_of(lambda: project_financials_loop(history, base, years), number=20)
+            wrapper = best_of(lambda: project_financials(history, base), number=20)
+            kernel = best_of(lambda: project_arrays(62000.0, growth, margin, base.capex_pct_rev, base.depreciation_pct_capex, base.nwc_pct_rev_change, years=years), number=5)
+            loop_n = loop * N_SCENARIOS
+            print(f"{years:>8} {loop * 1e3:>12.3f} ms {wrapper * 1e3:>14.3f} ms {loop_n:>10.2f} s {kernel * 1e3:>9.2f} ms {loop_n / kernel:>8.0f}x")
+    finally:
+        SETTINGS.years_forecast = original_years
+    print(f"(N = {N_SCENARIOS:,} parameter sets; 'loop x N' extrapolated from the single-scenario loop)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Load test for the valuation server: concurrent keep-alive clients POST
+/value requests with random driver overrides, and the client-side p50/p99
+latency and throughput are reported next to the server's own /stats.
+Without --url an in-process server is started once per batch window, so
+coalescing (default window) can be compared with per-request evaluation (0 ms).
+--per-post k sends k valuations per POST (the list form of /value).
+
+Usage: python benchmarks/bench_server.py [--url http://127.0.0.1:8765] [--clients 16] [--requests 200] [--per-post 1] [--windows 0 2]
+"""
+import argparse
+import http.client
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from config import SETTINGS
+
+def client(url: str, n_requests: int, per_post: int, seed: int, latencies: list, errors: list) -> None:
+    parsed = urlparse(url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+    rng = np.random.default_rng(seed)
+    base = SETTINGS.scenarios["base"]
+    try:
+        for _ in range(n_requests):
+            requests = [{"scenario": "base", "overrides": {
+                "wacc": float(base.wacc + rng.normal(0, 0.01)),
+                "revenue_growth": float(base.revenue_growth + rng.normal(0, 0.01)),
+            }} for _ in range(per_post)]
+            body = json.dumps(requests if per_post > 1 else requests[0])
+            start = time.perf_counter()
+            conn.request("POST", "/value", body, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - start)
+            if response.status != 200:
+                errors.append(response.status)
+    finally:
+        conn.close()
+
+def load_test(url: str, clients: int, n_requests: int, per_post: int = 1) -> dict:
+    latencies, errors = [], []
+    threads = [threading.Thread(target=client, args=(url, n_requests, per_post, seed, latencies, errors)) for seed in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    samples = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "throughput_rps": len(latencies) / elapsed,
+        "valuations_per_s": len(latencies) * per_post / elapsed,
+    }
+
+def server_stats(url: str) -> dict:
+    parsed = urlparse(url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+    conn.request("GET", "/stats")
+    stats = json.loads(conn.getresponse().read())
+    conn.close()
+    return stats
+
+def report(label: str, result: dict, stats: dict) -> None:
+    print(f"{label:<22} {result['requests']:>7,} req  p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  "
+          f"{result['throughput_rps']:8.0f} req/s  {result['valuations_per_s']:9.0f} val/s  errors {result['errors']}  mean batch {stats.get('mean_batch', 0):.1f}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="Running server to test (default: start one in-process)")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per client")
+    parser.add_argument("--per-post", type=int, default=1, help="Valuations per POST")
+    parser.add_argument("--windows", type=float, nargs="+", default=[0.0, SETTINGS.server.batch_window_ms], help="Batch windows (ms) for in-process runs")
+    args = parser.parse_args()
+    print(f"{args.clients} clients x {args.requests} requests x {args.per_post} valuations")
+
+    if args.url:
+        report(args.url, load_test(args.url, args.clients, args.requests, args.per_post), server_stats(args.url))
+        return
+
+    from src.finance.cache import ResultCache
+    from src.pipeline.server import ValuationService, make_server
+    for window in args.windows:
+        # Fresh memory-only cache so repeated runs measure evaluation, not hits
+        service = ValuationService(ROOT_DIR, window_ms=window, cache=ResultCache(disk_dir=None))
+        server = make_server(service, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            report(f"window {window:g} ms", load_test(url, args.clients, args.requests, args.per_post), server_stats(url))
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Cold-start cost of the command-line entry points: each probe runs in a fresh
+interpreter and the median wall time (interpreter start included) is reported
+with the heavy modules it loaded. "eager" probes also import
+src.reporting.plots, reproducing the module graph from before plots were
+imported lazily (the orchestrator pulled in matplotlib at load).
+
+Usage: python benchmarks/bench_startup.py [repeats]
+"""
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+HEAVY = ("numpy", "pandas", "matplotlib")
+
+REPORT_MODULES = f"import sys; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+IMPORT_PROBES = {
+    "cli --help": "import src.cli; src.cli.build_parser().format_help()",
+    "orchestrator": "import src.pipeline.orchestrator",
+    "orchestrator (eager)": "import src.pipeline.orchestrator, src.reporting.plots",
+}
+
+def run_probe(args: list, repeats: int) -> tuple:
+    times, loaded = [], ""
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, *args], cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout
+        times.append(time.perf_counter() - start)
+        loaded = out.strip().splitlines()[-1] if out.strip() else ""
+    return statistics.median(times), loaded
+
+def report(label: str, seconds: float, loaded: str) -> None:
+    print(f"{label:<28} {seconds * 1000:8.0f} ms  loads: {loaded or '-'}")
+
+def main() -> None:
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"median of {repeats} fresh interpreters")
+    for label, code in IMPORT_PROBES.items():
+        report(label, *run_probe(["-c", f"{code}; {REPORT_MODULES}"], repeats))
+
+    # End to end on a scratch copy of data/ so outputs/ is left alone
+    base_dir = Path(tempfile.mkdtemp())
+    try:
+        shutil.copytree(ROOT_DIR / "data", base_dir / "data")
+        value = f"from src.cli import main; main(['--base-dir', {str(base_dir)!r}, 'value', '--charts', 'off'])"
+        report("value --charts off", *run_probe(["-c", f"{value}; {REPORT_MODULES}"], repeats))
+        report("value --charts off (eager)", *run_probe(["-c", f"import src.reporting.plots; {value}; {REPORT_MODULES}"], repeats))
+    finally:
+        shutil.rmtree(base_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Benchmark suite over the finance kernels and the end-to-end pipeline, on
+synthetic data scaled by company count, history length, forecast horizon and
+sensitivity grid size. Results are written as a JSON baseline; compare flags
+cases slower than the baseline by more than a tolerance (exit code 1).
+benchmarks/baseline.json is the reference run; its "meta" records the machine.
+
+Usage:
+    python benchmarks/suite.py run [--quick] [--only SUBSTRING] [--out results.json] [--compare baseline.json]
+    python benchmarks/suite.py compare baseline.json current.json [--tolerance 0.15]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+from contextlib import contextmanager, redirect_stdout
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+
+from benchmarks.synthetic import make_grid, make_history, make_panel, write_panel_csv
+from config import SETTINGS, DriverSchedule
+from src.finance.batch import run_batch
+from src.finance.dcf import calculate_dcf
+from src.finance.metrics import calculate_historical_metrics
+from src.finance.projections import project_financials
+from src.finance.scenarios import run_scenarios
+from src.finance.sensitivity import calculate_sensitivity_grid
+from src.pipeline.orchestrator import run_all
+from src.reporting.export import export_summary
+from src.reporting.plots import plot_all
+
+DEFAULT_TOLERANCE = 0.15
+
+@contextmanager
+def overridden(**fields: Any) -> Iterator[None]:
+    """Temporarily replaces SETTINGS fields."""
+    old = {name: getattr(SETTINGS, name) for name in fields}
+    try:
+        for name, value in fields.items():
+            setattr(SETTINGS, name, value)
+        yield
+    finally:
+        for name, value in old.items():
+            setattr(SETTINGS, name, value)
+
+def _history(years: int = 20) -> pd.DataFrame:
+    return calculate_historical_metrics(make_history(years))
+
+def _results() -> Dict[str, Any]:
+    return run_scenarios(_history(), SETTINGS.net_debt)
+
+# Each case builder receives its params and a scratch directory and returns the callable to time
+def case_historical_metrics(params: Dict[str, int], tmp: Path) -> Callable[[], Any]:
+    data = make_history(params["years"])
+    return lambda: calculate_historical_metrics(data)
+
+def case_project_financials(params: Dict[str, int], tmp: Path) -> Callable[[], Any]:
+    history, scenario = _history(), SETTINGS.scenarios["base"]
+    return lambda: project_financials(history, scenario)
+
+def case_project_financials_faded(params: Dict[str, int], tmp: Path) -> Callable[[], Any]:
+    # Growth fading to terminal_g and an exponentially fading margin
+    history = _history()
+    scenario = replace(SETTINGS.scenarios["base"], schedules={
+        "revenue_growth": DriverSchedule("linear"),
+        "ebit_margin": DriverSchedule("exponential", target=0.25),
+    })
+    return lambda: project_financials(history, scenario)
+
+def case_calculate_dcf(params: Dict[str, int], tmp: Path) -> Callable[[], Any]:
+    scenario = SETTINGS.scenarios["base"]
+    projections = project_financials(_history(), scenario)
+    return lambda: calculate_dcf(projections, scenario, SETTINGS.net_debt, "base")
+
+def case_sensitivity_grid(params: Dict[str, int], tmp: Path) -> Callable[[], Any]:
+    projections = project_financials(_history(), SETTINGS.scenarios["base"])
+    return lambda: calculate_sensitivity_grid(projections)
+
+def case_batch_valuation(params: Dict[str, int], tmp: Path) -> Callable[[], Any]:
+    panel = make_panel(params["companies"], params["years"])
+    return lambda: run_batch(panel)
+
+def case_export_summary(params: Dict[str, int], tmp: Path) -> Callable[[], Any]:
+    results = _results()
+    sensitivity = calculate_sensitivity_grid(results["base"].projections)
+    return lambda: export_summary(results, sensitivity, [], {}, tmp)
+
+def case_plot_all(params: Dict[str, int], tmp: Path) -> Callable[[], Any]:
+    results = _results()
+    sensitivity = calculate_sensitivity_grid(results["base"].projections)
+    return lambda: plot_all(results, sensitivity, tmp)
+
+def case_run_all(params: Dict[str, int], tmp: Path) -> Callable[[], Any]:
+    write_panel_csv(make_history(params["years"]), tmp / "data")
+    mode = "on" if params["charts"] else "off"
+    return lambda: run_all(tmp, charts=mode)
+
+# (name, builder, params, SETTINGS overrides); the first entry of each name is the quick set
+CASES: List[Tuple[str, Callable, Dict[str, int], Callable[[Dict[str, int]], Dict[str, Any]]]] = []
+
+def _add(name: str, builder: Callable, grid: List[Dict[str, int]], overrides: Callable[[Dict[str, int]], Dict[str, Any]] = lambda p: {}) -> None:
+    for params in grid:
+        CASES.append((name, builder, params, overrides))
+
+_add("historical_metrics", case_historical_metrics, [{"years": 20}, {"years": 2_000}])
+_add("project_financials", case_project_financials, [{"horizon": 5}, {"horizon": 100}], lambda p: {"years_forecast": p["horizon"]})
+_add("project_financials_faded", case_project_financials_faded, [{"horizon": 30}], lambda p: {"years_forecast": p["horizon"]})
+_add("calculate_dcf", case_calculate_dcf, [{"horizon": 5}, {"horizon": 100}], lambda p: {"years_forecast": p["horizon"]})
+_add("sensitivity_grid", case_sensitivity_grid, [{"grid": 6}, {"grid": 100}, {"grid": 1_000}],
+     lambda p: {"sensitivity": replace(SETTINGS.sensitivity, **make_grid(p["grid"]))})
+_add("batch_valuation", case_batch_valuation, [{"companies": 100, "years": 20}, {"companies": 5_000, "years": 20}])
+_add("export_summary", case_export_summary, [{}])
+_add("plot_all", case_plot_all, [{}])
+_add("run_all", case_run_all, [{"years": 20, "charts": 0}, {"years": 20, "charts": 1}],
+     lambda p: {"charts": replace(SETTINGS.charts, backend="serial", skip_unchanged=False)})
+
+def case_id(name: str, params: Dict[str, int]) -> str:
+    return f"{name}[{','.join(f'{k}={v}' for k, v in params.items())}]" if params else name
+
+def measure(func: Callable[[], Any]) -> Tuple[float, int, int]:
+    """Best per-call seconds, with calls per repeat calibrated (timeit.autorange) to last at least 0.2 s."""
+    timer = timeit.Timer(func)
+    number, total = timer.autorange()
+    repeat = 5 if total / number < 0.05 else 3
+    return min(timer.repeat(repeat=repeat, number=number)) / number, number, repeat
+
+def metadata() -> Dict[str, Any]:
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def run_suite(quick: bool = False, only: str = "") -> Dict[str, Any]:
+    results = {}
+    seen = set()
+    for name, builder, params, overrides in CASES:
+        if (quick and name in seen) or only not in name:
+            continue
+        seen.add(name)
+        key = case_id(name, params)
+        # Pipeline log lines go to a sink so only the results table is printed
+        with tempfile.TemporaryDirectory() as tmp, overridden(**overrides(params)), redirect_stdout(io.StringIO()):
+            func = builder(params, Path(tmp))
+            seconds, number, repeat = measure(func)
+        results[key] = {"name": name, "params": params, "seconds": seconds, "number": number, "repeat": repeat}
+        print(f"{key:<50} {seconds * 1e3:>12.3f} ms", flush=True)
+    return {"meta": metadata(), "results": results}
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Prints a comparison table and returns the ids of regressed cases."""
+    regressions = []
+    base_results, current_results = baseline["results"], current["results"]
+    print(f"{'case':<50} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}  status")
+    for key in list(base_results) + [k for k in current_results if k not in base_results]:
+        if key not in current_results:
+            print(f"{key:<50} {base_results[key]['seconds'] * 1e3:>12.3f} {'-':>12} {'-':>7}  missing")
+            continue
+        if key not in base_results:
+            print(f"{key:<50} {'-':>12} {current_results[key]['seconds'] * 1e3:>12.3f} {'-':>7}  new")
+            continue
+        ratio = current_results[key]["seconds"] / base_results[key]["seconds"]
+        if ratio > 1 + tolerance:
+            status = "REGRESSION"
+            regressions.append(key)
+        elif ratio < 1 / (1 + tolerance):
+            status = "faster"
+        else:
+            status = "ok"
+        print(f"{key:<50} {base_results[key]['seconds'] * 1e3:>12.3f} {current_results[key]['seconds'] * 1e3:>12.3f} {ratio:>7.2f}  {status}")
+    print(f"{len(regressions)} regression(s) beyond {tolerance:.0%}")
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Finance kernel and pipeline benchmark suite.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_cmd = commands.add_parser("run", help="Run the suite and write a JSON baseline")
+    run_cmd.add_argument("--quick", action="store_true", help="Smallest size of each case only")
+    run_cmd.add_argument("--only", default="", help="Run cases whose name contains this substring")
+    run_cmd.add_argument("--out", type=Path, default=Path("benchmark_results.json"))
+    run_cmd.add_argument("--compare", type=Path, help="Baseline JSON to compare the new results against")
+    run_cmd.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    cmp_cmd = commands.add_parser("compare", help="Compare two result files")
+    cmp_cmd.add_argument("baseline", type=Path)
+    cmp_cmd.add_argument("current", type=Path)
+    cmp_cmd.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        current = run_suite(args.quick, args.only)
+        args.out.write_text(json.dumps(current, indent=4))
+        print(f"Results written to {args.out}")
+        if args.compare is None:
+            return 0
+        baseline = json.loads(args.compare.read_text())
+    else:
+        baseline = json.loads(args.baseline.read_text())
+        current = json.loads(args.current.read_text())
+    return 1 if compare(baseline, current, args.tolerance) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
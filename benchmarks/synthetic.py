@@ -0,0 +1,79 @@
+"""
+Synthetic statement panels for benchmarks: Ambev-like ratios with per-company
+scale and noise, in the long (company x year) layout the batch engine reads.
+"""
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+def make_panel(n_companies: int, n_years: int, seed: int = 0, first_year: int = 1990) -> Dict[str, pd.DataFrame]:
+    """
+    Returns {"income_statement", "balance_sheet", "cash_flow"} frames with a
+    company column, sorted by company and year.
+    """
+    rng = np.random.default_rng(seed)
+    companies = np.repeat([f"C{i:06d}" for i in range(n_companies)], n_years)
+    years = np.tile(np.arange(first_year, first_year + n_years), n_companies)
+    
+    scale = np.repeat(rng.lognormal(np.log(5_000), 1.0, n_companies), n_years)
+    growth = np.repeat(rng.normal(0.05, 0.02, n_companies), n_years)
+    step = np.tile(np.arange(n_years), n_companies)
+    revenue = scale * (1 + growth) ** step * rng.normal(1, 0.02, len(step))
+    
+    def share(mean: float, std: float = 0.01) -> np.ndarray:
+        return revenue * rng.normal(mean, std, len(revenue))
+    
+    income_statement = pd.DataFrame({
+        "company": companies, "year": years, "revenue": revenue,
+        "cogs": share(0.50), "opex": share(0.20), "depreciation": share(0.06, 0.005),
+        "interest_expense": share(0.02, 0.002), "taxes": share(0.07, 0.01),
+    })
+    balance_sheet = pd.DataFrame({
+        "company": companies, "year": years, "cash": share(0.10),
+        "receivables": share(0.09), "inventory": share(0.06), "payables": share(0.05),
+        "debt_short": share(0.02), "debt_long": share(0.18), "equity": share(0.50),
+    })
+    cash_flow = pd.DataFrame({
+        "company": companies, "year": years, "cfo": share(0.16),
+        "capex": -share(0.08), "cfi_other": -share(0.01, 0.002), "cff_other": -share(0.02, 0.004),
+    })
+    return {"income_statement": income_statement, "balance_sheet": balance_sheet, "cash_flow": cash_flow}
+
+def write_panel_csv(panel: Dict[str, pd.DataFrame], data_dir: Path) -> Path:
+    """Writes the panel in the repo's CSV layout (statement_files names)."""
+    import sys
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+    from src.io.loaders import statement_files
+    
+    data_dir.mkdir(parents=True, exist_ok=True)
+    for key, df in panel.items():
+        df.to_csv(data_dir / statement_files()[key], index=False)
+    return data_dir
+
+def make_history(n_years: int, seed: int = 0, first_year: int = 1990) -> Dict[str, pd.DataFrame]:
+    """Single-company statements (load_data layout, no company column)."""
+    return {key: df.drop(columns="company") for key, df in make_panel(1, n_years, seed, first_year).items()}
+
+def to_quarterly(panel: Dict[str, pd.DataFrame], flows: tuple = ("revenue", "cogs", "opex", "depreciation", "interest_expense", "taxes", "cfo", "capex", "cfi_other", "cff_other")) -> Dict[str, pd.DataFrame]:
+    """
+    Splits annual statements into four quarters (flows divided evenly, balance
+    sheet repeated), so trailing-twelve-month sums at Q4 equal the annual rows.
+    """
+    quarterly = {}
+    for key, df in panel.items():
+        out = df.loc[df.index.repeat(4)].reset_index(drop=True)
+        out.insert(list(out.columns).index("year") + 1, "quarter", np.tile(np.arange(1, 5), len(df)))
+        for col in flows:
+            if col in out.columns:
+                out[col] = out[col] / 4
+        quarterly[key] = out
+    return quarterly
+
+def make_grid(size: int, wacc: tuple = (0.08, 0.16), terminal_g: tuple = (0.0, 0.04)) -> Dict[str, list]:
+    """size x size WACC / terminal growth values (g stays below every WACC)."""
+    return {
+        "wacc_values": np.linspace(*wacc, size).tolist(),
+        "terminal_g_values": np.linspace(*terminal_g, size).tolist(),
+    }
@@ -1,5 +1,24 @@
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+@dataclass
+class DriverSchedule:
+    """
+    Per-year path of a projection driver (see ScenarioParams.schedules):
+    - "vector": values are the yearly values; the last one holds after them
+    - "linear": fades from the scenario's value in year 1 to target in year
+      fade_years (default: the last forecast year), then holds
+    - "exponential": fades from the scenario's value towards target, halving
+      the gap every half_life years
+    - "stages": values[i] holds for stage_years[i] years; the last stage holds
+    target defaults to the scenario's terminal_g for revenue_growth.
+    """
+    kind: str
+    values: List[float] = field(default_factory=list)
+    target: Optional[float] = None
+    fade_years: Optional[int] = None
+    half_life: float = 2.0
+    stage_years: List[int] = field(default_factory=list)
 
 @dataclass
 class ScenarioParams:
@@ -10,11 +29,115 @@ class ScenarioParams:
     capex_pct_rev: float
     depreciation_pct_capex: float
     nwc_pct_rev_change: float
+    # Optional per-year paths for revenue_growth, ebit_margin, capex_pct_rev,
+    # depreciation_pct_capex or nwc_pct_rev_change (the scalar is then the start value)
+    schedules: Dict[str, DriverSchedule] = field(default_factory=dict)
 
 @dataclass
 class SensitivityConfig:
     wacc_values: List[float]
     terminal_g_values: List[float]
+    # Optional extra cube axes, e.g. {"revenue_growth": [...], "ebit_margin": [...]}
+    extra_axes: Dict[str, List[float]] = field(default_factory=dict)
+    max_block_elements: int = 4_000_000  # cells x forecast years evaluated per chunk
+
+@dataclass
+class Distribution:
+    kind: str  # "normal", "uniform", "triangular" or "fixed"
+    mean: float = 0.0  # normal centre / fixed value
+    std: float = 0.0
+    low: float = float("-inf")  # uniform/triangular bounds; clips normal draws when finite
+    high: float = float("inf")
+    mode: Optional[float] = None  # triangular only
+
+@dataclass
+class MonteCarloConfig:
+    base_scenario: str  # drivers without a distribution keep this scenario's value
+    n_draws: int
+    chunk_size: int  # draws evaluated per vectorized chunk (bounds memory)
+    seed: int
+    drivers: Dict[str, Distribution]
+    correlation: Dict[Tuple[str, str], float] = field(default_factory=dict)  # Gaussian copula
+    quantiles: List[float] = field(default_factory=lambda: [0.05, 0.25, 0.5, 0.75, 0.95])
+    sketch_compression: int = 500
+    kernel: str = "auto"  # "auto" (numba when installed), "numba" or "numpy"
+
+# Allowed values, kept here so the CLI can offer them without importing the pipeline
+BACKENDS = ("serial", "thread", "process")
+CHART_MODES = ("on", "off", "defer")
+CHART_BACKENDS = ("serial", "process")  # pyplot is not thread-safe, so no "thread"
+KERNELS = ("auto", "numba", "numpy")
+
+@dataclass
+class ExecutionConfig:
+    backend: str = "serial"  # "serial", "thread" or "process"
+    max_workers: Optional[int] = None  # None -> os.cpu_count()
+    chunk_size: Optional[int] = None  # work items per task; None -> spread evenly over workers
+
+@dataclass
+class CacheConfig:
+    max_entries: int = 1024
+    max_bytes: int = 256 * 1024 * 1024
+    disk_dir: Optional[str] = None  # spill directory for warm restarts (None = memory only)
+    disk_max_bytes: int = 1024 * 1024 * 1024  # spill files beyond this are deleted, least recently used first
+
+@dataclass
+class ChartConfig:
+    mode: str = "on"  # "on", "off" or "defer" (queued for render_pending)
+    backend: str = "process"  # executor backend charts are rendered on: "process" or "serial"
+    max_workers: Optional[int] = None
+    skip_unchanged: bool = True  # reuse a chart whose input hash matches the last render
+    annotate_max_cells: int = 400  # heatmaps with more cells (e.g. above 20x20) rely on the colorbar alone
+
+@dataclass
+class InstrumentationConfig:
+    enabled: bool = False  # spans/counters exported to outputs/instrumentation.jsonl and trace.json
+    trace_memory: bool = False  # tracemalloc allocation deltas per span (slows allocation-heavy stages)
+
+@dataclass
+class LoggingConfig:
+    level: str = "INFO"  # DEBUG, INFO, WARNING or ERROR
+    echo: bool = True  # mirror log lines to stdout
+    queue_size: int = 10_000  # records buffered before log calls block
+
+@dataclass
+class ExportConfig:
+    streaming: bool = False  # batch runs write results chunk by chunk instead of one batch_results.csv
+    projections_format: str = "csv"  # "csv", "bin" (compact fixed-width records), "arrow" or "parquet" (pyarrow)
+    chunk_companies: int = 1_000  # companies valued and written per chunk
+
+@dataclass
+class ServerConfig:
+    host: str = "127.0.0.1"
+    port: int = 8765
+    batch_window_ms: float = 2.0  # requests arriving within this window are valued in one batch
+    max_batch: int = 1_024  # closes the window early
+    latency_samples: int = 100_000  # recent request latencies kept for p50/p99
+
+@dataclass
+class MetricsConfig:
+    rolling_years: int = 3  # trailing window of the rolling ratio averages
+
+@dataclass
+class DiscountingConfig:
+    convention: str = "end"  # "end" (year-end cash flows), "mid" (mid-year) or "dates" (XNPV on fiscal year-end dates)
+    valuation_date: Optional[str] = None  # "dates": ISO date valued at; None -> fiscal year end before the first forecast year
+    fiscal_year_end: str = "12-31"  # "dates": month-day each forecast year's cash flow is dated
+    day_count: float = 365.0  # "dates": days per year, as XNPV
+    table_rows: int = 4_096  # cached discount-factor rows (rate x schedule)
+
+@dataclass
+class DataSourceConfig:
+    # Statement key -> file name inside a company directory
+    statement_files: Dict[str, str] = field(default_factory=lambda: {
+        "income_statement": "ambev_income_statement.csv",
+        "balance_sheet": "ambev_balance_sheet.csv",
+        "cash_flow": "ambev_cash_flow.csv"
+    })
+    directories: Dict[str, str] = field(default_factory=dict)  # company id -> statement directory
+    globs: List[str] = field(default_factory=list)  # patterns of company directories (id = directory name)
+    sqlite: Optional[str] = None  # one table per statement with a company column
+    batch_size: int = 500  # companies per bulk read
 
 @dataclass
 class Config:
@@ -25,6 +148,17 @@ class Config:
     net_debt: float  # Pre-defined net debt if data not available, or override
     scenarios: Dict[str, ScenarioParams]
     sensitivity: SensitivityConfig
+    monte_carlo: MonteCarloConfig
+    execution: ExecutionConfig = field(default_factory=ExecutionConfig)
+    cache: CacheConfig = field(default_factory=CacheConfig)
+    data: DataSourceConfig = field(default_factory=DataSourceConfig)
+    charts: ChartConfig = field(default_factory=ChartConfig)
+    instrumentation: InstrumentationConfig = field(default_factory=InstrumentationConfig)
+    logging: LoggingConfig = field(default_factory=LoggingConfig)
+    export: ExportConfig = field(default_factory=ExportConfig)
+    discounting: DiscountingConfig = field(default_factory=DiscountingConfig)
+    metrics: MetricsConfig = field(default_factory=MetricsConfig)
+    server: ServerConfig = field(default_factory=ServerConfig)
 
 # GLOBAL CONFIGURATION
 SETTINGS = Config(
@@ -66,5 +200,25 @@ SETTINGS = Config(
     sensitivity=SensitivityConfig(
         wacc_values=[0.09, 0.10, 0.11, 0.12, 0.13, 0.14],
         terminal_g_values=[0.01, 0.015, 0.02, 0.025, 0.03, 0.035]
+    ),
+    monte_carlo=MonteCarloConfig(
+        base_scenario="base",
+        n_draws=1_000_000,
+        chunk_size=100_000,
+        seed=42,
+        drivers={
+            "revenue_growth": Distribution("normal", mean=0.05, std=0.015),
+            "ebit_margin": Distribution("normal", mean=0.28, std=0.02, low=0.0, high=1.0),
+            "wacc": Distribution("normal", mean=0.11, std=0.01),
+            "terminal_g": Distribution("triangular", low=0.01, mode=0.03, high=0.04),
+        },
+        correlation={
+            ("revenue_growth", "ebit_margin"): 0.4,
+            ("wacc", "terminal_g"): 0.3,
+        }
+    ),
+    execution=ExecutionConfig(
+        backend="serial",   # "thread" / "process" fan out scenarios, companies, grids and draws
+        max_workers=None
     )
 )
@@ -6,7 +6,8 @@ from pathlib import Path
 ROOT_DIR = Path(__file__).parent
 sys.path.append(str(ROOT_DIR))
 
-from src.pipeline.orchestrator import run_all
+from src.cli import main
 
 if __name__ == "__main__":
-    run_all(ROOT_DIR)
+    # `python run.py [flags]` is `value [flags]` (or `serve` with --serve); see src/cli.py
+    sys.exit(main())
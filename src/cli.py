@@ -0,0 +1,124 @@
+"""
+Command-line entry point: python -m src.cli <command> (or run.py, or the
+dcf-valuation script).
+
+Commands:
+- value: the full pipeline (scenarios, checks, sensitivity, charts, export)
+- sensitivity: WACC x terminal growth grid for one scenario, no charts
+- montecarlo: EV distribution for SETTINGS.monte_carlo
+- export-only: draw the charts a previous "value --charts defer" run queued
+- serve: the warm valuation server
+
+Each command imports only the modules it runs, so argument errors and --help
+return without loading pandas, and no command but value (charts on) and
+export-only imports matplotlib.
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+from config import BACKENDS, CHART_MODES, KERNELS, SETTINGS
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+COMMANDS = ("value", "sensitivity", "montecarlo", "export-only", "serve")
+# Options of the parser itself (given before the command)
+TOP_LEVEL_OPTIONS = ("--base-dir",)
+
+def _value(args: argparse.Namespace) -> int:
+    from .runtime.executor import Executor
+    from .pipeline.orchestrator import run_all
+    if args.trace or args.trace_memory:
+        SETTINGS.instrumentation.enabled = True
+        SETTINGS.instrumentation.trace_memory = args.trace_memory
+    with Executor(args.backend, args.workers) as executor:
+        run_all(args.base_dir, executor, args.charts)
+    return 0
+
+def _sensitivity(args: argparse.Namespace) -> int:
+    from .runtime.executor import Executor
+    from .pipeline.orchestrator import run_sensitivity_all
+    with Executor(args.backend, args.workers) as executor:
+        return 0 if run_sensitivity_all(args.base_dir, executor, args.scenario) is not None else 1
+
+def _montecarlo(args: argparse.Namespace) -> int:
+    from .runtime.executor import Executor
+    from .pipeline.orchestrator import run_monte_carlo_all
+    overrides = {key: value for key, value in [("n_draws", args.draws), ("seed", args.seed), ("chunk_size", args.chunk_size), ("kernel", args.kernel)] if value is not None}
+    with Executor(args.backend, args.workers) as executor:
+        return 0 if run_monte_carlo_all(args.base_dir, executor, **overrides) is not None else 1
+
+def _export_only(args: argparse.Namespace) -> int:
+    from .reporting.render import render_pending
+    report = render_pending(args.base_dir / "outputs")
+    for line in report.lines():
+        print(line)
+    return 1 if report.errors else 0
+
+def _serve(args: argparse.Namespace) -> int:
+    from .pipeline.server import serve
+    serve(args.base_dir, args.host, args.port)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="dcf-valuation", description="Run the DCF valuation pipeline.")
+    parser.add_argument("--base-dir", type=Path, default=ROOT_DIR, help="Directory holding data/ and outputs/ (default: the repository root)")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    def executor_options(command: argparse.ArgumentParser) -> None:
+        command.add_argument("--backend", choices=BACKENDS, help="Executor backend (default: SETTINGS.execution.backend)")
+        command.add_argument("--workers", type=int, help="Maximum number of workers (default: CPU count)")
+
+    value = commands.add_parser("value", help="Run the full valuation pipeline")
+    executor_options(value)
+    value.add_argument("--charts", choices=CHART_MODES, help="Render, defer or skip charts (default: SETTINGS.charts.mode)")
+    value.add_argument("--trace", action="store_true", help="Record stage spans and counters to outputs/instrumentation.jsonl and trace.json")
+    value.add_argument("--trace-memory", action="store_true", help="With --trace, also record tracemalloc allocation deltas")
+    value.set_defaults(handler=_value)
+
+    sensitivity = commands.add_parser("sensitivity", help="WACC x terminal growth grid to outputs/sensitivity_grid.csv")
+    executor_options(sensitivity)
+    sensitivity.add_argument("--scenario", default="base", help="Scenario whose projections are flexed (default: base)")
+    sensitivity.set_defaults(handler=_sensitivity)
+
+    montecarlo = commands.add_parser("montecarlo", help="Monte Carlo EV distribution to outputs/monte_carlo.json")
+    executor_options(montecarlo)
+    montecarlo.add_argument("--draws", type=int, help="Number of draws (default: SETTINGS.monte_carlo.n_draws)")
+    montecarlo.add_argument("--seed", type=int, help="Random seed (default: SETTINGS.monte_carlo.seed)")
+    montecarlo.add_argument("--chunk-size", type=int, help="Draws per vectorized chunk (default: SETTINGS.monte_carlo.chunk_size)")
+    montecarlo.add_argument("--kernel", choices=KERNELS, help="Projection + DCF kernel; auto uses numba when installed (default: SETTINGS.monte_carlo.kernel)")
+    montecarlo.set_defaults(handler=_montecarlo)
+
+    export_only = commands.add_parser("export-only", help="Render charts deferred by a previous run (value --charts defer)")
+    export_only.set_defaults(handler=_export_only)
+
+    serve = commands.add_parser("serve", help="Run the warm valuation server")
+    serve.add_argument("--host", help="Server host (default: SETTINGS.server.host)")
+    serve.add_argument("--port", type=int, help="Server port (default: SETTINGS.server.port)")
+    serve.set_defaults(handler=_serve)
+    return parser
+
+def _legacy_argv(argv: List[str]) -> List[str]:
+    """run.py's original flag-only form: no command means value, --serve means serve."""
+    if any(arg in COMMANDS for arg in argv) or any(arg in ("-h", "--help") for arg in argv):
+        return argv
+    # Top-level options stay in front of the inserted command
+    top, rest = [], []
+    args = iter(argv)
+    for arg in args:
+        if arg in TOP_LEVEL_OPTIONS:
+            top += [arg, next(args, "")]
+        elif arg.split("=", 1)[0] in TOP_LEVEL_OPTIONS:
+            top.append(arg)
+        else:
+            rest.append(arg)
+    if "--serve" in rest:
+        return top + ["serve"] + [arg for arg in rest if arg != "--serve"]
+    return top + ["value"] + rest
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = _legacy_argv(list(sys.argv[1:] if argv is None else argv))
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
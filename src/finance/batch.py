@@ -0,0 +1,221 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple, Union
+from config import SETTINGS, ScenarioParams
+from .metrics import statement_metrics
+from .projections import PROJECTION_COLUMNS, project_arrays, stack_scenario_params, stack_scenario_schedules
+from .dcf import TERMINAL_SHARE_LIMIT, ValuationResult, calculate_dcf_arrays, terminal_share_warning
+from .discounting import discount_factors, discount_times
+from ..runtime.executor import Executor, SharedArrays, share_arrays
+from ..runtime.instrumentation import count
+
+COMPANY_COL = "company"
+
+VALUATION_FIELDS = ["enterprise_value", "equity_value", "terminal_value", "pv_explicit", "pv_terminal", "terminal_share_pct"]
+
+@dataclass
+class BatchValuation:
+    """
+    Valuation outputs for every company x scenario of a panel.
+    Projection arrays are shaped (companies, scenarios, years); valuation arrays
+    are shaped (companies, scenarios).
+    """
+    companies: List[str]
+    scenarios: List[str]
+    last_years: np.ndarray
+    net_debt: np.ndarray
+    wacc: np.ndarray
+    terminal_g: np.ndarray
+    projections: Dict[str, np.ndarray]
+    valuation: Dict[str, np.ndarray]
+    
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Long-format summary: one row per company/scenario.
+        """
+        n_companies, n_scenarios = len(self.companies), len(self.scenarios)
+        frame = pd.DataFrame({
+            COMPANY_COL: np.repeat(self.companies, n_scenarios),
+            "scenario": np.tile(self.scenarios, n_companies),
+        })
+        for field in VALUATION_FIELDS:
+            frame[field] = self.valuation[field].ravel()
+        frame["wacc"] = np.tile(self.wacc, n_companies)
+        frame["terminal_g"] = np.tile(self.terminal_g, n_companies)
+        
+        # Warning strings only for the (few) flagged rows
+        share = frame["terminal_share_pct"].to_numpy()
+        warnings = np.full(len(frame), "", dtype=object)
+        flagged = np.flatnonzero(share > TERMINAL_SHARE_LIMIT)
+        warnings[flagged] = [terminal_share_warning(share[i]) for i in flagged]
+        frame["terminal_share_warning"] = warnings
+        return frame
+    
+    def to_valuation_results(self, company: str) -> Dict[str, ValuationResult]:
+        """
+        Rebuilds the single-company output (as run_scenarios returns it) for one company.
+        """
+        c = self.companies.index(company)
+        years = self.last_years[c] + np.arange(1, self.projections["fcf"].shape[-1] + 1)
+        periods = np.arange(1, len(years) + 1)
+        times = discount_times(len(years), int(years[0]))
+        
+        results = {}
+        for s, scenario_name in enumerate(self.scenarios):
+            proj = pd.DataFrame({"year": years})
+            for field in PROJECTION_COLUMNS:
+                proj[field] = self.projections[field][c, s]
+            proj["period"] = periods
+            proj["discount_factor"] = discount_factors(self.wacc[s], times)
+            proj["pv_fcf"] = proj["fcf"] * proj["discount_factor"]
+            
+            share = float(self.valuation["terminal_share_pct"][c, s])
+            results[scenario_name] = ValuationResult(
+                scenario_name=scenario_name,
+                enterprise_value=float(self.valuation["enterprise_value"][c, s]),
+                equity_value=float(self.valuation["equity_value"][c, s]),
+                terminal_value=float(self.valuation["terminal_value"][c, s]),
+                pv_explicit=float(self.valuation["pv_explicit"][c, s]),
+                pv_terminal=float(self.valuation["pv_terminal"][c, s]),
+                projections=proj,
+                wacc=float(self.wacc[s]),
+                terminal_g=float(self.terminal_g[s]),
+                terminal_share_pct=share,
+                terminal_share_warning=terminal_share_warning(share)
+            )
+        return results
+
+def calculate_panel_metrics(panel: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Panel version of calculate_historical_metrics: aligns the three statements on
+    (company, year[, quarter]) and applies the same formulas, grouped by company.
+    Returns the frame sorted by company and year.
+    """
+    return statement_metrics(panel, COMPANY_COL)
+
+def _value_companies(last_revenue: np.ndarray, last_years: np.ndarray, net_debt: np.ndarray, params: Dict[str, np.ndarray], schedules: Dict[str, np.ndarray]) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """
+    Projection + DCF for a block of companies x all scenarios.
+    schedules holds (n_scenarios, years) driver paths (stack_scenario_schedules);
+    last_years only matter for date-based discounting.
+    Returns (projections, valuation) dictionaries of arrays.
+    """
+    projections = project_arrays(
+        last_revenue[:, None],
+        params["revenue_growth"][None, :],
+        params["ebit_margin"][None, :],
+        params["capex_pct_rev"][None, :],
+        params["depreciation_pct_capex"][None, :],
+        params["nwc_pct_rev_change"][None, :],
+        schedules={name: path[None, :, :] for name, path in schedules.items()}
+    ).as_dict()
+    
+    times = discount_times(projections["fcf"].shape[-1], last_years.astype(int)[:, None] + 1)
+    dcf = calculate_dcf_arrays(projections["fcf"], params["wacc"][None, :], params["terminal_g"][None, :], net_debt[:, None], times)
+    return projections, {field: dcf[field] for field in VALUATION_FIELDS}
+
+def _value_company_block(shared: SharedArrays, params: Dict[str, np.ndarray], schedules: Dict[str, np.ndarray], bounds: Tuple[int, int]) -> None:
+    """
+    Worker: values companies [start, end) and writes into the shared output buffers,
+    so neither inputs nor results are pickled.
+    """
+    start, end = bounds
+    with shared.open() as arrays:
+        projections, valuation = _value_companies(arrays["last_revenue"][start:end], arrays["last_years"][start:end], arrays["net_debt"][start:end], params, schedules)
+        for field, values in projections.items():
+            arrays[f"proj_{field}"][start:end] = values
+        for field, values in valuation.items():
+            arrays[f"val_{field}"][start:end] = values
+
+def _value_companies_parallel(last_revenue: np.ndarray, last_years: np.ndarray, net_debt: np.ndarray, params: Dict[str, np.ndarray], schedules: Dict[str, np.ndarray], executor: Executor) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    n_companies, n_scenarios = len(last_revenue), len(params["wacc"])
+    arrays = {"last_revenue": last_revenue, "last_years": last_years, "net_debt": net_debt}
+    for field in PROJECTION_COLUMNS:
+        arrays[f"proj_{field}"] = np.empty((n_companies, n_scenarios, SETTINGS.years_forecast))
+    for field in VALUATION_FIELDS:
+        arrays[f"val_{field}"] = np.empty((n_companies, n_scenarios))
+        
+    # Contiguous company blocks, one work unit each
+    chunk_size = executor.chunk_size or -(-n_companies // executor.max_workers)
+    blocks = [(start, min(start + chunk_size, n_companies)) for start in range(0, n_companies, chunk_size)]
+    
+    with share_arrays(arrays, executor) as shared:
+        executor.map(partial(_value_company_block, shared, params, schedules), blocks, chunk_size=1)
+        with shared.open() as outputs:
+            projections = {field: outputs[f"proj_{field}"].copy() for field in PROJECTION_COLUMNS}
+            valuation = {field: outputs[f"val_{field}"].copy() for field in VALUATION_FIELDS}
+            
+    return projections, valuation
+
+def _prepare_batch(panel: Dict[str, pd.DataFrame], net_debt: Optional[Union[float, Mapping[str, float]]], scenarios: Optional[Dict[str, ScenarioParams]]) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray, Dict[str, ScenarioParams]]:
+    """
+    Historical metrics for the whole panel, reduced to what valuation needs:
+    (companies, last revenue, last year, net debt per company, scenarios).
+    """
+    if scenarios is None:
+        scenarios = SETTINGS.scenarios
+    if net_debt is None:
+        net_debt = SETTINGS.net_debt
+        
+    historical = calculate_panel_metrics(panel)
+    
+    # Last historical row of each company (frame is sorted by company, year)
+    company_ids = historical[COMPANY_COL].to_numpy()
+    last_idx = np.r_[np.flatnonzero(company_ids[1:] != company_ids[:-1]), len(company_ids) - 1]
+    companies = list(company_ids[last_idx])
+    last_revenue = historical["revenue"].to_numpy(dtype=float)[last_idx]
+    last_years = historical["year"].to_numpy(dtype=float)[last_idx]
+    
+    if isinstance(net_debt, Mapping):
+        net_debt_arr = np.array([net_debt[c] for c in companies], dtype=float)
+    else:
+        net_debt_arr = np.full(len(companies), float(net_debt))
+    return companies, last_revenue, last_years, net_debt_arr, scenarios
+
+def _value_block(companies: List[str], last_revenue: np.ndarray, last_years: np.ndarray, net_debt: np.ndarray, scenarios: Dict[str, ScenarioParams], params: Dict[str, np.ndarray], schedules: Dict[str, np.ndarray], executor: Optional[Executor]) -> BatchValuation:
+    if executor is not None and executor.backend != "serial":
+        projections, valuation = _value_companies_parallel(last_revenue, last_years, net_debt, params, schedules, executor)
+    else:
+        projections, valuation = _value_companies(last_revenue, last_years, net_debt, params, schedules)
+    
+    count("companies_valued", len(companies))
+    return BatchValuation(
+        companies=companies,
+        scenarios=list(scenarios.keys()),
+        last_years=last_years,
+        net_debt=net_debt,
+        wacc=params["wacc"],
+        terminal_g=params["terminal_g"],
+        projections=projections,
+        valuation=valuation
+    )
+
+def run_batch(panel: Dict[str, pd.DataFrame], net_debt: Optional[Union[float, Mapping[str, float]]] = None, scenarios: Optional[Dict[str, ScenarioParams]] = None, executor: Optional[Executor] = None) -> BatchValuation:
+    """
+    Values every company of a long-format panel under every scenario in one
+    vectorized pass. net_debt may be a single value or a company -> value mapping
+    (defaults to SETTINGS.net_debt); scenarios default to SETTINGS.scenarios.
+    With a thread/process executor, company blocks are valued in parallel.
+    """
+    companies, last_revenue, last_years, net_debt_arr, scenarios = _prepare_batch(panel, net_debt, scenarios)
+    params = stack_scenario_params(scenarios)
+    return _value_block(companies, last_revenue, last_years, net_debt_arr, scenarios, params, stack_scenario_schedules(scenarios), executor)
+
+def iter_batch(panel: Dict[str, pd.DataFrame], net_debt: Optional[Union[float, Mapping[str, float]]] = None, scenarios: Optional[Dict[str, ScenarioParams]] = None, executor: Optional[Executor] = None, chunk_size: Optional[int] = None) -> Iterator[BatchValuation]:
+    """
+    run_batch in company chunks (default SETTINGS.export.chunk_companies): yields
+    one BatchValuation per chunk, so projection arrays for only chunk_size
+    companies are alive at a time. Chunks concatenated equal run_batch.
+    """
+    if chunk_size is None:
+        chunk_size = SETTINGS.export.chunk_companies
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    companies, last_revenue, last_years, net_debt_arr, scenarios = _prepare_batch(panel, net_debt, scenarios)
+    params = stack_scenario_params(scenarios)
+    schedules = stack_scenario_schedules(scenarios)
+    for start in range(0, len(companies), chunk_size):
+        block = slice(start, start + chunk_size)
+        yield _value_block(companies[block], last_revenue[block], last_years[block], net_debt_arr[block], scenarios, params, schedules, executor)
@@ -0,0 +1,229 @@
+import hashlib
+import pickle
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+from config import SETTINGS, ScenarioParams
+from .projections import project_financials
+from .dcf import calculate_dcf, ValuationResult
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Content hash of a DataFrame (values, index, column names and dtypes).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(zip(df.columns, map(str, df.dtypes)))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def settings_fingerprint() -> str:
+    """
+    Hash of the global settings the cached computations read (tax_rate,
+    years_forecast, discounting).
+    """
+    return hashlib.blake2b(repr((SETTINGS.tax_rate, SETTINGS.years_forecast, SETTINGS.discounting)).encode(), digest_size=8).hexdigest()
+
+def make_key(*parts: Any) -> str:
+    """
+    Content-addressed key: dataclasses hash by field values, DataFrames by content.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            part = frame_fingerprint(part)
+        elif is_dataclass(part):
+            part = (type(part).__name__, tuple(sorted(asdict(part).items())))
+        digest.update(repr(part).encode())
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+def _sizeof(value: Any) -> int:
+    """Approximate in-memory size of a cached value in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, ValuationResult):
+        return 512 + _sizeof(value.projections)
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+def _detached(value: Any) -> Any:
+    """Copy of mutable cached values so callers cannot alter the cache."""
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if isinstance(value, ValuationResult):
+        return replace(value, projections=value.projections.copy())
+    return value
+
+_MISSING = object()
+
+class ResultCache:
+    """
+    LRU cache bounded by entry count and total bytes, with optional spill to disk
+    (one pickle per key) so warm restarts skip recomputation. The spill directory
+    is bounded by disk_max_bytes, deleting the least recently used files. Entries
+    are dropped automatically when the settings fingerprint changes.
+    """
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None, disk_dir: Optional[Path] = None, disk_max_bytes: Optional[int] = None):
+        self.max_entries = max_entries if max_entries is not None else SETTINGS.cache.max_entries
+        self.max_bytes = max_bytes if max_bytes is not None else SETTINGS.cache.max_bytes
+        self.disk_max_bytes = disk_max_bytes if disk_max_bytes is not None else SETTINGS.cache.disk_max_bytes
+        disk_dir = disk_dir if disk_dir is not None else SETTINGS.cache.disk_dir
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        # Spill files, least recently used first (file mtime orders them across restarts)
+        self._disk_sizes: "OrderedDict[Path, int]" = OrderedDict()
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            files = sorted(((path.stat(), path) for path in self.disk_dir.glob("*.pkl")), key=lambda item: item[0].st_mtime_ns)
+            self._disk_sizes.update((path, stat.st_size) for stat, path in files)
+
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._settings = settings_fingerprint()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.disk_bytes = sum(self._disk_sizes.values())
+        self.disk_evictions = 0
+        self.invalidations = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "disk_bytes": self.disk_bytes,
+            "disk_evictions": self.disk_evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.bytes = 0
+
+    def _check_settings(self) -> None:
+        current = settings_fingerprint()
+        if current != self._settings:
+            self._entries.clear()
+            self._sizes.clear()
+            self.bytes = 0
+            self._settings = current
+            self.invalidations += 1
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        return self.disk_dir / f"{key}.pkl" if self.disk_dir is not None else None
+
+    def _store(self, key: str, value: Any) -> None:
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = value
+        self._sizes[key] = size
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            old_key, _ = self._entries.popitem(last=False)
+            self.bytes -= self._sizes.pop(old_key)
+            self.evictions += 1
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Returns the cached value for key (memory, then disk), or default on a miss.
+        The settings fingerprint is part of the effective key.
+        """
+        with self._lock:
+            self._check_settings()
+            key = f"{key}-{self._settings}"
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _detached(self._entries[key])
+
+            path = self._disk_path(key)
+            if path is not None and path.exists():
+                with open(path, "rb") as f:
+                    value = pickle.load(f)
+                self.hits += 1
+                self.disk_hits += 1
+                self._disk_sizes.move_to_end(path)
+                path.touch()
+                self._store(key, value)
+                return _detached(value)
+            self.misses += 1
+            return default
+
+    def put(self, key: str, value: Any) -> None:
+        """Stores a value computed elsewhere (e.g. in a worker) under key."""
+        with self._lock:
+            self._check_settings()
+            key = f"{key}-{self._settings}"
+            self._store(key, value)
+            path = self._disk_path(key)
+            if path is not None:
+                self._spill(path, value)
+
+    def _spill(self, path: Path, value: Any) -> None:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.disk_max_bytes:
+            return
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        self.disk_bytes += len(data) - self._disk_sizes.pop(path, 0)
+        self._disk_sizes[path] = len(data)
+        while self.disk_bytes > self.disk_max_bytes:
+            old_path, size = self._disk_sizes.popitem(last=False)
+            old_path.unlink(missing_ok=True)
+            self.disk_bytes -= size
+            self.disk_evictions += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value for key or computes and stores it.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = compute()
+        self.put(key, value)
+        return _detached(value)
+
+DEFAULT_CACHE: Optional[ResultCache] = None
+
+def get_default_cache() -> ResultCache:
+    """Process-wide cache built lazily from SETTINGS.cache."""
+    global DEFAULT_CACHE
+    if DEFAULT_CACHE is None:
+        DEFAULT_CACHE = ResultCache()
+    return DEFAULT_CACHE
+
+def cached_project_financials(history_df: pd.DataFrame, scenario: ScenarioParams, cache: Optional[ResultCache] = None) -> pd.DataFrame:
+    """
+    project_financials memoized on (scenario params, history fingerprint, settings).
+    """
+    cache = cache or get_default_cache()
+    key = make_key("project_financials", scenario, history_df)
+    return cache.get_or_compute(key, lambda: project_financials(history_df, scenario))
+
+def dcf_key(projections: pd.DataFrame, scenario: ScenarioParams, net_debt: float, scenario_name: str) -> str:
+    """Cache key of calculate_dcf(projections, scenario, net_debt, scenario_name)."""
+    return make_key("calculate_dcf", scenario, projections, float(net_debt), scenario_name)
+
+def cached_calculate_dcf(projections: pd.DataFrame, scenario: ScenarioParams, net_debt: float, scenario_name: str, cache: Optional[ResultCache] = None) -> ValuationResult:
+    """
+    calculate_dcf memoized on (projections fingerprint, scenario params, net debt, name).
+    """
+    cache = cache or get_default_cache()
+    key = dcf_key(projections, scenario, net_debt, scenario_name)
+    return cache.get_or_compute(key, lambda: calculate_dcf(projections, scenario, net_debt, scenario_name))
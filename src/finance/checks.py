@@ -1,29 +1,55 @@
 import pandas as pd
-from typing import List
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 from config import SETTINGS
+from .metrics import HistoricalAverages, historical_averages
 
-def check_projection_consistency(historical_df: pd.DataFrame, projections_df: pd.DataFrame, scenario_name: str) -> List[str]:
+# Revenue pct_change noise when a schedule fades growth exactly to terminal_g
+GROWTH_TOLERANCE = 1e-9
+
+@dataclass
+class ConsistencyWarning:
+    scenario: str
+    check: str  # "ebit_margin_deviation", "growth_above_terminal" or "capex_above_depreciation"
+    message: str
+    values: Dict[str, float] = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        return f"[{self.scenario}] {self.message}"
+
+def consistency_warnings(historical_df: pd.DataFrame, projections_df: pd.DataFrame, scenario_name: str, averages: Optional[HistoricalAverages] = None) -> List[ConsistencyWarning]:
     """
     Checks for economic consistency between historical and projected data.
-    Returns a list of warning messages.
+    Returns structured warnings (str() gives the formatted message). Pass the
+    company's historical_averages to share them across scenarios.
     """
     warnings = []
+    if averages is None:
+        averages = historical_averages(historical_df)
     
     # Check 1: EBIT Margin Deviation
-    hist_margin = (historical_df["ebit"] / historical_df["revenue"]).mean()
+    hist_margin = averages.ebit_margin
     proj_margin = (projections_df["ebit"] / projections_df["revenue"]).mean()
     
     margin_diff = abs(proj_margin - hist_margin)
     if margin_diff > 0.10: # >10% absolute deviation
-        warnings.append(f"[{scenario_name}] Projected EBIT Margin ({proj_margin:.1%}) diverges significantly from historical avg ({hist_margin:.1%}). Ensure this structural change is justified.")
+        warnings.append(ConsistencyWarning(
+            scenario_name, "ebit_margin_deviation",
+            f"Projected EBIT Margin ({proj_margin:.1%}) diverges significantly from historical avg ({hist_margin:.1%}). Ensure this structural change is justified.",
+            {"projected_margin": float(proj_margin), "historical_margin": float(hist_margin)}
+        ))
         
     # Check 2: Terminal Growth vs Projected Growth
     # If projection growth > terminal g for last year, it implies a fade is missing.
     terminal_g = SETTINGS.scenarios[scenario_name].terminal_g
     last_proj_growth = (projections_df["revenue"].pct_change().iloc[-1])
     
-    if last_proj_growth > terminal_g:
-        warnings.append(f"[{scenario_name}] Last year revenue growth ({last_proj_growth:.1%}) is higher than terminal growth ({terminal_g:.1%}). This implies potentially aggressive terminal value assumption.")
+    if last_proj_growth > terminal_g + GROWTH_TOLERANCE:
+        warnings.append(ConsistencyWarning(
+            scenario_name, "growth_above_terminal",
+            f"Last year revenue growth ({last_proj_growth:.1%}) is higher than terminal growth ({terminal_g:.1%}). This implies potentially aggressive terminal value assumption.",
+            {"last_growth": float(last_proj_growth), "terminal_g": float(terminal_g)}
+        ))
         
     # Check 3: CAPEX vs Depreciation
     # Depreciation should roughly match CAPEX in steady state.
@@ -32,6 +58,17 @@ def check_projection_consistency(historical_df: pd.DataFrame, projections_df: pd
     dep = last_year["depreciation"]
     
     if capex > dep * 1.5:
-        warnings.append(f"[{scenario_name}] Terminal year CAPEX ({capex:,.0f}) is significantly higher than Depreciation ({dep:,.0f}). This implies high persistent growth reinvestment in perpetuity.")
+        warnings.append(ConsistencyWarning(
+            scenario_name, "capex_above_depreciation",
+            f"Terminal year CAPEX ({capex:,.0f}) is significantly higher than Depreciation ({dep:,.0f}). This implies high persistent growth reinvestment in perpetuity.",
+            {"capex": float(capex), "depreciation": float(dep)}
+        ))
         
     return warnings
+
+def check_projection_consistency(historical_df: pd.DataFrame, projections_df: pd.DataFrame, scenario_name: str, averages: Optional[HistoricalAverages] = None) -> List[str]:
+    """
+    Checks for economic consistency between historical and projected data.
+    Returns a list of warning messages.
+    """
+    return [str(w) for w in consistency_warnings(historical_df, projections_df, scenario_name, averages)]
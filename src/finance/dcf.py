@@ -1,7 +1,9 @@
 from dataclasses import dataclass
+import numpy as np
 import pandas as pd
-from typing import Dict
+from typing import Dict, Optional, Tuple
 from config import SETTINGS, ScenarioParams
+from .discounting import discount_factors, discount_times
 
 @dataclass
 class ValuationResult:
@@ -17,52 +19,128 @@ class ValuationResult:
     terminal_share_pct: float
     terminal_share_warning: str
 
+# Terminal value share of EV above which results carry terminal_share_warning
+TERMINAL_SHARE_LIMIT = 0.75
+
+# Valuation outputs of calculate_dcf_arrays, shaped like fcf[..., 0]
+DCF_FIELDS = ("enterprise_value", "equity_value", "terminal_value", "pv_explicit", "pv_terminal", "terminal_share_pct")
+
 def calculate_dcf(projections: pd.DataFrame, scenario: ScenarioParams, net_debt: float, scenario_name: str) -> ValuationResult:
     """
     Calculates Enterprise Value using DCF method.
+    Cash flows are discounted under SETTINGS.discounting (see discount_times);
+    the terminal value takes the last cash flow's discount factor.
+    The valuation runs on the fcf array (calculate_dcf_arrays); the returned
+    projections are the input's columns (shared, not copied; pandas copies on
+    write) followed by period, discount_factor and pv_fcf.
     """
-    wacc = scenario.wacc
-    g = scenario.terminal_g
+    fcf = projections["fcf"].to_numpy(dtype=float)
+    first_year = projections["year"].iloc[0] if "year" in projections.columns else None
+    dcf = calculate_dcf_arrays(fcf, scenario.wacc, scenario.terminal_g, net_debt, discount_times(len(fcf), first_year), out=dcf_buffers((), len(fcf)))
+    terminal_share_pct = dcf["terminal_share_pct"][()]
     
-    # Validation: g must be less than wacc
-    if g >= wacc:
-        raise ValueError(f"Terminal growth (g={g:.1%}) must be less than WACC (wacc={wacc:.1%}) for standard Gordon Growth Model to work.")
-        
-    # Calculate Discount Factors
-    projections = projections.copy()
-    projections["period"] = range(1, len(projections) + 1)
-    projections["discount_factor"] = (1 + wacc) ** -projections["period"]
-    projections["pv_fcf"] = projections["fcf"] * projections["discount_factor"]
+    added = {"period": np.arange(1, len(fcf) + 1), "discount_factor": dcf["discount_factors"], "pv_fcf": dcf["pv_fcf"]}
+    if any(col in projections.columns for col in added):
+        projections = projections.assign(**added)  # re-valued projections keep their column order
+    else:
+        projections = pd.concat([projections, pd.DataFrame(added, index=projections.index)], axis=1)
     
-    pv_explicit = projections["pv_fcf"].sum()
+    return ValuationResult(
+        scenario_name=scenario_name,
+        enterprise_value=dcf["enterprise_value"][()],
+        equity_value=dcf["equity_value"][()],
+        terminal_value=dcf["terminal_value"][()],
+        pv_explicit=dcf["pv_explicit"][()],
+        pv_terminal=dcf["pv_terminal"][()],
+        projections=projections,
+        wacc=scenario.wacc,
+        terminal_g=scenario.terminal_g,
+        terminal_share_pct=terminal_share_pct,
+        terminal_share_warning=terminal_share_warning(terminal_share_pct)
+    )
+
+def dcf_buffers(shape: Tuple[int, ...], years: int) -> Dict[str, np.ndarray]:
+    """
+    Preallocated outputs for calculate_dcf_arrays(out=...): DCF_FIELDS shaped
+    shape, plus discount_factors and pv_fcf shaped shape + (years,). Reused
+    across calls of one shape, they leave only the boolean masks allocating.
+    """
+    buffers = {name: np.empty(shape) for name in DCF_FIELDS}
+    buffers["discount_factors"] = np.empty(shape + (years,))
+    buffers["pv_fcf"] = np.empty(shape + (years,))
+    return buffers
+
+def check_terminal_growth(wacc: np.ndarray, terminal_g: np.ndarray) -> None:
+    """
+    Raises ValueError, naming the first offending pair, if any terminal_g >= wacc.
+    """
+    invalid = terminal_g >= wacc
+    if np.any(invalid):
+        bad_g = np.broadcast_to(terminal_g, invalid.shape)[invalid].flat[0]
+        bad_wacc = np.broadcast_to(wacc, invalid.shape)[invalid].flat[0]
+        raise ValueError(f"Terminal growth (g={bad_g:.1%}) must be less than WACC (wacc={bad_wacc:.1%}) for standard Gordon Growth Model to work.")
+
+def calculate_dcf_arrays(fcf: np.ndarray, wacc: np.ndarray, terminal_g: np.ndarray, net_debt: np.ndarray, times: Optional[np.ndarray] = None, out: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+    """
+    Vectorized DCF over stacked projections.
+    fcf has the forecast years on its last axis; wacc, terminal_g and net_debt must
+    broadcast against fcf[..., 0]. times are the discount times (default
+    discount_times for fcf's years; per-entry schedules broadcast against fcf).
+    Uses exactly the same formulas as calculate_dcf.
+    Returns a dictionary of DCF_FIELDS arrays shaped like the broadcast of the
+    inputs, plus the discount_factors. Every step writes into its output array
+    in place; with out (from dcf_buffers for that shape) those arrays are the
+    given buffers, nothing but masks is allocated per call, and the per-year
+    present values are returned too (pv_fcf).
+    """
+    fcf = np.asarray(fcf, dtype=float)
+    wacc = np.asarray(wacc, dtype=float)
+    g = np.asarray(terminal_g, dtype=float)
     
-    # Terminal Value
-    last_fcf = projections.iloc[-1]["fcf"]
-    terminal_value = last_fcf * (1 + g) / (wacc - g)
+    check_terminal_growth(wacc, g)
     
-    # Discount TV to present
-    pv_terminal = terminal_value * projections.iloc[-1]["discount_factor"]
+    # Discount Factors (at wacc's own shape unless writing to a full-size buffer)
+    if times is None:
+        times = discount_times(fcf.shape[-1])
+    if out is None:
+        factors = discount_factors(wacc, times)
+        # The fcf * factors product is freed before the outputs are allocated, so they reuse its pages
+        pv_explicit = (fcf * factors).sum(axis=-1)
+        shape = np.broadcast_shapes(pv_explicit.shape, g.shape, np.shape(net_debt))
+        if pv_explicit.shape != shape:
+            pv_explicit = np.broadcast_to(pv_explicit, shape).copy()
+        out = {name: np.empty(shape) for name in DCF_FIELDS if name != "pv_explicit"}
+        out["pv_explicit"] = pv_explicit
+    else:
+        factors = discount_factors(np.broadcast_to(wacc, out["discount_factors"].shape[:-1]), times, out["discount_factors"])
+        pv_fcf = np.multiply(fcf, factors, out=out["pv_fcf"])
+        pv_explicit = np.sum(pv_fcf, axis=-1, out=out["pv_explicit"])
     
-    enterprise_value = pv_explicit + pv_terminal
-    equity_value = enterprise_value - net_debt
+    # Terminal Value: fcf_n * (1 + g) / (wacc - g), discounted at the last factor
+    terminal_value, pv_terminal = out["terminal_value"], out["pv_terminal"]
+    np.add(1, g, out=terminal_value)
+    np.multiply(fcf[..., -1], terminal_value, out=terminal_value)
+    np.subtract(wacc, g, out=pv_terminal)
+    np.divide(terminal_value, pv_terminal, out=terminal_value)
+    np.multiply(terminal_value, factors[..., -1], out=pv_terminal)
     
-    # Terminal Share Pct
-    terminal_share_pct = pv_terminal / enterprise_value if enterprise_value != 0 else 0
+    enterprise_value = np.add(pv_explicit, pv_terminal, out=out["enterprise_value"])
+    np.subtract(enterprise_value, net_debt, out=out["equity_value"])
     
-    warning = ""
-    if terminal_share_pct > 0.75:
-        warning = f"High dependence on Terminal Value ({terminal_share_pct:.1%}). Ensure perpetuity assumptions are defensible."
+    terminal_share_pct = out["terminal_share_pct"]
+    terminal_share_pct.fill(0.0)
+    np.divide(pv_terminal, enterprise_value, out=terminal_share_pct, where=enterprise_value != 0)
     
-    return ValuationResult(
-        scenario_name=scenario_name,
-        enterprise_value=enterprise_value,
-        equity_value=equity_value,
-        terminal_value=terminal_value,
-        pv_explicit=pv_explicit,
-        pv_terminal=pv_terminal,
-        projections=projections,
-        wacc=wacc,
-        terminal_g=g,
-        terminal_share_pct=terminal_share_pct,
-        terminal_share_warning=warning
-    )
+    result = {name: out[name] for name in DCF_FIELDS}
+    result["discount_factors"] = factors
+    if "pv_fcf" in out:
+        result["pv_fcf"] = out["pv_fcf"]
+    return result
+
+def terminal_share_warning(terminal_share_pct: float) -> str:
+    """
+    Returns the terminal value dependence warning used by calculate_dcf ("" if none).
+    """
+    if terminal_share_pct > TERMINAL_SHARE_LIMIT:
+        return f"High dependence on Terminal Value ({terminal_share_pct:.1%}). Ensure perpetuity assumptions are defensible."
+    return ""
@@ -0,0 +1,143 @@
+import threading
+import numpy as np
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Optional, Tuple
+from config import SETTINGS, DiscountingConfig
+from ..runtime.instrumentation import count
+
+CONVENTIONS = ("end", "mid", "dates")
+
+def _fiscal_year_end(year: int, month_day: str) -> date:
+    month, day = (int(part) for part in month_day.split("-"))
+    return date(year, month, day)
+
+def _dated_times(years: int, first_year: int, config: DiscountingConfig) -> np.ndarray:
+    """Year fractions from the valuation date to each forecast year's fiscal year end."""
+    if config.valuation_date is not None:
+        valued = date.fromisoformat(config.valuation_date)
+    else:
+        valued = _fiscal_year_end(first_year - 1, config.fiscal_year_end)
+    days = [(_fiscal_year_end(first_year + t, config.fiscal_year_end) - valued).days for t in range(years)]
+    return np.array(days, dtype=float) / config.day_count
+
+def discount_times(years: int, first_year=None, config: Optional[DiscountingConfig] = None) -> np.ndarray:
+    """
+    Time in years from the valuation date to each forecast cash flow
+    (config defaults to SETTINGS.discounting):
+    - "end": cash flows at year ends, 1, 2, ..., years
+    - "mid": cash flows halfway through each year
+    - "dates": XNPV-style, each forecast year dated at its fiscal year end and
+      measured from config.valuation_date in actual days / day_count. Needs
+      first_year (the first forecast year); an array of first years gives
+      first_year.shape + (years,) times.
+    Otherwise returns a (years,) array.
+    """
+    if config is None:
+        config = SETTINGS.discounting
+    if config.convention not in CONVENTIONS:
+        raise ValueError(f"Unknown discounting convention: {config.convention}. Expected one of {CONVENTIONS}")
+    if config.convention == "dates":
+        if first_year is None:
+            raise ValueError("The 'dates' discounting convention needs the first forecast year")
+        first = np.asarray(first_year)
+        unique, inverse = np.unique(first, return_inverse=True)
+        rows = np.stack([_dated_times(years, int(year), config) for year in unique.tolist()])
+        return rows[inverse].reshape(first.shape + (years,))
+
+    ends = np.arange(1, years + 1, dtype=float)
+    if config.convention == "mid":
+        return ends - 0.5
+    return ends
+
+class DiscountTable:
+    """
+    LRU table of discount-factor rows (1 + rate) ** -times keyed by
+    (rate, times), so grids and Monte Carlo chunks that share rates reuse the
+    powers instead of recomputing them. Arrays with more distinct rates than
+    max_rows are computed directly (caching them would only evict the table).
+    """
+    def __init__(self, max_rows: Optional[int] = None):
+        self.max_rows = max_rows if max_rows is not None else SETTINGS.discounting.table_rows
+        self._rows: "OrderedDict[Tuple[float, bytes], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"rows": len(self._rows), "hits": self.hits, "misses": self.misses}
+
+    def _lookup(self, unique: np.ndarray, times: np.ndarray) -> np.ndarray:
+        """Rows for sorted distinct rates, computing the missing ones in one pass."""
+        schedule = times.tobytes()
+        table = np.empty((unique.size, times.size))
+        missing = []
+        with self._lock:
+            for i, rate in enumerate(unique.tolist()):
+                row = self._rows.get((rate, schedule))
+                if row is None:
+                    missing.append(i)
+                else:
+                    self._rows.move_to_end((rate, schedule))
+                    table[i] = row
+            self.hits += unique.size - len(missing)
+            self.misses += len(missing)
+        if missing:
+            table[missing] = (1 + unique[missing][:, None]) ** -times
+            with self._lock:
+                for i in missing:
+                    self._rows[(float(unique[i]), schedule)] = table[i].copy()
+                while len(self._rows) > self.max_rows:
+                    self._rows.popitem(last=False)
+        count("discount_rows_reused", unique.size - len(missing))
+        return table
+
+    def factors(self, rates, times, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Discount factors shaped rates.shape + times.shape[-1:]. times is a
+        (years,) schedule (cached) or any array broadcasting against
+        rates[..., None] (e.g. per-company dated schedules; computed directly).
+        With out (a float array of that shape) the factors are written there.
+        """
+        rates = np.asarray(rates, dtype=float)
+        times = np.asarray(times, dtype=float)
+        if times.ndim != 1:
+            return np.power(1 + rates[..., None], -times, out=out)
+        shape = rates.shape + times.shape
+        if rates.size == 0:
+            return np.empty(shape) if out is None else out
+
+        first = rates.flat[0]
+        if np.all(rates == first):
+            row = self._lookup(np.array([first]), times)[0]
+            if out is None:
+                return np.broadcast_to(row, shape).copy()
+            out[...] = row
+            return out
+        if rates.size > 8 * self.max_rows:
+            return np.power(1 + rates[..., None], -times, out=out)
+        unique, inverse = np.unique(rates, return_inverse=True)
+        if unique.size > self.max_rows:
+            return np.power(1 + rates[..., None], -times, out=out)
+        return np.take(self._lookup(unique, times), inverse.reshape(rates.shape), axis=0, out=out)
+
+# Process-wide table shared by every valuation entry point
+DISCOUNT_TABLE = DiscountTable()
+
+def discount_factors(rates, times=None, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    (1 + rate) ** -time for every rate (any shape) and discount time (default:
+    discount_times over SETTINGS.years_forecast), through DISCOUNT_TABLE;
+    written to out when given.
+    """
+    if times is None:
+        times = discount_times(SETTINGS.years_forecast)
+    return DISCOUNT_TABLE.factors(rates, times, out)
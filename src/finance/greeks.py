@@ -0,0 +1,226 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from config import SETTINGS, ScenarioParams
+from .discounting import discount_times
+from .projections import SCENARIO_DRIVERS, stack_scenario_params
+
+# Driver order of the gradient / Hessian axes (the scalar ScenarioParams fields)
+DRIVERS = list(SCENARIO_DRIVERS)
+
+# Default +/- moves used for tornado swings
+DEFAULT_BUMPS = {
+    "revenue_growth": 0.01,
+    "ebit_margin": 0.01,
+    "wacc": 0.01,
+    "terminal_g": 0.005,
+    "capex_pct_rev": 0.01,
+    "depreciation_pct_capex": 0.05,
+    "nwc_pct_rev_change": 0.01,
+}
+
+@dataclass
+class EVGreeks:
+    """
+    Enterprise value and its exact first and second derivatives with respect to
+    every scenario driver. gradient has shape batch_shape + (n_drivers,) and
+    hessian batch_shape + (n_drivers, n_drivers), drivers ordered as DRIVERS.
+    Equity value has the same derivatives (net debt is a constant). hessian is
+    None for gradient-only Greeks (second_order=False), which support delta and
+    to_frame but not gamma, tornado, swings or driver_ranking.
+    """
+    enterprise_value: np.ndarray
+    gradient: np.ndarray
+    hessian: Optional[np.ndarray]
+    labels: List[str] = field(default_factory=list)  # batch entries (e.g. scenario names), 1-D batches only
+    drivers: List[str] = field(default_factory=lambda: list(DRIVERS))
+
+    def entry(self, label: str) -> "EVGreeks":
+        """The Greeks of one labelled batch entry."""
+        i = self.labels.index(label)
+        return EVGreeks(self.enterprise_value[i], self.gradient[i], None if self.hessian is None else self.hessian[i], drivers=self.drivers)
+
+    def _require_hessian(self, method: str) -> np.ndarray:
+        if self.hessian is None:
+            raise ValueError(f"{method} needs second derivatives; compute the Greeks with second_order=True")
+        return self.hessian
+
+    def delta(self, driver: str) -> np.ndarray:
+        """dEV/d(driver)."""
+        return self.gradient[..., self.drivers.index(driver)]
+
+    def gamma(self, driver: str, other: Optional[str] = None) -> np.ndarray:
+        """d2EV/d(driver)d(other); other defaults to driver."""
+        return self._require_hessian("gamma")[..., self.drivers.index(driver), self.drivers.index(other or driver)]
+
+    def tornado(self, bumps: Optional[Dict[str, float]] = None) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Second-order Taylor estimate of the EV change for moving each driver down
+        and up by its bump (default DEFAULT_BUMPS): driver -> (down, up).
+        """
+        hessian = self._require_hessian("tornado")
+        bumps = {**DEFAULT_BUMPS, **(bumps or {})}
+        moves = {}
+        for i, name in enumerate(self.drivers):
+            h = bumps[name]
+            first, second = self.gradient[..., i] * h, 0.5 * hessian[..., i, i] * h ** 2
+            moves[name] = (-first + second, first + second)
+        return moves
+
+    def swings(self, bumps: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """
+        max(|down|, |up|) per driver, shaped like gradient: the larger EV move of
+        the two bumps. (|up - down| would cancel the gamma term and leave only
+        2 * |delta * h|.)
+        """
+        moves = self.tornado(bumps)
+        return np.stack([np.maximum(np.abs(moves[name][0]), np.abs(moves[name][1])) for name in self.drivers], axis=-1)
+
+    def driver_ranking(self, bumps: Optional[Dict[str, float]] = None) -> List[Tuple[str, float]]:
+        """Drivers sorted by second-order swing (see swings), largest first (single valuation only)."""
+        swings = self.swings(bumps)
+        if swings.ndim != 1:
+            raise ValueError("driver_ranking needs a single valuation; use swings() for batches")
+        return sorted(zip(self.drivers, swings.tolist()), key=lambda item: item[1], reverse=True)
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per batch entry (1-D batches): EV plus d_<driver> columns."""
+        frame = pd.DataFrame({"enterprise_value": np.atleast_1d(self.enterprise_value)}, index=self.labels or None)
+        for i, name in enumerate(self.drivers):
+            frame[f"d_{name}"] = np.atleast_1d(self.gradient[..., i])
+        return frame
+
+def ev_greeks_arrays(last_revenue, revenue_growth, ebit_margin, wacc, terminal_g, capex_pct_rev, depreciation_pct_capex, nwc_pct_rev_change, years: Optional[int] = None, tax_rate: Optional[float] = None, second_order: bool = True, times: Optional[np.ndarray] = None) -> EVGreeks:
+    """
+    Closed-form EV Greeks of project_arrays + calculate_dcf_arrays, vectorized
+    like project_arrays (inputs broadcast to a batch shape). With
+    a = 1 + revenue_growth and v = 1 / (1 + wacc) the model factorizes as
+        FCF_t = R0 * a^(t-1) * q,  q = a*k - (a-1)*nwc,  k = margin*(1-tax) + capex*(dep-1)
+        EV = R0 * q * B,  B = sum_t a^(t-1) v^s_t + a^(N-1) v^s_N (1+g)/(wacc-g)
+    with s_t the discount times (default discount_times(years); s_t = t at year end),
+    so every derivative is a product-rule combination of derivatives of q and B.
+    second_order=False skips the Hessian (left None).
+    """
+    if years is None:
+        years = SETTINGS.years_forecast
+    if times is None:
+        times = discount_times(years)
+    if tax_rate is None:
+        tax_rate = SETTINGS.tax_rate
+
+    r0, gr, m, w, g, c, d, n, tau = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (last_revenue, revenue_growth, ebit_margin, wacc, terminal_g, capex_pct_rev, depreciation_pct_capex, nwc_pct_rev_change, tax_rate))
+    )
+
+    # Validation: g must be less than wacc
+    invalid = g >= w
+    if np.any(invalid):
+        raise ValueError(f"Terminal growth (g={g[invalid].flat[0]:.1%}) must be less than WACC (wacc={w[invalid].flat[0]:.1%}) for standard Gordon Growth Model to work.")
+
+    # Explicit-period discounted growth terms and their (a, wacc) derivatives, per year
+    t = np.arange(1, years + 1)
+    s = np.asarray(times, dtype=float)
+    a_t = (1 + gr)[..., None]
+    v = (1 / (1 + w))[..., None]
+    vt = v ** s
+    term = a_t ** (t - 1) * vt
+    term_a = (t - 1) * a_t ** np.maximum(t - 2, 0) * vt
+    term_w = -s * v * term
+
+    # Gordon factor G = (1+g)/(wacc-g) and its derivatives
+    spread = w - g
+    G = (1 + g) / spread
+    G_g = (1 + w) / spread ** 2
+    G_w = -(1 + g) / spread ** 2
+
+    last = lambda x: x[..., -1]
+    B = term.sum(axis=-1) + last(term) * G
+    B_a = term_a.sum(axis=-1) + last(term_a) * G
+    B_w = term_w.sum(axis=-1) + last(term_w) * G + last(term) * G_w
+    B_g = last(term) * G_g
+
+    # Cash-flow factor q and its derivatives
+    k = m * (1 - tau) + c * (d - 1)
+    a = 1 + gr
+    q = a * k - gr * n
+
+    index = {name: i for i, name in enumerate(DRIVERS)}
+    zeros = np.zeros_like(q)
+    batch = q.shape
+    n_drivers = len(DRIVERS)
+
+    q_grad = np.zeros(batch + (n_drivers,))
+    q_grad[..., index["revenue_growth"]] = k - n
+    q_grad[..., index["ebit_margin"]] = a * (1 - tau)
+    q_grad[..., index["capex_pct_rev"]] = a * (d - 1)
+    q_grad[..., index["depreciation_pct_capex"]] = a * c
+    q_grad[..., index["nwc_pct_rev_change"]] = -gr
+
+    B_grad = np.zeros(batch + (n_drivers,))
+    B_grad[..., index["revenue_growth"]] = B_a
+    B_grad[..., index["wacc"]] = B_w
+    B_grad[..., index["terminal_g"]] = B_g
+
+    r = r0[..., None]
+    gradient = r * (q_grad * B[..., None] + q[..., None] * B_grad)
+    if not second_order:
+        return EVGreeks(enterprise_value=r0 * q * B, gradient=gradient, hessian=None)
+
+    term_aa = (t - 1) * (t - 2) * a_t ** np.maximum(t - 3, 0) * vt
+    term_ww = s * (s + 1) * v ** 2 * term
+    term_aw = -s * v * term_a
+    G_gg = 2 * (1 + w) / spread ** 3
+    G_ww = 2 * (1 + g) / spread ** 3
+    G_wg = 1 / spread ** 2 - 2 * (1 + w) / spread ** 3
+    B_aa = term_aa.sum(axis=-1) + last(term_aa) * G
+    B_ww = term_ww.sum(axis=-1) + last(term_ww) * G + 2 * last(term_w) * G_w + last(term) * G_ww
+    B_gg = last(term) * G_gg
+    B_aw = term_aw.sum(axis=-1) + last(term_aw) * G + last(term_a) * G_w
+    B_ag = last(term_a) * G_g
+    B_wg = last(term_w) * G_g + last(term) * G_wg
+
+    def symmetric(entries: Dict[Tuple[str, str], np.ndarray]) -> np.ndarray:
+        out = np.zeros(batch + (n_drivers, n_drivers))
+        for (x, y), value in entries.items():
+            out[..., index[x], index[y]] = value
+            out[..., index[y], index[x]] = value
+        return out
+
+    q_hess = symmetric({
+        ("revenue_growth", "ebit_margin"): 1 - tau,
+        ("revenue_growth", "capex_pct_rev"): d - 1,
+        ("revenue_growth", "depreciation_pct_capex"): c,
+        ("revenue_growth", "nwc_pct_rev_change"): zeros - 1,
+        ("capex_pct_rev", "depreciation_pct_capex"): a,
+    })
+    B_hess = symmetric({
+        ("revenue_growth", "revenue_growth"): B_aa,
+        ("wacc", "wacc"): B_ww,
+        ("terminal_g", "terminal_g"): B_gg,
+        ("revenue_growth", "wacc"): B_aw,
+        ("revenue_growth", "terminal_g"): B_ag,
+        ("wacc", "terminal_g"): B_wg,
+    })
+
+    cross = q_grad[..., :, None] * B_grad[..., None, :]
+    hessian = r[..., None] * (q_hess * B[..., None, None] + cross + np.swapaxes(cross, -1, -2) + q[..., None, None] * B_hess)
+
+    return EVGreeks(enterprise_value=r0 * q * B, gradient=gradient, hessian=hessian)
+
+def calculate_greeks(historical_df: pd.DataFrame, scenarios: Optional[Dict[str, ScenarioParams]] = None) -> EVGreeks:
+    """
+    EV Greeks of every scenario (default SETTINGS.scenarios) in one vectorized
+    evaluation, projected from the last historical revenue as project_financials does.
+    The closed form assumes constant drivers, so scheduled scenarios are rejected.
+    """
+    if scenarios is None:
+        scenarios = SETTINGS.scenarios
+    scheduled = [name for name, params in scenarios.items() if params.schedules]
+    if scheduled:
+        raise ValueError(f"Analytic Greeks need constant drivers; scenarios with schedules: {scheduled}")
+    params = stack_scenario_params(scenarios)
+    times = discount_times(SETTINGS.years_forecast, int(historical_df.iloc[-1]["year"]) + 1)
+    greeks = ev_greeks_arrays(float(historical_df.iloc[-1]["revenue"]), *(params[name] for name in DRIVERS), times=times)
+    greeks.labels = list(scenarios)
+    return greeks
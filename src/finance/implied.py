@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Sequence, Tuple, Union
+from config import SETTINGS, ScenarioParams
+from .discounting import discount_times
+from .greeks import DRIVERS, ev_greeks_arrays
+
+# Search interval per driver before the g < wacc constraint is applied
+DEFAULT_BRACKETS = {
+    "revenue_growth": (-0.5, 1.0),
+    "ebit_margin": (-1.0, 1.0),
+    "wacc": (0.0, 1.0),
+    "terminal_g": (-0.5, 0.5),
+    "capex_pct_rev": (0.0, 1.0),
+    "depreciation_pct_capex": (0.0, 3.0),
+    "nwc_pct_rev_change": (-1.0, 1.0),
+}
+# Closest wacc and terminal_g may get while solving for either
+MIN_SPREAD = 1e-6
+
+STATUSES = ("converged", "no_bracket", "max_iter")
+
+@dataclass
+class ImpliedSolution:
+    """
+    Reverse-DCF result per target (arrays shaped like the broadcast inputs).
+    value is NaN where the solve did not converge.
+    """
+    driver: str
+    value: np.ndarray
+    residual: np.ndarray  # equity value at value minus target
+    iterations: np.ndarray
+    newton_steps: np.ndarray  # iterations that took the Newton step (the rest bisected)
+    status: np.ndarray  # one of STATUSES
+    lower: np.ndarray  # final bracket
+    upper: np.ndarray
+
+    @property
+    def converged(self) -> np.ndarray:
+        return self.status == "converged"
+
+    def summary(self) -> str:
+        counts = {status: int(np.sum(self.status == status)) for status in STATUSES}
+        iterations = self.iterations[self.converged]
+        detail = f", {iterations.mean():.1f} iterations on average (max {iterations.max()})" if iterations.size else ""
+        return f"implied {self.driver}: " + ", ".join(f"{n} {s}" for s, n in counts.items() if n) + detail
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per target (flattened)."""
+        return pd.DataFrame({key: np.ravel(value) for key, value in asdict(self).items() if key != "driver"})
+
+def _equity_and_slope(driver: str, x: np.ndarray, last_revenue: np.ndarray, params: Dict[str, np.ndarray], net_debt: np.ndarray, years: Optional[int], tax_rate: Optional[np.ndarray], times: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    values = dict(params, **{driver: x})
+    greeks = ev_greeks_arrays(last_revenue, *(values[name] for name in DRIVERS), years=years, tax_rate=tax_rate, second_order=False, times=times)
+    return greeks.enterprise_value - net_debt, greeks.delta(driver)
+
+def solve_implied(driver: str, target_equity, last_revenue, params: Dict[str, Union[float, np.ndarray]], net_debt=0.0, bracket: Optional[Tuple[float, float]] = None, tol: float = 1e-10, max_iter: int = 100, years: Optional[int] = None, tax_rate: Optional[float] = None, times: Optional[np.ndarray] = None) -> ImpliedSolution:
+    """
+    Finds the value of one driver at which the DCF equity value equals
+    target_equity (e.g. a market cap), for every target at once. Targets, last
+    revenue, net debt and the other drivers (params, keyed by ScenarioParams
+    field) broadcast together, so thousands of companies/targets solve in one
+    vectorized loop.
+
+    Safeguarded Newton: each iteration takes the Newton step with the analytic
+    slope (greeks) when it stays inside the current sign-change bracket and
+    bisects otherwise, so it converges wherever the bracket holds a root.
+    Solving for wacc or terminal_g keeps g < wacc (bracket clipped by MIN_SPREAD).
+    Converged when |residual| <= tol * max(1, |target|) or the bracket shrinks
+    below tol. times are the discount times shared by every target (default
+    discount_times).
+    """
+    if driver not in DRIVERS:
+        raise ValueError(f"Unknown driver: {driver}. Expected one of {DRIVERS}")
+    missing = [name for name in DRIVERS if name != driver and name not in params]
+    if missing:
+        raise ValueError(f"Missing driver values: {missing}")
+
+    inputs = [target_equity, last_revenue, net_debt] + [params[name] for name in DRIVERS if name != driver]
+    broadcast = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in inputs))
+    shape = broadcast[0].shape
+    target, revenue, debt = (x.ravel() for x in broadcast[:3])
+    others = {name: x.ravel() for name, x in zip([n for n in DRIVERS if n != driver], broadcast[3:])}
+    tax = None if tax_rate is None else np.full(target.shape, float(tax_rate))
+    size = target.size
+
+    low, high = bracket or DEFAULT_BRACKETS[driver]
+    lower, upper = np.full(size, float(low)), np.full(size, float(high))
+    if driver == "wacc":
+        lower = np.maximum(lower, others["terminal_g"] + MIN_SPREAD)
+    elif driver == "terminal_g":
+        upper = np.minimum(upper, others["wacc"] - MIN_SPREAD)
+
+    def evaluate(idx: np.ndarray, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        sub = {name: values[idx] for name, values in others.items()}
+        equity, slope = _equity_and_slope(driver, x, revenue[idx], sub, debt[idx], years, None if tax is None else tax[idx], times)
+        return equity - target[idx], slope
+
+    everyone = np.arange(size)
+    f_lower, _ = evaluate(everyone, lower)
+    f_upper, _ = evaluate(everyone, upper)
+    scale = np.maximum(1.0, np.abs(target))
+
+    value = np.full(size, np.nan)
+    residual = np.full(size, np.nan)
+    iterations = np.zeros(size, dtype=int)
+    newton_steps = np.zeros(size, dtype=int)
+    status = np.full(size, "max_iter", dtype=object)
+
+    # Endpoint roots, then the entries without a sign change
+    for end, f_end in ((lower, f_lower), (upper, f_upper)):
+        hit = np.abs(f_end) <= tol * scale
+        value[hit], residual[hit], status[hit] = end[hit], f_end[hit], "converged"
+    bracketed = np.sign(f_lower) != np.sign(f_upper)
+    status[~bracketed & (status != "converged")] = "no_bracket"
+
+    active = np.flatnonzero(status == "max_iter")
+    x = 0.5 * (lower[active] + upper[active])
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        f, slope = evaluate(active, x)
+        iterations[active] += 1
+
+        done = (np.abs(f) <= tol * scale[active]) | (upper[active] - lower[active] <= tol)
+        value[active[done]], residual[active[done]], status[active[done]] = x[done], f[done], "converged"
+
+        # Keep the sign change between lower and upper
+        same_as_lower = np.sign(f) == np.sign(f_lower[active])
+        lower[active] = np.where(same_as_lower, x, lower[active])
+        f_lower[active] = np.where(same_as_lower, f, f_lower[active])
+        upper[active] = np.where(same_as_lower, upper[active], x)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = x - f / slope
+        inside = np.isfinite(newton) & (newton > lower[active]) & (newton < upper[active])
+        newton_steps[active] += inside
+        x = np.where(inside, newton, 0.5 * (lower[active] + upper[active]))
+
+        keep = ~done
+        active, x = active[keep], x[keep]
+
+    reshape = lambda a: a.reshape(shape)
+    return ImpliedSolution(
+        driver=driver,
+        value=reshape(value),
+        residual=reshape(residual),
+        iterations=reshape(iterations),
+        newton_steps=reshape(newton_steps),
+        status=reshape(status.astype(str)),
+        lower=reshape(lower),
+        upper=reshape(upper),
+    )
+
+def implied_assumption(historical_df: pd.DataFrame, scenario: ScenarioParams, driver: str, market_cap: Union[float, Sequence[float]], net_debt: Optional[float] = None, **kwargs) -> ImpliedSolution:
+    """
+    Single company: the driver value (other drivers from scenario) at which the
+    equity value equals each market cap. Extra keyword arguments go to solve_implied.
+    """
+    if scenario.schedules:
+        raise ValueError("implied_assumption needs constant drivers; the scenario has schedules")
+    if net_debt is None:
+        net_debt = SETTINGS.net_debt
+    params = {name: getattr(scenario, name) for name in DRIVERS}
+    kwargs.setdefault("times", discount_times(kwargs.get("years") or SETTINGS.years_forecast, int(historical_df.iloc[-1]["year"]) + 1))
+    return solve_implied(driver, market_cap, float(historical_df.iloc[-1]["revenue"]), params, net_debt, **kwargs)
@@ -0,0 +1,101 @@
+"""
+Fused projection + DCF kernel for Monte Carlo draws. For each draw one pass
+over the forecast years runs the revenue recurrence, FCF, discounting, terminal
+value and EV, so none of the (draws, years) temporaries of project_arrays +
+calculate_dcf_arrays are allocated. With numba installed the loop is compiled
+and runs in parallel across draws; without it enterprise_values uses those
+NumPy array kernels instead (same formulas, same results up to rounding).
+"""
+import numpy as np
+from typing import Mapping, Optional
+from config import SETTINGS, KERNELS
+from .dcf import calculate_dcf_arrays, check_terminal_growth
+from .discounting import discount_times
+from .projections import project_arrays
+
+try:
+    import numba
+    prange = numba.prange
+except ImportError:
+    numba = None
+    prange = range
+
+def _fused_ev_loop(last_revenue, revenue_growth, ebit_margin, capex_pct_rev, depreciation_pct_capex, nwc_pct_rev_change, tax_rate, wacc, terminal_g, times, out):
+    """
+    EV of draw i into out[i]. Drivers are (n, years) arrays (broadcast views
+    are fine), last_revenue, tax_rate, wacc and terminal_g are (n,), times (years,).
+    Plain Python when numba is missing (slow; kept for parity checks).
+    """
+    n, years = revenue_growth.shape
+    for i in prange(n):
+        revenue = last_revenue[i]
+        pv_explicit = 0.0
+        fcf = 0.0
+        factor = 1.0
+        for t in range(years):
+            previous = revenue
+            revenue = previous * (1 + revenue_growth[i, t])
+            nopat = revenue * ebit_margin[i, t] * (1 - tax_rate[i])
+            capex = revenue * capex_pct_rev[i, t]
+            depreciation = capex * depreciation_pct_capex[i, t]
+            delta_nwc = (revenue - previous) * nwc_pct_rev_change[i, t]
+            fcf = nopat + depreciation - capex - delta_nwc
+            factor = (1 + wacc[i]) ** -times[t]
+            pv_explicit += fcf * factor
+        terminal_value = fcf * (1 + terminal_g[i]) / (wacc[i] - terminal_g[i])
+        out[i] = pv_explicit + terminal_value * factor
+
+_fused_ev_compiled = numba.njit(parallel=True, cache=True)(_fused_ev_loop) if numba is not None else None
+
+def resolve_kernel(kernel: Optional[str] = None) -> str:
+    """
+    "numba" or "numpy" for kernel (default SETTINGS.monte_carlo.kernel);
+    "auto" picks numba when it is installed.
+    """
+    if kernel is None:
+        kernel = SETTINGS.monte_carlo.kernel
+    if kernel not in KERNELS:
+        raise ValueError(f"Unknown kernel: {kernel!r}. Expected one of {KERNELS}")
+    if kernel == "auto":
+        return "numba" if numba is not None else "numpy"
+    if kernel == "numba" and numba is None:
+        raise ImportError("The 'numba' kernel requires numba (pip install numba); use kernel='auto' or 'numpy' otherwise.")
+    return kernel
+
+def enterprise_values(last_revenue, revenue_growth, ebit_margin, capex_pct_rev, depreciation_pct_capex, nwc_pct_rev_change, wacc, terminal_g, times: Optional[np.ndarray] = None, tax_rate: Optional[float] = None, schedules: Optional[Mapping[str, np.ndarray]] = None, kernel: Optional[str] = None) -> np.ndarray:
+    """
+    (n,) enterprise values of project_arrays(...) valued by calculate_dcf_arrays.
+    Drivers are scalars or (n,) arrays, schedules (n, years) paths as for
+    project_arrays; times are shared discount times (default discount_times).
+    kernel is "auto", "numba" or "numpy" (see resolve_kernel).
+    """
+    if times is None:
+        times = discount_times(SETTINGS.years_forecast)
+    if tax_rate is None:
+        tax_rate = SETTINGS.tax_rate
+    times = np.asarray(times, dtype=float)
+    if resolve_kernel(kernel) == "numpy":
+        fcf = project_arrays(last_revenue, revenue_growth, ebit_margin, capex_pct_rev, depreciation_pct_capex, nwc_pct_rev_change,
+                             years=times.shape[-1], tax_rate=tax_rate, schedules=schedules).fcf
+        return calculate_dcf_arrays(fcf, wacc, terminal_g, 0.0, times)["enterprise_value"]
+
+    if times.ndim != 1:
+        raise ValueError(f"The numba kernel takes shared (years,) discount times, got shape {times.shape}")
+    years = len(times)
+    drivers = {"revenue_growth": revenue_growth, "ebit_margin": ebit_margin, "capex_pct_rev": capex_pct_rev,
+               "depreciation_pct_capex": depreciation_pct_capex, "nwc_pct_rev_change": nwc_pct_rev_change}
+    per_draw = [np.asarray(x, dtype=float) for x in (last_revenue, tax_rate, wacc, terminal_g)]
+    yearly = {name: np.asarray(value, dtype=float)[..., None] for name, value in drivers.items()}
+    for name, path in (schedules or {}).items():
+        if name not in yearly or np.shape(path)[-1:] != (years,):
+            raise ValueError(f"Schedule for {name} must be a known driver with {years} yearly values, got shape {np.shape(path)}")
+        yearly[name] = np.asarray(path, dtype=float)
+    n = np.broadcast_shapes(*(x.shape for x in per_draw), *(path.shape[:-1] for path in yearly.values()))
+    if len(n) != 1:
+        raise ValueError(f"The numba kernel values a 1-d batch of draws, got batch shape {n}")
+    last_revenue, tax_rate, wacc, g = (np.broadcast_to(x, n) for x in per_draw)
+    check_terminal_growth(wacc, g)
+
+    out = np.empty(n)
+    _fused_ev_compiled(last_revenue, *(np.broadcast_to(yearly[name], n + (years,)) for name in drivers), tax_rate, wacc, g, times, out)
+    return out
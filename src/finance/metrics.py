@@ -1,22 +1,227 @@
 import pandas as pd
 import numpy as np
-from typing import Dict
+from dataclasses import dataclass
+from typing import List, Mapping, Optional, Tuple
 from config import SETTINGS
+from ..io.loaders import QUARTER_COL, QUARTERS_PER_YEAR, period_index
 
-def calculate_historical_metrics(data_dict: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+STATEMENTS = ["income_statement", "balance_sheet", "cash_flow"]
+
+# Flow items summed over the trailing four quarters of quarterly statements; the
+# other (balance sheet) columns are point-in-time and taken at quarter end
+FLOW_COLUMNS = ["revenue", "cogs", "opex", "depreciation", "interest_expense", "taxes", "cfo", "capex", "cfi_other", "cff_other"]
+
+# Ratios added by rolling_averages: name -> (numerator, denominator)
+RATIO_COLUMNS = {
+    "ebit_margin": ("ebit", "revenue"),
+    "capex_pct_rev": ("capex_abs", "revenue"),
+    "depreciation_pct_capex": ("depreciation", "capex_abs"),
+}
+
+@dataclass
+class HistoricalAverages:
+    """
+    Mean historical ratios of one company, computed once and shared by every
+    scenario's consistency checks.
+    """
+    ebit_margin: float
+    capex_pct_rev: float
+    depreciation_pct_capex: float
+    revenue_growth: float  # mean year-over-year growth (TTM rows compare with four quarters earlier)
+    periods: int
+
+def calculate_historical_metrics(data_dict: Mapping[str, pd.DataFrame]) -> pd.DataFrame:
     """
     Merges dataframes and calculates historical FCF and other metrics.
+    Quarterly statements (with a quarter column) give one trailing-twelve-month
+    row per quarter (see calculate_ttm_metrics).
+    """
+    return statement_metrics(data_dict)
+
+def statement_metrics(data_dict: Mapping[str, pd.DataFrame], group_col: Optional[str] = None) -> pd.DataFrame:
+    """
+    Aligns the three statements (align_statements) and applies the metric
+    formulas, per group_col group when given (e.g. "company" for a panel).
+    Returns the frame sorted by (group_col, year[, quarter]).
+    """
+    merged = align_statements(data_dict, group_col)
+    if QUARTER_COL in merged.columns:
+        return calculate_ttm_metrics(merged, group_col)
+    return apply_metric_formulas(merged, group_col)
+
+def _sorted_codes(frames: List[pd.DataFrame], group_col: Optional[str]) -> List[Tuple[np.ndarray, Optional[np.ndarray]]]:
+    """
+    Integer row key per statement, ordered like (group, period) and comparable
+    across statements, sorted: (sorted keys, row order or None if already sorted).
+    """
+    periods = [np.asarray(period_index(df), dtype=np.int64) for df in frames]
+    codes = periods
+    if group_col is not None:
+        # Sorted group codes shared by all statements (hash factorize, only the distinct groups are sorted)
+        group_codes, _ = pd.factorize(pd.concat([df[group_col] for df in frames], ignore_index=True), sort=True)
+        bounds = np.cumsum([0] + [len(df) for df in frames])
+        stacked = np.concatenate(periods)
+        low = stacked.min() if stacked.size else 0
+        span = (stacked.max() - low + 1) if stacked.size else 1
+        codes = [group_codes[start:end] * span + (p - low) for start, end, p in zip(bounds[:-1], bounds[1:], periods)]
+
+    ordered = []
+    for code in codes:
+        if np.all(code[1:] > code[:-1]):
+            ordered.append((code, None))
+        else:
+            order = np.argsort(code, kind="stable")
+            ordered.append((code[order], order))
+    return ordered
+
+def align_statements(data_dict: Mapping[str, pd.DataFrame], group_col: Optional[str] = None) -> pd.DataFrame:
+    """
+    Inner join of the three statements on (group_col, year[, quarter]) with
+    sorted-array operations instead of repeated hash merges: every statement
+    gets an integer row key, the keys present in all of them come from
+    np.intersect1d and each statement is gathered by position. Rows come out
+    sorted by key (keys are assumed unique, as validate_data enforces).
+    """
+    frames = [data_dict[key] for key in STATEMENTS]
+    keys = ([group_col] if group_col is not None else []) + ["year"] + ([QUARTER_COL] if QUARTER_COL in frames[0].columns else [])
+    shared = set(frames[0].columns).intersection(*(df.columns for df in frames[1:])) - set(keys)
+    if shared:
+        raise ValueError(f"Statements share non-key columns: {sorted(shared)}")
+
+    ordered = _sorted_codes(frames, group_col)
+    common = ordered[0][0]
+    for code, _ in ordered[1:]:
+        if not np.array_equal(code, common):
+            common = np.intersect1d(common, code, assume_unique=True)
+
+    parts = []
+    for i, (df, (code, order)) in enumerate(zip(frames, ordered)):
+        columns = list(df.columns) if i == 0 else [col for col in df.columns if col not in keys]
+        if order is None and len(code) == len(common):
+            part = df[columns]
+        else:
+            rows = np.searchsorted(code, common)
+            part = df[columns].iloc[rows if order is None else order[rows]]
+        parts.append(part.reset_index(drop=True))
+    return pd.concat(parts, axis=1)
+
+def trailing_twelve_months(merged: pd.DataFrame, group_col: Optional[str] = None) -> pd.DataFrame:
+    """
+    Quarterly statements (sorted by group_col, year, quarter) to one
+    trailing-twelve-month row per quarter: FLOW_COLUMNS summed over the quarter
+    and the three before it, balance-sheet columns as of the quarter end.
+    Windows that are not four consecutive quarters of the same group are NaN.
+    """
+    n = len(merged)
+    periods = period_index(merged)
+    complete = np.zeros(n, dtype=bool)
+    if n >= QUARTERS_PER_YEAR:
+        back = QUARTERS_PER_YEAR - 1
+        window = periods[back:] - periods[:-back] == back
+        if group_col is not None:
+            groups, _ = pd.factorize(merged[group_col])
+            window &= groups[back:] == groups[:-back]
+        complete[back:] = window
+
+    ttm = merged.copy()
+    for col in FLOW_COLUMNS:
+        if col not in ttm.columns:
+            continue
+        values = merged[col].to_numpy(dtype=float)
+        total = np.full(n, np.nan)
+        # Direct four-term sums (no running cumsum, so no drift over long histories)
+        total[QUARTERS_PER_YEAR - 1:] = sum(values[k:n - QUARTERS_PER_YEAR + 1 + k] for k in range(QUARTERS_PER_YEAR))
+        total[~complete] = np.nan
+        ttm[col] = total
+    return ttm
+
+def calculate_ttm_metrics(merged: pd.DataFrame, group_col: Optional[str] = None) -> pd.DataFrame:
+    """
+    Metric formulas on trailing-twelve-month rows of quarterly statements. The
+    NWC change is year over year (against the quarter four periods earlier), so
+    every row reads like an annual one. Quarters without a full TTM window are dropped.
+    """
+    ttm = apply_metric_formulas(trailing_twelve_months(merged, group_col), group_col, lag=QUARTERS_PER_YEAR)
+    return ttm[ttm["revenue"].notna().to_numpy()].reset_index(drop=True)
+
+def rolling_averages(metrics: pd.DataFrame, years: Optional[int] = None, group_col: Optional[str] = None) -> pd.DataFrame:
+    """
+    Adds the RATIO_COLUMNS and their trailing means over the last `years` years
+    (default SETTINGS.metrics.rolling_years; four rows per year for TTM rows) as
+    <ratio>_avg. Windows reaching into the previous group or before the first
+    row are NaN. Rows must be sorted by (group_col, period), as
+    statement_metrics returns them.
+    """
+    if years is None:
+        years = SETTINGS.metrics.rolling_years
+    if years < 1:
+        raise ValueError(f"years must be positive, got {years}")
+    window = years * (QUARTERS_PER_YEAR if QUARTER_COL in metrics.columns else 1)
+    n = len(metrics)
+
+    for name, (numerator, denominator) in RATIO_COLUMNS.items():
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = metrics[numerator].to_numpy(dtype=float) / metrics[denominator].to_numpy(dtype=float)
+        average = np.full(n, np.nan)
+        if n >= window:
+            average[window - 1:] = np.lib.stride_tricks.sliding_window_view(ratio, window).sum(axis=-1) / window
+            if group_col is not None:
+                groups, _ = pd.factorize(metrics[group_col])
+                average[window - 1:][groups[window - 1:] != groups[:n - window + 1]] = np.nan
+        metrics[name] = ratio
+        metrics[f"{name}_avg"] = average
+    return metrics
+
+def historical_averages(historical_df: pd.DataFrame) -> HistoricalAverages:
+    """Mean ratios of one company's historical metrics (NaN ratios skipped)."""
+    lag = QUARTERS_PER_YEAR if QUARTER_COL in historical_df.columns else 1
+    revenue = historical_df["revenue"]
+    return HistoricalAverages(
+        ebit_margin=float((historical_df["ebit"] / historical_df["revenue"]).mean()),
+        capex_pct_rev=float((historical_df["capex_abs"] / revenue).mean()),
+        depreciation_pct_capex=float((historical_df["depreciation"] / historical_df["capex_abs"]).mean()),
+        revenue_growth=float((revenue / revenue.shift(lag) - 1).mean()),
+        periods=len(historical_df),
+    )
+
+def panel_averages(metrics: pd.DataFrame, group_col: str) -> pd.DataFrame:
+    """
+    Mean ebit_margin, capex_pct_rev and depreciation_pct_capex per group of a
+    sorted panel, from contiguous group runs (np.add.reduceat) rather than a
+    hash groupby. NaN ratios are skipped. Indexed by group.
+    """
+    codes, names = pd.factorize(metrics[group_col])
+    if len(codes) == 0:
+        return pd.DataFrame(columns=list(RATIO_COLUMNS))
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    averages = {}
+    for name, (numerator, denominator) in RATIO_COLUMNS.items():
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = metrics[numerator].to_numpy(dtype=float) / metrics[denominator].to_numpy(dtype=float)
+        finite = np.isfinite(ratio)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            averages[name] = np.add.reduceat(np.where(finite, ratio, 0.0), starts) / np.add.reduceat(finite.astype(float), starts)
+    return pd.DataFrame(averages, index=pd.Index(names[codes[starts]], name=group_col))
+
+def apply_metric_formulas(merged: pd.DataFrame, group_col: Optional[str] = None, lag: int = 1) -> pd.DataFrame:
+    """
+    Applies the historical metric formulas (NWC, EBIT, NOPAT, FCF) to an already
+    merged statement frame. When group_col is given (e.g. "company" for a panel),
+    the year-over-year NWC change is computed within each group; the frame must
+    then be sorted by (group_col, year). lag is the number of rows per year
+    (4 for quarterly rows, whose NWC change is 0 across a gap in the quarters).
     """
-    # Merge on year
-    is_df = data_dict["income_statement"]
-    bs_df = data_dict["balance_sheet"]
-    cf_df = data_dict["cash_flow"]
-    
-    merged = is_df.merge(bs_df, on="year", how="inner").merge(cf_df, on="year", how="inner")
-    
     # Calculate NWC
     merged["nwc"] = merged["receivables"] + merged["inventory"] - merged["payables"]
-    merged["delta_nwc"] = merged["nwc"].diff().fillna(0) # First year delta is 0 or needs prior context. We assume 0 for simplicity.
+    change = merged["nwc"].diff(lag)
+    if QUARTER_COL in merged.columns:
+        change = change.mask(pd.Series(period_index(merged), index=merged.index).diff(lag).ne(lag), 0)
+    if group_col is None:
+        merged["delta_nwc"] = change.fillna(0) # First year delta is 0 or needs prior context. We assume 0 for simplicity.
+    else:
+        # Sorted panel: a plain diff is correct except on each group's first year
+        first_row = merged[group_col].ne(merged[group_col].shift(lag))
+        merged["delta_nwc"] = change.mask(first_row, 0).fillna(0)
 
     # Calculate EBIT
     # Assuming opex includes depreciation? The CSV has depreciation separately.
@@ -45,4 +250,4 @@ def calculate_historical_metrics(data_dict: Dict[str, pd.DataFrame]) -> pd.DataF
     merged["capex_abs"] = merged["capex"].abs()
     merged["fcf"] = merged["nopat"] + merged["depreciation"] - merged["capex_abs"] - merged["delta_nwc"]
     
-    return merged.sort_values("year")
+    return merged
@@ -0,0 +1,337 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, replace
+from functools import partial
+from typing import Dict, List, Optional
+from config import SETTINGS, Distribution, MonteCarloConfig
+from .projections import SCENARIO_DRIVERS, driver_paths
+from .kernels import enterprise_values, resolve_kernel
+from .discounting import discount_times
+from ..runtime.executor import Executor
+from ..runtime.instrumentation import count
+
+DRIVERS = ["revenue_growth", "ebit_margin", "wacc", "terminal_g"]
+
+def _normal_cdf(z: np.ndarray) -> np.ndarray:
+    """
+    Standard normal CDF via the Abramowitz-Stegun 7.1.26 erf approximation
+    (abs. error < 1.5e-7), vectorized so copula draws avoid a SciPy dependency.
+    """
+    x = np.abs(z) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-x * x)
+    return 0.5 * (1.0 + np.sign(z) * erf)
+
+def check_distribution(name: str, dist: Distribution) -> None:
+    """
+    Raises ValueError for a distribution that cannot be sampled: uniform and
+    triangular need finite low < high (and low <= mode <= high), normal std >= 0
+    and clip bounds low <= high.
+    """
+    if dist.kind not in ("normal", "uniform", "triangular", "fixed"):
+        raise ValueError(f"Unknown distribution kind for {name}: {dist.kind}")
+    if dist.kind == "normal" and not dist.std >= 0:
+        raise ValueError(f"Normal distribution for {name} needs std >= 0, got {dist.std}")
+    if dist.kind == "normal" and not dist.low <= dist.high:
+        raise ValueError(f"Normal distribution for {name} has clip bounds low > high: {dist.low} > {dist.high}")
+    if dist.kind in ("uniform", "triangular"):
+        if not (np.isfinite(dist.low) and np.isfinite(dist.high) and dist.low < dist.high):
+            raise ValueError(f"{dist.kind.capitalize()} distribution for {name} needs finite low < high, got low={dist.low}, high={dist.high}")
+        if dist.kind == "triangular" and not (dist.mode is not None and dist.low <= dist.mode <= dist.high):
+            raise ValueError(f"Triangular distribution for {name} needs low <= mode <= high, got mode={dist.mode}")
+
+def _transform(dist: Distribution, z: np.ndarray) -> np.ndarray:
+    """Maps standard normal draws onto the requested marginal distribution."""
+    if dist.kind == "fixed":
+        return np.full(z.shape, dist.mean)
+    if dist.kind == "normal":
+        return np.clip(dist.mean + dist.std * z, dist.low, dist.high)
+
+    u = _normal_cdf(z)
+    width = dist.high - dist.low
+    if dist.kind == "uniform":
+        return dist.low + width * u
+    if dist.kind == "triangular":
+        c = (dist.mode - dist.low) / width
+        left = dist.low + np.sqrt(u * width * (dist.mode - dist.low))
+        right = dist.high - np.sqrt((1 - u) * width * (dist.high - dist.mode))
+        return np.where(u < c, left, right)
+    raise ValueError(f"Unknown distribution kind: {dist.kind}")
+
+def correlation_matrix(mc: MonteCarloConfig) -> np.ndarray:
+    """
+    Builds the driver correlation matrix (ordered like mc.drivers) and checks it is
+    positive definite.
+    """
+    names = list(mc.drivers)
+    corr = np.eye(len(names))
+    for (a, b), rho in mc.correlation.items():
+        if a not in mc.drivers or b not in mc.drivers:
+            raise ValueError(f"Correlation refers to a driver without a distribution: {a}, {b}")
+        i, j = names.index(a), names.index(b)
+        corr[i, j] = corr[j, i] = rho
+    try:
+        np.linalg.cholesky(corr)
+    except np.linalg.LinAlgError:
+        raise ValueError("Monte Carlo correlation matrix is not positive definite.")
+    return corr
+
+def sample_drivers(mc: MonteCarloConfig, n: int, rng: np.random.Generator, chol: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Draws n correlated samples of every configured driver (Gaussian copula).
+    """
+    names = list(mc.drivers)
+    for name in names:
+        if name not in DRIVERS:
+            raise ValueError(f"Unsupported Monte Carlo driver: {name}. Expected one of {DRIVERS}")
+        check_distribution(name, mc.drivers[name])
+    if chol is None:
+        chol = np.linalg.cholesky(correlation_matrix(mc))
+
+    z = rng.standard_normal((n, len(names))) @ chol.T
+    return {name: _transform(mc.drivers[name], z[:, k]) for k, name in enumerate(names)}
+
+class RunningMoments:
+    """
+    Streaming count/mean/variance (Chan et al. pairwise update), mergeable across chunks.
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return
+        other = RunningMoments()
+        other.count = values.size
+        other.mean = values.mean()
+        other.m2 = ((values - other.mean) ** 2).sum()
+        self.merge(other)
+
+    def merge(self, other: "RunningMoments") -> None:
+        if other.count == 0:
+            return
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / n
+        self.count = n
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch in the spirit of t-digest: values are kept as at most
+    ~compression weighted centroids, finer at the tails (arcsin scale function).
+    Memory is O(compression) regardless of how many values are added.
+    """
+    def __init__(self, compression: int = 500):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, np.ones(values.size)]))
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.weights.size == 0:
+            return
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        cum = np.cumsum(weights)
+        q_mid = (cum - weights / 2) / cum[-1]
+
+        # Centroids falling in the same scale-function bucket are merged
+        bucket = np.floor(self.compression * (np.arcsin(2 * q_mid - 1) / np.pi + 0.5))
+        starts = np.r_[0, np.flatnonzero(np.diff(bucket)) + 1]
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q):
+        """Estimated quantile(s) q in [0, 1]."""
+        if self.weights.size == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        cum = np.cumsum(self.weights)
+        centers = (cum - self.weights / 2) / cum[-1]
+        return np.interp(q, np.r_[0.0, centers, 1.0], np.r_[self.min, self.means, self.max])
+
+@dataclass
+class MonteCarloResult:
+    n_draws: int
+    n_valid: int
+    n_invalid: int  # draws rejected because terminal_g >= wacc
+    ev_mean: float
+    ev_std: float
+    ev_min: float
+    ev_max: float
+    ev_quantiles: Dict[float, float]
+    prob_ev_below_net_debt: float
+    net_debt: float
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "n_draws": self.n_draws,
+            "n_valid": self.n_valid,
+            "n_invalid": self.n_invalid,
+            "ev_mean": self.ev_mean,
+            "ev_std": self.ev_std,
+            "ev_min": self.ev_min,
+            "ev_max": self.ev_max,
+            "ev_quantiles": {f"p{q * 100:g}": v for q, v in self.ev_quantiles.items()},
+            "prob_ev_below_net_debt": self.prob_ev_below_net_debt,
+            "net_debt": self.net_debt,
+        }
+
+class MonteCarloAccumulator:
+    """
+    Running EV statistics over evaluated chunks (mergeable, so chunks can be
+    evaluated anywhere and combined afterwards).
+    """
+    def __init__(self, net_debt: float, compression: int = 500):
+        self.net_debt = net_debt
+        self.moments = RunningMoments()
+        self.sketch = QuantileSketch(compression)
+        self.n_draws = 0
+        self.n_below = 0
+
+    def update(self, enterprise_value: np.ndarray, n_draws: int) -> None:
+        self.n_draws += n_draws
+        self.moments.update(enterprise_value)
+        self.sketch.update(enterprise_value)
+        self.n_below += int(np.count_nonzero(enterprise_value < self.net_debt))
+
+    def merge(self, other: "MonteCarloAccumulator") -> None:
+        self.n_draws += other.n_draws
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        self.n_below += other.n_below
+
+    def result(self, quantiles: List[float]) -> MonteCarloResult:
+        n_valid = self.moments.count
+        return MonteCarloResult(
+            n_draws=self.n_draws,
+            n_valid=n_valid,
+            n_invalid=self.n_draws - n_valid,
+            ev_mean=float(self.moments.mean),
+            ev_std=float(np.sqrt(self.moments.variance)),
+            ev_min=float(self.sketch.min),
+            ev_max=float(self.sketch.max),
+            ev_quantiles={q: float(self.sketch.quantile(q)) for q in quantiles},
+            prob_ev_below_net_debt=self.n_below / n_valid if n_valid else float("nan"),
+            net_debt=self.net_debt
+        )
+
+def chunk_sizes(mc: MonteCarloConfig) -> List[int]:
+    """Fixed-size chunks covering mc.n_draws (the last one may be shorter)."""
+    for name in ("n_draws", "chunk_size"):
+        value = getattr(mc, name)
+        if isinstance(value, bool) or not isinstance(value, (int, np.integer)) or value <= 0:
+            raise ValueError(f"Monte Carlo {name} must be a positive integer, got {value!r}")
+    full, rest = divmod(mc.n_draws, mc.chunk_size)
+    return [mc.chunk_size] * full + ([rest] if rest else [])
+
+def chunk_seeds(mc: MonteCarloConfig) -> List[np.random.SeedSequence]:
+    """
+    One independent RNG stream per chunk, spawned from mc.seed. Results therefore do
+    not depend on the order (or process) in which chunks are evaluated.
+    """
+    return np.random.SeedSequence(mc.seed).spawn(len(chunk_sizes(mc)))
+
+def evaluate_chunk(last_revenue: float, net_debt: float, mc: MonteCarloConfig, n: int, seed: np.random.SeedSequence, on_invalid: str = "drop", times: Optional[np.ndarray] = None) -> MonteCarloAccumulator:
+    """
+    Draws n parameter sets, projects and values them in one vectorized pass
+    (the fused kernel of mc.kernel, see kernels.enterprise_values).
+    Draws with terminal_g >= wacc are rejected like calculate_dcf rejects them:
+    dropped and counted (on_invalid="drop") or raising ValueError (on_invalid="raise").
+    times are the discount times (default discount_times).
+    """
+    base = SETTINGS.scenarios[mc.base_scenario]
+    draws = sample_drivers(mc, n, np.random.default_rng(seed))
+    params = {name: draws.get(name, getattr(base, name)) for name in DRIVERS}
+
+    wacc = np.broadcast_to(params["wacc"], (n,))
+    g = np.broadcast_to(params["terminal_g"], (n,))
+    valid = g < wacc
+    if on_invalid == "raise" or valid.all():
+        keep = slice(None)
+    elif on_invalid == "drop":
+        keep = valid
+    else:
+        raise ValueError(f"on_invalid must be 'drop' or 'raise', got {on_invalid!r}")
+
+    # Scheduled drivers fade from each draw (and towards each draw's terminal_g)
+    schedules = None
+    if base.schedules:
+        reference = {name: getattr(base, name) for name in SCENARIO_DRIVERS}
+        values = {name: np.broadcast_to(params.get(name, reference[name]), (n,))[keep] for name in SCENARIO_DRIVERS}
+        schedules = driver_paths(base.schedules, values, reference=reference)
+    
+    ev = enterprise_values(
+        last_revenue,
+        np.broadcast_to(params["revenue_growth"], (n,))[keep],
+        np.broadcast_to(params["ebit_margin"], (n,))[keep],
+        base.capex_pct_rev,
+        base.depreciation_pct_capex,
+        base.nwc_pct_rev_change,
+        wacc[keep],
+        g[keep],
+        times,
+        schedules=schedules,
+        kernel=mc.kernel
+    )
+
+    acc = MonteCarloAccumulator(net_debt, mc.sketch_compression)
+    acc.update(ev, n)
+    return acc
+
+def _evaluate_unit(last_revenue: float, net_debt: float, mc: MonteCarloConfig, on_invalid: str, times: np.ndarray, unit) -> MonteCarloAccumulator:
+    n, seed = unit
+    return evaluate_chunk(last_revenue, net_debt, mc, n, seed, on_invalid, times)
+
+def run_monte_carlo(historical_df: pd.DataFrame, net_debt: float, mc: Optional[MonteCarloConfig] = None, on_invalid: str = "drop", executor: Optional[Executor] = None, **overrides) -> MonteCarloResult:
+    """
+    Monte Carlo EV distribution around mc.base_scenario. Draws are evaluated in
+    fixed-size chunks with running statistics, so memory stays flat in n_draws.
+    Keyword overrides replace MonteCarloConfig fields (e.g. n_draws=10_000).
+    With a thread/process executor the chunks are evaluated in parallel and their
+    accumulators merged in chunk order, giving the same result as the serial run.
+    """
+    if mc is None:
+        mc = SETTINGS.monte_carlo
+    if overrides:
+        mc = replace(mc, **overrides)
+    resolve_kernel(mc.kernel)  # fail before any chunk runs
+    units = list(zip(chunk_sizes(mc), chunk_seeds(mc)))
+
+    last_revenue = historical_df.iloc[-1]["revenue"]
+    times = discount_times(SETTINGS.years_forecast, int(historical_df.iloc[-1]["year"]) + 1)
+    acc = MonteCarloAccumulator(net_debt, mc.sketch_compression)
+    if executor is not None and executor.backend != "serial":
+        # Bound in-flight accumulators to a few per worker
+        window = 4 * executor.max_workers
+        for start in range(0, len(units), window):
+            for chunk_acc in executor.map(partial(_evaluate_unit, last_revenue, net_debt, mc, on_invalid, times), units[start:start + window], chunk_size=1):
+                acc.merge(chunk_acc)
+    else:
+        for unit in units:
+            acc.merge(_evaluate_unit(last_revenue, net_debt, mc, on_invalid, times, unit))
+
+    count("monte_carlo_draws", mc.n_draws)
+    return acc.result(mc.quantiles)
@@ -1,6 +1,192 @@
 import pandas as pd
 import numpy as np
-from config import SETTINGS, ScenarioParams
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Mapping, Optional
+from config import SETTINGS, DriverSchedule, ScenarioParams
+
+PROJECTION_COLUMNS = ["revenue", "ebit", "nopat", "depreciation", "capex", "delta_nwc", "fcf"]
+
+# Scalar ScenarioParams fields, and the ones that may follow a per-year schedule
+SCENARIO_DRIVERS = [f.name for f in fields(ScenarioParams) if f.name != "schedules"]
+SCHEDULED_DRIVERS = ["revenue_growth", "ebit_margin", "capex_pct_rev", "depreciation_pct_capex", "nwc_pct_rev_change"]
+SCHEDULE_KINDS = ("vector", "linear", "exponential", "stages")
+
+@dataclass
+class ProjectionArrays:
+    """
+    Projected line items for a batch of parameter sets.
+    Every field has shape batch_shape + (years,).
+    """
+    revenue: np.ndarray
+    ebit: np.ndarray
+    nopat: np.ndarray
+    depreciation: np.ndarray
+    capex: np.ndarray
+    delta_nwc: np.ndarray
+    fcf: np.ndarray
+    
+    def as_dict(self) -> Dict[str, np.ndarray]:
+        return {col: getattr(self, col) for col in PROJECTION_COLUMNS}
+    
+    def to_frame(self, years: np.ndarray) -> pd.DataFrame:
+        """
+        DataFrame in the project_financials layout (1-D arrays only).
+        """
+        columns = {"year": years}
+        columns.update(self.as_dict())
+        return pd.DataFrame(columns)
+
+def stack_scenario_params(scenarios: Dict[str, ScenarioParams]) -> Dict[str, np.ndarray]:
+    """
+    Turns a dict of ScenarioParams into one (n_scenarios,) array per field.
+    """
+    return {name: np.array([getattr(p, name) for p in scenarios.values()], dtype=float) for name in SCENARIO_DRIVERS}
+
+def schedule_path(schedule: DriverSchedule, start, target: Optional[float], years: int) -> np.ndarray:
+    """
+    Evaluates a schedule over the horizon as one array op: shape
+    start.shape + (years,). start (the scenario's value, possibly an array of
+    draws/grid values) anchors the fades; vector and stage paths ignore it.
+    """
+    t = np.arange(years)
+    start = np.asarray(start, dtype=float)[..., None]
+    kind = schedule.kind
+    if kind in ("vector", "stages"):
+        if not schedule.values:
+            raise ValueError(f"A '{kind}' schedule needs values")
+        values = np.asarray(schedule.values, dtype=float)
+        if kind == "vector":
+            index = np.minimum(t, len(values) - 1)
+        else:
+            if len(schedule.stage_years) not in (len(values) - 1, len(values)) or any(n < 1 for n in schedule.stage_years):
+                raise ValueError(f"stage_years must give a positive length for each stage (the last may be omitted), got {schedule.stage_years}")
+            index = np.minimum(np.searchsorted(np.cumsum(schedule.stage_years), t, side="right"), len(values) - 1)
+        return np.broadcast_to(values[index], start.shape[:-1] + (years,))
+
+    if target is None:
+        raise ValueError(f"A '{kind}' schedule needs a target")
+    if kind == "linear":
+        fade_years = schedule.fade_years or years
+        if fade_years < 1:
+            raise ValueError(f"fade_years must be positive, got {fade_years}")
+        weight = np.minimum(t / max(fade_years - 1, 1), 1.0) if fade_years > 1 else np.ones(years)
+    elif kind == "exponential":
+        if schedule.half_life <= 0:
+            raise ValueError(f"half_life must be positive, got {schedule.half_life}")
+        weight = 1 - 0.5 ** (t / schedule.half_life)
+    else:
+        raise ValueError(f"Unknown schedule kind: {kind}. Expected one of {SCHEDULE_KINDS}")
+    target = np.asarray(target, dtype=float)[..., None]
+    # Exactly the target once the fade completes
+    return np.where(weight >= 1, target, start + (target - start) * weight)
+
+def driver_paths(schedules: Mapping[str, DriverSchedule], values: Mapping[str, Any], years: Optional[int] = None, reference: Optional[Mapping[str, Any]] = None) -> Dict[str, np.ndarray]:
+    """
+    Per-year paths (batch_shape + (years,)) for the scheduled drivers.
+    values holds the (scalar or array) driver values: fades start from
+    values[name], and revenue_growth fades default to values["terminal_g"].
+    When values differ from the scenario's own (reference, e.g. sensitivity
+    axes or Monte Carlo draws), vector/stage paths shift by the difference.
+    """
+    if years is None:
+        years = SETTINGS.years_forecast
+    paths = {}
+    for name, schedule in schedules.items():
+        if name not in SCHEDULED_DRIVERS:
+            raise ValueError(f"Unsupported scheduled driver: {name}. Expected any of {SCHEDULED_DRIVERS}")
+        target = schedule.target
+        if target is None and name == "revenue_growth":
+            target = values["terminal_g"]
+        path = schedule_path(schedule, values[name], target, years)
+        if schedule.kind in ("vector", "stages") and reference is not None:
+            path = path + (np.asarray(values[name], dtype=float) - reference[name])[..., None]
+        paths[name] = path
+    return paths
+
+def scenario_paths(scenario: ScenarioParams, years: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """(years,) paths for the scenario's scheduled drivers."""
+    return driver_paths(scenario.schedules, {name: getattr(scenario, name) for name in SCENARIO_DRIVERS}, years)
+
+def stack_scenario_schedules(scenarios: Dict[str, ScenarioParams], years: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    (n_scenarios, years) paths for every driver scheduled in any scenario
+    (constant rows for scenarios without that schedule); {} when none are.
+    """
+    if years is None:
+        years = SETTINGS.years_forecast
+    paths = [scenario_paths(p, years) for p in scenarios.values()]
+    names = [name for name in SCHEDULED_DRIVERS if any(name in p for p in paths)]
+    return {
+        name: np.stack([p.get(name, np.full(years, getattr(params, name), dtype=float)) for p, params in zip(paths, scenarios.values())])
+        for name in names
+    }
+
+def project_arrays(last_revenue, revenue_growth, ebit_margin, capex_pct_rev, depreciation_pct_capex, nwc_pct_rev_change, years: Optional[int] = None, tax_rate: Optional[float] = None, schedules: Optional[Mapping[str, np.ndarray]] = None) -> ProjectionArrays:
+    """
+    Array projection kernel: all horizon years for all parameter sets at once.
+    Inputs (tax_rate included) are scalars or arrays that broadcast together to a
+    batch shape, e.g. (n_scenarios,) or (n_draws,); every output has shape
+    batch_shape + (years,).
+    schedules maps driver names to per-year paths (shape ... + (years,), see
+    driver_paths) that replace the constant argument for that driver, so fading
+    or multi-stage drivers cost the same array ops as constant ones.
+    Uses the same recurrences as the original per-year loop, so results are
+    identical to project_financials.
+    """
+    if years is None:
+        years = SETTINGS.years_forecast
+    if tax_rate is None:
+        tax_rate = SETTINGS.tax_rate
+        
+    last_revenue, revenue_growth, ebit_margin, capex_pct_rev, depreciation_pct_capex, nwc_pct_rev_change, tax_rate = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (last_revenue, revenue_growth, ebit_margin, capex_pct_rev, depreciation_pct_capex, nwc_pct_rev_change, tax_rate))
+    )
+    
+    # Per-year driver values: the schedule path, or the constant as a trailing axis
+    yearly = {
+        "revenue_growth": revenue_growth[..., None],
+        "ebit_margin": ebit_margin[..., None],
+        "capex_pct_rev": capex_pct_rev[..., None],
+        "depreciation_pct_capex": depreciation_pct_capex[..., None],
+        "nwc_pct_rev_change": nwc_pct_rev_change[..., None],
+    }
+    batch_shape = last_revenue.shape
+    for name, path in (schedules or {}).items():
+        path = np.asarray(path, dtype=float)
+        if name not in yearly or path.shape[-1:] != (years,):
+            raise ValueError(f"Schedule for {name} must be a known driver with {years} yearly values, got shape {path.shape}")
+        yearly[name] = path
+        batch_shape = np.broadcast_shapes(batch_shape, path.shape[:-1])
+    
+    # Cumulative growth vector: [rev_0, 1+g_1, 1+g_2, ...] -> revenue path rev_0..rev_n
+    steps = np.empty(batch_shape + (years + 1,))
+    steps[..., 0] = last_revenue
+    steps[..., 1:] = 1 + yearly["revenue_growth"]
+    revenue_path = np.cumprod(steps, axis=-1)
+    
+    rev = revenue_path[..., 1:]
+    delta_rev = rev - revenue_path[..., :-1]
+    
+    # Use explicit EBIT margin from scenario config
+    ebit = rev * yearly["ebit_margin"]
+    nopat = ebit * (1 - tax_rate[..., None])
+    capex = rev * yearly["capex_pct_rev"]
+    # Depreciation as % of Capex, Delta NWC as % of Delta Revenue
+    depreciation = capex * yearly["depreciation_pct_capex"]
+    delta_nwc = delta_rev * yearly["nwc_pct_rev_change"]
+    
+    # FCF = NOPAT + Dep - Capex - Delta_NWC
+    fcf = nopat + depreciation - capex - delta_nwc
+    
+    return ProjectionArrays(
+        revenue=rev,
+        ebit=ebit,
+        nopat=nopat,
+        depreciation=depreciation,
+        capex=capex,
+        delta_nwc=delta_nwc,
+        fcf=fcf
+    )
 
 def project_financials(history_df: pd.DataFrame, scenario: ScenarioParams) -> pd.DataFrame:
     """
@@ -8,52 +194,16 @@ def project_financials(history_df: pd.DataFrame, scenario: ScenarioParams) -> pd
     Returns projection dataframe.
     """
     last_year = history_df.iloc[-1]
-    last_date = last_year["year"]
     
-    projections = []
+    arrays = project_arrays(
+        last_year["revenue"],
+        scenario.revenue_growth,
+        scenario.ebit_margin,
+        scenario.capex_pct_rev,
+        scenario.depreciation_pct_capex,
+        scenario.nwc_pct_rev_change,
+        schedules=scenario_paths(scenario)
+    )
+    years = last_year["year"] + np.arange(1, SETTINGS.years_forecast + 1)
     
-    current_rev = last_year["revenue"]
-    
-    for i in range(1, SETTINGS.years_forecast + 1):
-        year = last_date + i
-        
-        # Grow Revenue
-        rev = current_rev * (1 + scenario.revenue_growth)
-        delta_rev = rev - current_rev
-        current_rev = rev
-        
-        # Calculate Expense Items
-        # Use explicit EBIT margin from scenario config
-        ebit = rev * scenario.ebit_margin
-        
-        # NOPAT
-        nopat = ebit * (1 - SETTINGS.tax_rate)
-        
-        # Capex
-        capex = rev * scenario.capex_pct_rev
-        
-        # Depreciation
-        # As % of Capex (from scenario config)
-        depreciation = capex * scenario.depreciation_pct_capex
-        
-        # NWC Change
-        # Delta NWC = % of Delta Revenue
-        delta_nwc = delta_rev * scenario.nwc_pct_rev_change
-        
-        # FCF
-        # FCF = NOPAT + Dep - Capex - Delta_NWC
-        # Capex here is treated as outflow (positive number subtracted)
-        fcf = nopat + depreciation - capex - delta_nwc
-        
-        projections.append({
-            "year": year,
-            "revenue": rev,
-            "ebit": ebit,
-            "nopat": nopat,
-            "depreciation": depreciation,
-            "capex": capex,
-            "delta_nwc": delta_nwc,
-            "fcf": fcf
-        })
-        
-    return pd.DataFrame(projections)
+    return arrays.to_frame(years)
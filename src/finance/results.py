@@ -0,0 +1,255 @@
+"""
+Columnar storage for large numbers of DCF results (companies x scenarios x
+draws): one array per scalar field, a single (results, columns, years)
+projection array, and interned scenario, company and warning strings. Rows are
+read through ResultView, which stands in for ValuationResult without copying,
+and a store saves to a directory of .npy files that load back memory-mapped.
+"""
+import json
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Sequence, Tuple
+from .batch import BatchValuation, COMPANY_COL
+from .dcf import TERMINAL_SHARE_LIMIT, ValuationResult, terminal_share_warning
+from .discounting import discount_factors, discount_times
+from .projections import PROJECTION_COLUMNS
+
+SCALAR_FIELDS = ("enterprise_value", "equity_value", "terminal_value", "pv_explicit", "pv_terminal", "terminal_share_pct", "wacc", "terminal_g")
+# Integer column rebuilt on read (1..years) rather than stored in the float block
+PERIOD_COL = "period"
+META_FILE = "store.json"
+
+def _intern(values: Sequence[str], table: Dict[str, int]) -> np.ndarray:
+    """int32 codes of values, adding unseen strings to table (string -> code)."""
+    return np.array([table.setdefault(value, len(table)) for value in values], dtype=np.int32)
+
+@dataclass
+class ResultStore:
+    """
+    Structure-of-arrays DCF results. projections holds every projection
+    column except "period" (in columns order) as float64; scenario, company
+    and warning strings are stored once and referenced by int32 codes
+    (warnings[0] is "", no warning).
+    """
+    columns: List[str]
+    projections: np.ndarray  # (n, len(columns) - has period, years)
+    scalars: Dict[str, np.ndarray]  # SCALAR_FIELDS -> (n,)
+    scenarios: List[str]
+    scenario_codes: np.ndarray
+    companies: List[str]
+    company_codes: np.ndarray
+    warnings: List[str]
+    warning_codes: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.scenario_codes)
+
+    def __getitem__(self, index: int) -> "ResultView":
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"result {index} out of range for {len(self)} results")
+        return ResultView(self, index % len(self))
+
+    def __iter__(self) -> Iterator["ResultView"]:
+        return (ResultView(self, i) for i in range(len(self)))
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.projections, self.scenario_codes, self.company_codes, self.warning_codes, *self.scalars.values()]
+        return sum(array.nbytes for array in arrays)
+
+    def results(self, company: str = "") -> Dict[str, "ResultView"]:
+        """One company's results keyed by scenario, as run_scenarios returns them."""
+        if company not in self.companies:
+            raise ValueError(f"Unknown company: {company!r}")
+        rows = np.flatnonzero(self.company_codes == self.companies.index(company))
+        return {self.scenarios[self.scenario_codes[i]]: ResultView(self, int(i)) for i in rows}
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long-format summary (one row per result), like BatchValuation.to_frame."""
+        frame = pd.DataFrame({
+            COMPANY_COL: np.array(self.companies, dtype=object)[self.company_codes],
+            "scenario": np.array(self.scenarios, dtype=object)[self.scenario_codes],
+        })
+        for name in SCALAR_FIELDS:
+            frame[name] = self.scalars[name]
+        frame["terminal_share_warning"] = np.array(self.warnings, dtype=object)[self.warning_codes]
+        return frame
+
+    @classmethod
+    def from_results(cls, results: Mapping[str, ValuationResult], company: str = "") -> "ResultStore":
+        """Store for one company's {scenario: ValuationResult} (same projection columns and years)."""
+        items = list(results.values())
+        if not items:
+            raise ValueError("No results to store")
+        columns = list(items[0].projections.columns)
+        stored = [col for col in columns if col != PERIOD_COL]
+        for res in items:
+            if list(res.projections.columns) != columns or len(res.projections) != len(items[0].projections):
+                raise ValueError(f"Result {res.scenario_name!r} has different projection columns or years")
+        projections = np.stack([res.projections[stored].to_numpy(dtype=float).T for res in items])
+
+        warnings = {"": 0}
+        return cls(
+            columns=columns,
+            projections=projections,
+            scalars={name: np.array([getattr(res, name) for res in items], dtype=float) for name in SCALAR_FIELDS},
+            scenarios=list(results),
+            scenario_codes=np.arange(len(items), dtype=np.int32),
+            companies=[company],
+            company_codes=np.zeros(len(items), dtype=np.int32),
+            warning_codes=_intern([res.terminal_share_warning for res in items], warnings),
+            warnings=list(warnings),
+        )
+
+    @classmethod
+    def from_batch(cls, batch: BatchValuation) -> "ResultStore":
+        """
+        Store for every company x scenario of a batch (company-major), with
+        the same projections BatchValuation.to_valuation_results rebuilds.
+        """
+        n_companies, n_scenarios = len(batch.companies), len(batch.scenarios)
+        years = batch.projections["fcf"].shape[-1]
+        columns = ["year"] + PROJECTION_COLUMNS + [PERIOD_COL, "discount_factor", "pv_fcf"]
+        stored = [col for col in columns if col != PERIOD_COL]
+
+        projections = np.empty((n_companies, n_scenarios, len(stored), years))
+        projections[:, :, 0] = (batch.last_years[:, None] + np.arange(1, years + 1))[:, None, :]
+        for j, col in enumerate(PROJECTION_COLUMNS, start=1):
+            projections[:, :, j] = batch.projections[col]
+        times = discount_times(years, batch.last_years + 1)
+        if times.ndim == 1:
+            factors = discount_factors(batch.wacc, times)
+        else:  # per-company dated schedules
+            factors = discount_factors(batch.wacc[None, :], times[:, None, :])
+        projections[:, :, -2] = factors
+        projections[:, :, -1] = projections[:, :, stored.index("fcf")] * projections[:, :, -2]
+
+        share = batch.valuation["terminal_share_pct"].ravel()
+        warnings = {"": 0}
+        warning_codes = np.zeros(len(share), dtype=np.int32)
+        flagged = np.flatnonzero(share > TERMINAL_SHARE_LIMIT)
+        warning_codes[flagged] = _intern([terminal_share_warning(share[i]) for i in flagged], warnings)
+
+        scalars = {name: batch.valuation[name].ravel() for name in SCALAR_FIELDS if name in batch.valuation}
+        scalars["wacc"] = np.tile(batch.wacc, n_companies)
+        scalars["terminal_g"] = np.tile(batch.terminal_g, n_companies)
+        return cls(
+            columns=columns,
+            projections=projections.reshape(n_companies * n_scenarios, len(stored), years),
+            scalars={name: scalars[name] for name in SCALAR_FIELDS},
+            scenarios=list(batch.scenarios),
+            scenario_codes=np.tile(np.arange(n_scenarios, dtype=np.int32), n_companies),
+            companies=list(batch.companies),
+            company_codes=np.repeat(np.arange(n_companies, dtype=np.int32), n_scenarios),
+            warnings=list(warnings),
+            warning_codes=warning_codes,
+        )
+
+    @classmethod
+    def concat(cls, stores: Sequence["ResultStore"]) -> "ResultStore":
+        """One store holding the results of all stores, in order (strings re-interned)."""
+        if not stores:
+            raise ValueError("No stores to concatenate")
+        columns, shape = stores[0].columns, stores[0].projections.shape[1:]
+        if any(store.columns != columns or store.projections.shape[1:] != shape for store in stores):
+            raise ValueError("Stores have different projection columns or years")
+
+        tables: Tuple[Dict[str, int], ...] = ({}, {}, {"": 0})
+        codes: Tuple[List[np.ndarray], ...] = ([], [], [])
+        for store in stores:
+            for table, parts, (names, store_codes) in zip(tables, codes, [(store.scenarios, store.scenario_codes), (store.companies, store.company_codes), (store.warnings, store.warning_codes)]):
+                parts.append(_intern(names, table)[store_codes])
+        scenario_codes, company_codes, warning_codes = (np.concatenate(parts) for parts in codes)
+        return cls(
+            columns=list(columns),
+            projections=np.concatenate([store.projections for store in stores]),
+            scalars={name: np.concatenate([store.scalars[name] for store in stores]) for name in SCALAR_FIELDS},
+            scenarios=list(tables[0]),
+            scenario_codes=scenario_codes,
+            companies=list(tables[1]),
+            company_codes=company_codes,
+            warnings=list(tables[2]),
+            warning_codes=warning_codes,
+        )
+
+    def save(self, path: Path) -> None:
+        """Writes the store to directory path: store.json plus one .npy file per array."""
+        path.mkdir(parents=True, exist_ok=True)
+        arrays = {"projections": self.projections, "scenario_codes": self.scenario_codes, "company_codes": self.company_codes, "warning_codes": self.warning_codes, **self.scalars}
+        for name, array in arrays.items():
+            np.save(path / f"{name}.npy", np.ascontiguousarray(array))
+        meta = {"columns": self.columns, "scenarios": self.scenarios, "companies": self.companies, "warnings": self.warnings, "arrays": list(arrays)}
+        (path / META_FILE).write_text(json.dumps(meta, indent=4))
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "ResultStore":
+        """
+        Reads a store written by save. With mmap the arrays are read-only memory
+        maps, so opening is O(1) and only the pages views touch are read.
+        """
+        meta = json.loads((path / META_FILE).read_text())
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None) for name in meta["arrays"]}
+        return cls(
+            columns=meta["columns"],
+            projections=arrays["projections"],
+            scalars={name: arrays[name] for name in SCALAR_FIELDS},
+            scenarios=meta["scenarios"],
+            scenario_codes=arrays["scenario_codes"],
+            companies=meta["companies"],
+            company_codes=arrays["company_codes"],
+            warnings=meta["warnings"],
+            warning_codes=arrays["warning_codes"],
+        )
+
+class ResultView:
+    """
+    One row of a ResultStore with ValuationResult's attributes. Scalars are read
+    from the store's arrays; projections is a DataFrame over the store's
+    projection block (no copy, read-only: copy() it, or use to_result(), to modify).
+    """
+    __slots__ = ("store", "index")
+
+    def __init__(self, store: ResultStore, index: int):
+        self.store = store
+        self.index = index
+
+    def __getattr__(self, name: str) -> float:
+        if name in SCALAR_FIELDS:
+            return float(self.store.scalars[name][self.index])
+        raise AttributeError(f"'ResultView' object has no attribute '{name}'")
+
+    def __repr__(self) -> str:
+        return f"ResultView(company={self.company!r}, scenario_name={self.scenario_name!r}, enterprise_value={self.enterprise_value!r})"
+
+    @property
+    def scenario_name(self) -> str:
+        return self.store.scenarios[self.store.scenario_codes[self.index]]
+
+    @property
+    def company(self) -> str:
+        return self.store.companies[self.store.company_codes[self.index]]
+
+    @property
+    def terminal_share_warning(self) -> str:
+        return self.store.warnings[self.store.warning_codes[self.index]]
+
+    @property
+    def projections(self) -> pd.DataFrame:
+        columns = self.store.columns
+        block = self.store.projections[self.index].T
+        block.flags.writeable = False
+        frame = pd.DataFrame(block, columns=[col for col in columns if col != PERIOD_COL], copy=False)
+        if PERIOD_COL in columns:
+            frame.insert(columns.index(PERIOD_COL), PERIOD_COL, np.arange(1, len(frame) + 1))
+        return frame
+
+    def to_result(self) -> ValuationResult:
+        """Materialized (copied) ValuationResult."""
+        return ValuationResult(
+            scenario_name=self.scenario_name,
+            projections=self.projections.copy(),
+            terminal_share_warning=self.terminal_share_warning,
+            **{name: getattr(self, name) for name in SCALAR_FIELDS},
+        )
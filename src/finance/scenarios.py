@@ -1,22 +1,96 @@
-from typing import Dict
+import numpy as np
 import pandas as pd
+from functools import partial
+from typing import Dict, Optional
 from config import SETTINGS
-from .projections import project_financials
+from .projections import PROJECTION_COLUMNS, project_arrays, project_financials, stack_scenario_params, stack_scenario_schedules
 from .dcf import calculate_dcf, ValuationResult
+from .cache import ResultCache, cached_calculate_dcf, cached_project_financials, dcf_key
+from ..runtime.executor import Executor, SharedArrays, share_arrays
+from ..runtime.instrumentation import count, span
 
-def run_scenarios(historical_df: pd.DataFrame, net_debt: float) -> Dict[str, ValuationResult]:
+def run_scenarios(historical_df: pd.DataFrame, net_debt: float, executor: Optional[Executor] = None, cache: Optional[ResultCache] = None) -> Dict[str, ValuationResult]:
     """
     Runs metrics, projections, and DCF for all scenarios defined in config.
+    With a thread/process executor the scenarios are valued in parallel; the
+    stacked projection arrays reach the workers through shared memory.
+    With a cache, projections and DCF results are memoized per scenario; in
+    parallel only the scenarios missing from the cache are sent to the workers.
     """
+    if executor is not None and executor.backend != "serial":
+        return _run_scenarios_parallel(historical_df, net_debt, executor, cache)
+        
     results = {}
     
     for scenario_name, params in SETTINGS.scenarios.items():
-        # Project future
-        proj_df = project_financials(historical_df, params)
+        with span("scenario", scenario=scenario_name):
+            if cache is not None:
+                proj_df = cached_project_financials(historical_df, params, cache)
+                results[scenario_name] = cached_calculate_dcf(proj_df, params, net_debt, scenario_name, cache)
+                continue
+                
+            # Project future
+            with span("projections"):
+                proj_df = project_financials(historical_df, params)
+            
+            # Calculate DCF
+            with span("dcf"):
+                val_result = calculate_dcf(proj_df, params, net_debt, scenario_name)
+            
+            results[scenario_name] = val_result
         
-        # Calculate DCF
-        val_result = calculate_dcf(proj_df, params, net_debt, scenario_name)
+    count("scenarios_valued", len(results))
+    return results
+
+def _run_scenarios_parallel(historical_df: pd.DataFrame, net_debt: float, executor: Executor, cache: Optional[ResultCache] = None) -> Dict[str, ValuationResult]:
+    names = list(SETTINGS.scenarios)
+    results, keys = {}, {}
+    if cache is not None:
+        for scenario_name in names:
+            scenario = SETTINGS.scenarios[scenario_name]
+            proj_df = cached_project_financials(historical_df, scenario, cache)
+            keys[scenario_name] = dcf_key(proj_df, scenario, net_debt, scenario_name)
+            hit = cache.get(keys[scenario_name])
+            if hit is not None:
+                results[scenario_name] = hit
+    pending = [name for name in names if name not in results]
+    
+    if pending:
+        # All pending scenarios are projected in one kernel call, (n_scenarios, years)
+        scenarios = {name: SETTINGS.scenarios[name] for name in pending}
+        last_year = historical_df.iloc[-1]
+        params = stack_scenario_params(scenarios)
+        projections = project_arrays(
+            last_year["revenue"],
+            params["revenue_growth"],
+            params["ebit_margin"],
+            params["capex_pct_rev"],
+            params["depreciation_pct_capex"],
+            params["nwc_pct_rev_change"],
+            schedules=stack_scenario_schedules(scenarios)
+        )
+        arrays = projections.as_dict()
+        arrays["year"] = last_year["year"] + np.arange(1, SETTINGS.years_forecast + 1)
         
-        results[scenario_name] = val_result
+        with share_arrays(arrays, executor) as shared:
+            valued = executor.map(partial(_value_scenario, shared, net_debt), list(enumerate(pending)))
+        for scenario_name, result in zip(pending, valued):
+            if cache is not None:
+                cache.put(keys[scenario_name], result)
+            results[scenario_name] = result
         
-    return results
+    count("scenarios_valued", len(names))
+    return {name: results[name] for name in names}
+
+def _value_scenario(shared: SharedArrays, net_debt: float, item) -> ValuationResult:
+    """Worker: DCF for one scenario row of the shared projection arrays."""
+    index, scenario_name = item
+    with span("scenario", scenario=scenario_name):
+        with shared.open() as arrays:
+            columns = {"year": arrays["year"].copy()}
+            for col in PROJECTION_COLUMNS:
+                columns[col] = arrays[col][index].copy()
+        proj_df = pd.DataFrame(columns)
+        
+        with span("dcf"):
+            return calculate_dcf(proj_df, SETTINGS.scenarios[scenario_name], net_debt, scenario_name)
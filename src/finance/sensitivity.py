@@ -1,76 +1,226 @@
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, Tuple
-from config import SETTINGS
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from config import SETTINGS, ScenarioParams
+from .discounting import discount_factors, discount_times
+from .projections import SCENARIO_DRIVERS, driver_paths, project_arrays
+from ..runtime.executor import Executor, SharedArrays, share_arrays
+from ..runtime.instrumentation import count
 
-def calculate_sensitivity_grid(base_projections: pd.DataFrame) -> Dict[str, Any]:
+# Axes a sensitivity cube can span: every scenario driver plus the tax rate
+CUBE_AXES = ["wacc", "terminal_g", "revenue_growth", "ebit_margin", "capex_pct_rev", "depreciation_pct_capex", "nwc_pct_rev_change", "tax_rate"]
+
+@dataclass
+class SensitivityCube:
+    """
+    EV over an N-dimensional grid of drivers. ev has one dimension per axis (in
+    axes order) and is NaN where terminal_g >= wacc.
+    """
+    axes: Dict[str, np.ndarray]
+    ev: np.ndarray
+
+    @property
+    def valid(self) -> np.ndarray:
+        return ~np.isnan(self.ev)
+
+    @property
+    def base_index(self) -> Tuple[int, ...]:
+        """Median point of every axis (the grid's approximate base case)."""
+        return tuple(len(values) // 2 for values in self.axes.values())
+
+    def axis_impacts(self) -> Dict[str, float]:
+        """
+        EV range along each axis, holding every other axis at its median point.
+        """
+        impacts = {}
+        base = self.base_index
+        for k, name in enumerate(self.axes):
+            line = self.ev[base[:k] + (slice(None),) + base[k + 1:]]
+            impacts[name] = float(np.nanmax(line) - np.nanmin(line)) if np.any(~np.isnan(line)) else 0.0
+        return impacts
+
+    def driver_ranking(self) -> List[Tuple[str, float]]:
+        """Axes sorted by impact on EV, largest first."""
+        return sorted(self.axis_impacts().items(), key=lambda item: item[1], reverse=True)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long format: one column per axis plus enterprise_value."""
+        grids = np.meshgrid(*self.axes.values(), indexing="ij")
+        frame = pd.DataFrame({name: grid.ravel() for name, grid in zip(self.axes, grids)})
+        frame["enterprise_value"] = self.ev.ravel()
+        return frame
+
+def _along(axes: Dict[str, np.ndarray], base: Dict[str, float], name: str) -> np.ndarray:
+    """Axis values shaped to broadcast in their own dimension, or the base scalar."""
+    if name not in axes:
+        return np.asarray(base[name], dtype=float)
+    shape = [1] * len(axes)
+    shape[list(axes).index(name)] = len(axes[name])
+    return np.asarray(axes[name], dtype=float).reshape(shape)
+
+def _evaluate_block(axes: Dict[str, np.ndarray], base: Dict[str, float], last_revenue: Optional[float], fixed_fcf: Optional[np.ndarray]) -> np.ndarray:
+    """
+    EV for every combination of the given axis values in one broadcast pass.
+    With fixed_fcf only wacc/terminal_g may vary; otherwise FCF is re-projected
+    from last_revenue for the operational axes, following the scenario's driver
+    schedules (base["schedules"]): an axis on a scheduled driver moves its start.
+    Cash flows are discounted at base["discount_times"] (default discount_times).
+    """
+    if fixed_fcf is not None:
+        fcf = fixed_fcf
+    else:
+        schedules = base.get("schedules")
+        if schedules:
+            values = {name: _along(axes, base, name) for name in SCENARIO_DRIVERS}
+            schedules = driver_paths(schedules, values, reference=base)
+        fcf = project_arrays(
+            last_revenue,
+            _along(axes, base, "revenue_growth"),
+            _along(axes, base, "ebit_margin"),
+            _along(axes, base, "capex_pct_rev"),
+            _along(axes, base, "depreciation_pct_capex"),
+            _along(axes, base, "nwc_pct_rev_change"),
+            tax_rate=_along(axes, base, "tax_rate"),
+            schedules=schedules
+        ).fcf
+    wacc = _along(axes, base, "wacc")
+    g = _along(axes, base, "terminal_g")
+
+    # Same formulas as calculate_dcf, broadcast over the grid
+    times = base.get("discount_times")
+    if times is None:
+        times = discount_times(fcf.shape[-1])
+    factors = discount_factors(wacc, times)
+    pv_explicit = np.sum(fcf * factors, axis=-1)
+    last_factor = factors[..., -1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tv = fcf[..., -1] * (1 + g) / (wacc - g)
+    ev = pv_explicit + tv * last_factor
+
+    shape = tuple(len(values) for values in axes.values())
+    return np.broadcast_to(np.where(wacc > g, ev, np.nan), shape)
+
+def _block_slices(shape: Tuple[int, ...], years: int, max_block_elements: int) -> Tuple[int, List[Tuple[int, int]]]:
+    """
+    Splits the largest axis into blocks so each block holds at most
+    max_block_elements cells x years (at least one index per block).
+    """
+    big = int(np.argmax(shape))
+    cells_per_index = int(np.prod(shape)) // shape[big] * years
+    step = max(1, max_block_elements // max(cells_per_index, 1))
+    return big, [(start, min(start + step, shape[big])) for start in range(0, shape[big], step)]
+
+def _sliced(axes: Dict[str, np.ndarray], big: int, bounds: Tuple[int, int]) -> Dict[str, np.ndarray]:
+    name = list(axes)[big]
+    return {key: (values[bounds[0]:bounds[1]] if key == name else values) for key, values in axes.items()}
+
+def _evaluate_block_shared(shared: SharedArrays, names: Sequence[str], base: Dict[str, float], last_revenue: Optional[float], big: int, bounds: Tuple[int, int]) -> None:
+    """Worker: evaluates one block of the largest axis into the shared EV buffer."""
+    with shared.open() as arrays:
+        axes = _sliced({name: arrays[f"axis_{name}"] for name in names}, big, bounds)
+        block = _evaluate_block(axes, base, last_revenue, arrays.get("fcf"))
+        index = (slice(None),) * big + (slice(*bounds),)
+        arrays["ev"][index] = block
+
+def _evaluate_cube(axes: Dict[str, np.ndarray], base: Dict[str, float], last_revenue: Optional[float], fixed_fcf: Optional[np.ndarray], years: int, executor: Optional[Executor]) -> np.ndarray:
+    shape = tuple(len(values) for values in axes.values())
+    big, blocks = _block_slices(shape, years, SETTINGS.sensitivity.max_block_elements)
+    ev = np.empty(shape)
+    count("grid_cells_evaluated", ev.size)
+    count("grid_blocks", len(blocks))
+
+    if executor is not None and executor.backend != "serial":
+        arrays = {f"axis_{name}": values for name, values in axes.items()}
+        arrays["ev"] = ev
+        if fixed_fcf is not None:
+            arrays["fcf"] = fixed_fcf
+        with share_arrays(arrays, executor) as shared:
+            executor.map(partial(_evaluate_block_shared, shared, list(axes), base, last_revenue, big), blocks, chunk_size=1)
+            with shared.open() as outputs:
+                ev = outputs["ev"].copy()
+    else:
+        for bounds in blocks:
+            index = (slice(None),) * big + (slice(*bounds),)
+            ev[index] = _evaluate_block(_sliced(axes, big, bounds), base, last_revenue, fixed_fcf)
+    return ev
+
+def calculate_sensitivity_cube(historical_df: pd.DataFrame, scenario: ScenarioParams, axes: Dict[str, Sequence[float]], executor: Optional[Executor] = None) -> SensitivityCube:
+    """
+    EV over an N-dimensional grid of any of CUBE_AXES (drivers not on an axis keep
+    the scenario's value; tax_rate defaults to SETTINGS.tax_rate; scheduled drivers
+    follow their per-year paths, with axis values as the start). Evaluation is
+    fully broadcast and chunked along the largest axis so temporaries stay within
+    SETTINGS.sensitivity.max_block_elements. Cells with terminal_g >= wacc are NaN.
+    """
+    unknown = [name for name in axes if name not in CUBE_AXES]
+    if unknown:
+        raise ValueError(f"Unsupported sensitivity axes: {unknown}. Expected any of {CUBE_AXES}")
+
+    axes = {name: np.asarray(values, dtype=float) for name, values in axes.items()}
+    base = {name: getattr(scenario, name) for name in SCENARIO_DRIVERS}
+    base["tax_rate"] = SETTINGS.tax_rate
+    base["schedules"] = scenario.schedules
+    last_revenue = float(historical_df.iloc[-1]["revenue"])
+    base["discount_times"] = discount_times(SETTINGS.years_forecast, int(historical_df.iloc[-1]["year"]) + 1)
+
+    ev = _evaluate_cube(axes, base, last_revenue, None, SETTINGS.years_forecast, executor)
+    return SensitivityCube(axes=axes, ev=ev)
+
+def calculate_sensitivity_grid(base_projections: pd.DataFrame, executor: Optional[Executor] = None) -> Dict[str, Any]:
     """
     Calculates the sensitivity matrix for WACC vs Terminal Growth (g).
     Returns a dictionary with:
-    - matrix: The EV matrix (DataFrame)
+    - matrix: The EV matrix (DataFrame, NaN where g >= WACC)
     - ev_min: Minimum EV in the grid
     - ev_max: Maximum EV in the grid
     - ev_base: Base case EV (center of grid approx)
     - driver_analysis: String explaining which variable drives value more.
+    - driver_ranking: [(axis, EV range)] sorted by impact
+    The grid is evaluated in one broadcast pass over the base projections' FCF,
+    chunked along the larger axis (and fanned out when given an executor).
     """
-    wacc_values = np.array(SETTINGS.sensitivity.wacc_values)
-    g_values = np.array(SETTINGS.sensitivity.terminal_g_values)
-    
-    # Initialize EV matrix
-    ev_matrix = np.zeros((len(wacc_values), len(g_values)))
-    
-    # Pre-calculate discount periods
-    periods = np.arange(1, len(base_projections) + 1)
-    fcf = base_projections["fcf"].values
-    last_fcf = fcf[-1]
-    
-    # Calculate EV for each cell
-    for i, w in enumerate(wacc_values):
-        discount_factors = (1 + w) ** -periods
-        pv_explicit = np.sum(fcf * discount_factors)
-        last_factor = discount_factors[-1]
-        
-        for j, g in enumerate(g_values):
-            if w <= g:
-                ev = 0.0 # Invalid
-            else:
-                tv = last_fcf * (1 + g) / (w - g)
-                pv_terminal = tv * last_factor
-                ev = pv_explicit + pv_terminal
-            
-            ev_matrix[i, j] = ev
-            
+    wacc_values = np.array(SETTINGS.sensitivity.wacc_values, dtype=float)
+    g_values = np.array(SETTINGS.sensitivity.terminal_g_values, dtype=float)
+    fcf = base_projections["fcf"].to_numpy(dtype=float)
+
+    first_year = base_projections["year"].iloc[0] if "year" in base_projections.columns else None
+    base = {"discount_times": discount_times(len(fcf), first_year)}
+
+    axes = {"wacc": wacc_values, "terminal_g": g_values}
+    ev_matrix = _evaluate_cube(axes, base, None, fcf, len(fcf), executor)
+    cube = SensitivityCube(axes=axes, ev=ev_matrix)
+
     # Create DataFrame
     ev_df = pd.DataFrame(ev_matrix, index=wacc_values, columns=g_values)
     ev_df.index.name = "WACC"
     ev_df.columns.name = "Terminal Growth"
-    
+
     # Analyze Driver
-    # Calculate range of variation for WACC (holding g constant at median)
-    mid_g_idx = len(g_values) // 2
-    wacc_range_ev = ev_matrix[:, mid_g_idx]
-    wacc_impact = wacc_range_ev.max() - wacc_range_ev.min()
-    
-    # Calculate range of variation for g (holding WACC constant at median)
-    mid_wacc_idx = len(wacc_values) // 2
-    g_range_ev = ev_matrix[mid_wacc_idx, :]
-    g_impact = g_range_ev.max() - g_range_ev.min()
-    
+    # Range of variation for WACC (g at median) and for g (WACC at median)
+    impacts = cube.axis_impacts()
+    wacc_impact = impacts["wacc"]
+    g_impact = impacts["terminal_g"]
+    mid_wacc_idx, mid_g_idx = cube.base_index
+
     sensitivity_ratio = wacc_impact / g_impact if g_impact > 0 else float('inf')
-    
+
     if sensitivity_ratio > 1.2:
         driver = "Sensitivity driven primarily by WACC changes."
     elif sensitivity_ratio < 0.8:
         driver = "Sensitivity driven primarily by Terminal Growth changes."
     else:
         driver = "Valuation is sensitive to both WACC and Growth similarly."
-        
+
     return {
         "matrix": ev_df,
-        "ev_min": ev_matrix[ev_matrix > 0].min(),
-        "ev_max": ev_matrix.max(),
+        "ev_min": np.nanmin(ev_matrix),
+        "ev_max": np.nanmax(ev_matrix),
         "ev_base": ev_matrix[mid_wacc_idx, mid_g_idx], # Approx base
         "driver_analysis": driver,
+        "driver_ranking": cube.driver_ranking(),
         "wacc_impact_range": wacc_impact,
         "g_impact_range": g_impact
     }
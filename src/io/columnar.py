@@ -0,0 +1,123 @@
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from .loaders import load_statement, statement_files
+from .validators import REQUIRED_COLUMNS
+
+# Columnar layouts. "npy" needs only NumPy; "arrow" (IPC/Feather) and "parquet" need pyarrow.
+FORMATS = ("npy", "arrow", "parquet")
+COLUMNAR_DIR = "columnar"
+MANIFEST = "manifest.json"
+
+# Identifier columns kept by column projection when present (panel inputs)
+KEY_COLUMNS = ["company"]
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("The 'arrow' and 'parquet' columnar formats require pyarrow (pip install pyarrow); use fmt='npy' otherwise.")
+    return pyarrow
+
+def _to_numpy(series: pd.Series) -> np.ndarray:
+    """Column as a memory-mappable array (strings become fixed-width unicode)."""
+    values = series.to_numpy()
+    if values.dtype == object or not isinstance(values.dtype, np.dtype):
+        values = series.astype(str).to_numpy().astype(str)
+    return values
+
+def write_columnar(data: Dict[str, pd.DataFrame], out_dir: Path, fmt: str = "npy") -> Path:
+    """
+    Writes statement frames in a columnar layout under out_dir:
+    npy -> <statement>/<column>.npy, arrow/parquet -> <statement>.arrow|.parquet,
+    plus a manifest listing format, columns and row counts.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown columnar format: {fmt}. Expected one of {FORMATS}")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {"format": fmt, "statements": {}}
+
+    for key, df in data.items():
+        if fmt == "npy":
+            statement_dir = out_dir / key
+            statement_dir.mkdir(exist_ok=True)
+            for col in df.columns:
+                np.save(statement_dir / f"{col}.npy", _to_numpy(df[col]))
+        else:
+            pa = _require_pyarrow()
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if fmt == "arrow":
+                import pyarrow.feather as feather
+                feather.write_feather(table, out_dir / f"{key}.arrow", compression="uncompressed")
+            else:
+                import pyarrow.parquet as pq
+                pq.write_table(table, out_dir / f"{key}.parquet")
+        manifest["statements"][key] = {"columns": list(df.columns), "rows": len(df)}
+
+    with open(out_dir / MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=4)
+    return out_dir
+
+def convert_csv_to_columnar(data_dir: Path, fmt: str = "npy", out_dir: Optional[Path] = None) -> Path:
+    """
+    One-shot converter from the CSV layout (statement_files) to a columnar bundle,
+    by default data_dir/columnar.
+    """
+    data = {key: load_statement(data_dir, key) for key in statement_files()}
+    return write_columnar(data, out_dir or data_dir / COLUMNAR_DIR, fmt)
+
+def _projected(available: Sequence[str], key: str, columns: Optional[Sequence[str]]) -> List[str]:
+    wanted = list(columns) if columns is not None else KEY_COLUMNS + REQUIRED_COLUMNS[key]
+    return [col for col in wanted if col in available]
+
+def load_columnar(bundle_dir: Path, columns: Optional[Dict[str, Sequence[str]]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Loads a columnar bundle with column projection: by default only the columns
+    REQUIRED_COLUMNS needs (plus a company key if present) are read. npy columns
+    are memory-mapped and wrapped without copying; Arrow IPC files are
+    memory-mapped by pyarrow.
+    """
+    manifest_path = bundle_dir / MANIFEST
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"Columnar manifest not found: {manifest_path}")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    fmt = manifest["format"]
+
+    data = {}
+    for key, info in manifest["statements"].items():
+        wanted = _projected(info["columns"], key, (columns or {}).get(key))
+        if fmt == "npy":
+            # Plain ndarray views over the read-only mappings (no copy)
+            arrays = {col: np.load(bundle_dir / key / f"{col}.npy", mmap_mode="r").view(np.ndarray) for col in wanted}
+            data[key] = pd.DataFrame(arrays, copy=False)
+        elif fmt == "arrow":
+            _require_pyarrow()
+            import pyarrow.feather as feather
+            data[key] = feather.read_table(bundle_dir / f"{key}.arrow", columns=wanted, memory_map=True).to_pandas()
+        else:
+            _require_pyarrow()
+            import pyarrow.parquet as pq
+            data[key] = pq.read_table(bundle_dir / f"{key}.parquet", columns=wanted).to_pandas()
+
+    return data
+
+def has_columnar(data_dir: Path) -> bool:
+    """True when data_dir holds a columnar bundle at least as new as every statement CSV."""
+    manifest_path = data_dir / COLUMNAR_DIR / MANIFEST
+    if not manifest_path.exists():
+        return False
+    bundle_mtime = manifest_path.stat().st_mtime
+    csv_paths = [data_dir / filename for filename in statement_files().values()]
+    return all(not p.exists() or p.stat().st_mtime <= bundle_mtime for p in csv_paths)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Convert the statement CSVs in a data directory to a columnar bundle.")
+    parser.add_argument("data_dir", type=Path)
+    parser.add_argument("--fmt", choices=FORMATS, default="npy")
+    parser.add_argument("--out", type=Path, help="Output directory (default: <data_dir>/columnar)")
+    args = parser.parse_args()
+    print(f"Columnar bundle written to {convert_csv_to_columnar(args.data_dir, args.fmt, args.out)}")
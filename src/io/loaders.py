@@ -1,29 +1,81 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
+from config import SETTINGS
 
-def load_data(data_dir: Path) -> Dict[str, pd.DataFrame]:
+# Optional fiscal quarter column (1-4) of quarterly statements
+QUARTER_COL = "quarter"
+QUARTERS_PER_YEAR = 4
+# Integer period columns; storage without an integer type hands them back as float/object
+KEY_COLUMNS = ("year", QUARTER_COL)
+
+def period_index(df: pd.DataFrame) -> np.ndarray:
+    """
+    Sortable period number of every row: the year for annual statements,
+    year * 4 + quarter - 1 for quarterly ones (consecutive quarters differ by 1).
+    """
+    years = df["year"].to_numpy()
+    if QUARTER_COL not in df.columns:
+        return years
+    return years * QUARTERS_PER_YEAR + df[QUARTER_COL].to_numpy() - 1
+
+def cast_key_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Casts the KEY_COLUMNS present in df back to int, in place."""
+    for col in KEY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(int)
+    return df
+
+def statement_files() -> Dict[str, str]:
+    """Statement key -> CSV file name, from SETTINGS.data.statement_files."""
+    return SETTINGS.data.statement_files
+
+def load_statement(data_dir: Path, key: str, files: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Loads a single statement CSV (see statement_files) from the data directory.
+    """
+    file_path = data_dir / (files or statement_files())[key]
+    if not file_path.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+    
+    df = pd.read_csv(file_path)
+    # Ensure year (and quarter) is int
+    return cast_key_columns(df)
+
+def load_data(data_dir: Path, fmt: str = "csv") -> Dict[str, pd.DataFrame]:
     """
     Loads financial data from CSV files in the data directory.
     Returns a dictionary of DataFrames.
+    fmt="columnar" reads the converted bundle in data_dir/columnar (memory-mapped,
+    required columns only); fmt="auto" uses it when it is up to date, else the CSVs.
     """
-    files = {
-        "income_statement": "ambev_income_statement.csv",
-        "balance_sheet": "ambev_balance_sheet.csv",
-        "cash_flow": "ambev_cash_flow.csv"
-    }
-    
+    if fmt != "csv":
+        from .columnar import COLUMNAR_DIR, has_columnar, load_columnar
+        if fmt == "columnar" or (fmt == "auto" and has_columnar(data_dir)):
+            return load_columnar(data_dir / COLUMNAR_DIR)
+        if fmt != "auto":
+            raise ValueError(f"Unknown data format: {fmt}. Expected 'csv', 'columnar' or 'auto'.")
+            
     data = {}
-    for key, filename in files.items():
-        file_path = data_dir / filename
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
-        
-        df = pd.read_csv(file_path)
-        # Ensure year is int
-        if 'year' in df.columns:
-            df['year'] = df['year'].astype(int)
-        
-        data[key] = df
+    for key in statement_files():
+        data[key] = load_statement(data_dir, key)
         
     return data
+
+def stack_panel(company_data: Dict[str, Dict[str, pd.DataFrame]], company_col: str = "company") -> Dict[str, pd.DataFrame]:
+    """
+    Stacks per-company statement dictionaries (as returned by load_data) into a
+    long-format panel: one DataFrame per statement with a company column.
+    """
+    panel = {}
+    statements = sorted({key for data in company_data.values() for key in data})
+    for key in statements:
+        frames = [
+            data[key].assign(**{company_col: company})
+            for company, data in company_data.items()
+            if key in data
+        ]
+        panel[key] = pd.concat(frames, ignore_index=True)
+        
+    return panel
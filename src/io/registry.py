@@ -0,0 +1,241 @@
+import glob
+import sqlite3
+from abc import ABC, abstractmethod
+import pandas as pd
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from config import SETTINGS, DataSourceConfig
+from .loaders import QUARTER_COL, cast_key_columns, load_statement, statement_files
+from .validators import REQUIRED_COLUMNS, ValidationReport, Violation, validate_panel
+
+class DataSource(ABC):
+    """
+    A location holding statements for one or more companies. read() returns the
+    statement frame of every requested company the source has (absent companies
+    are simply missing from the result).
+    """
+    @abstractmethod
+    def companies(self) -> List[str]:
+        """Ids of the companies this source holds."""
+
+    @abstractmethod
+    def read(self, key: str, companies: Sequence[str]) -> Dict[str, pd.DataFrame]:
+        """Statement key's frame for each of companies the source has."""
+
+class DirectorySource(DataSource):
+    """
+    One directory per company, holding the statement files named in
+    SETTINGS.data.statement_files (or the given mapping).
+    """
+    def __init__(self, directories: Dict[str, Path], files: Optional[Dict[str, str]] = None):
+        self.directories = {company: Path(path) for company, path in directories.items()}
+        self.files = files
+
+    def companies(self) -> List[str]:
+        return list(self.directories)
+
+    def read(self, key: str, companies: Sequence[str]) -> Dict[str, pd.DataFrame]:
+        # One file open at a time, only for the companies asked for
+        frames = {}
+        for company in companies:
+            try:
+                frames[company] = load_statement(self.directories[company], key, self.files)
+            except FileNotFoundError:
+                continue
+        return frames
+
+class GlobSource(DirectorySource):
+    """
+    Company directories matched by a glob pattern; the directory name is the company id.
+    """
+    def __init__(self, pattern: str, files: Optional[Dict[str, str]] = None):
+        paths = sorted(Path(p) for p in glob.glob(pattern) if Path(p).is_dir())
+        super().__init__({path.name: path for path in paths}, files)
+        self.pattern = pattern
+
+class SQLiteSource(DataSource):
+    """
+    SQLite file with one table per statement (table name = statement key) and a
+    company column. Reads are bulk-batched: one query per statement and batch of
+    companies instead of one per company.
+    """
+    def __init__(self, path: Path, company_col: str = "company", batch_size: Optional[int] = None, files: Optional[Dict[str, str]] = None):
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"File not found: {self.path}")
+        self.company_col = company_col
+        self.files = files
+        self.batch_size = batch_size or SETTINGS.data.batch_size
+
+    def _tables(self, conn: sqlite3.Connection) -> List[str]:
+        return [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+
+    def companies(self) -> List[str]:
+        with sqlite3.connect(self.path) as conn:
+            tables = [table for table in self._tables(conn) if table in (self.files or statement_files())]
+            if not tables:
+                return []
+            union = " UNION ".join(f'SELECT "{self.company_col}" FROM "{table}"' for table in tables)
+            return sorted(str(row[0]) for row in conn.execute(union))
+
+    def read(self, key: str, companies: Sequence[str]) -> Dict[str, pd.DataFrame]:
+        frames = {}
+        with sqlite3.connect(self.path) as conn:
+            if key not in self._tables(conn):
+                return frames
+            for start in range(0, len(companies), self.batch_size):
+                batch = list(companies[start:start + self.batch_size])
+                placeholders = ", ".join("?" * len(batch))
+                # rowid order keeps each company's rows as stored, so validation sees them unsorted if they are
+                query = f'SELECT * FROM "{key}" WHERE "{self.company_col}" IN ({placeholders}) ORDER BY rowid'
+                df = pd.read_sql_query(query, conn, params=batch)
+                for company, group in df.groupby(self.company_col, sort=False):
+                    group = group.drop(columns=self.company_col).reset_index(drop=True)
+                    # Annual companies stored next to quarterly ones have an all-NULL quarter column
+                    if QUARTER_COL in group.columns and group[QUARTER_COL].isna().all():
+                        group = group.drop(columns=QUARTER_COL)
+                    frames[str(company)] = cast_key_columns(group)
+        return frames
+
+def write_sqlite(panel: Dict[str, pd.DataFrame], path: Path, company_col: str = "company") -> Path:
+    """
+    Writes a long-format panel (see stack_panel) as a SQLiteSource database,
+    with an index on the company column of every statement table.
+    """
+    with sqlite3.connect(path) as conn:
+        for key, df in panel.items():
+            df.to_sql(key, conn, if_exists="replace", index=False)
+            conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{key}_{company_col}" ON "{key}" ("{company_col}")')
+    return path
+
+class LazyStatements(Mapping):
+    """
+    Read-only statement mapping for one company that loads each statement on
+    first access. Drop-in for the dict returned by load_data.
+    """
+    def __init__(self, registry: "DataRegistry", company: str):
+        self.registry = registry
+        self.company = company
+        self._frames: Dict[str, pd.DataFrame] = {}
+
+    @property
+    def loaded(self) -> List[str]:
+        return list(self._frames)
+
+    def __getitem__(self, key: str) -> pd.DataFrame:
+        if key not in self._frames:
+            frames = self.registry.read(key, [self.company])
+            if self.company not in frames:
+                raise KeyError(key)
+            self._frames[key] = frames[self.company]
+        return self._frames[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.registry.statements)
+
+    def __len__(self) -> int:
+        return len(self.registry.statements)
+
+class DataRegistry:
+    """
+    Maps company ids to the source that holds their statements (directories,
+    glob-matched directories or a SQLite file). Nothing is read at registration:
+    get() returns a lazy per-company mapping and load_panel() reads statements
+    for many companies in bulk batches.
+    """
+    def __init__(self, files: Optional[Dict[str, str]] = None, batch_size: Optional[int] = None):
+        self.files = files
+        self.batch_size = batch_size or SETTINGS.data.batch_size
+        self._sources: Dict[str, DataSource] = {}
+
+    @property
+    def statements(self) -> List[str]:
+        return list(self.files or statement_files())
+
+    def add(self, source: DataSource) -> "DataRegistry":
+        for company in source.companies():
+            if company in self._sources:
+                raise ValueError(f"Company {company} is already registered.")
+            self._sources[company] = source
+        return self
+
+    def register(self, company: str, directory: Path) -> "DataRegistry":
+        return self.add(DirectorySource({company: directory}, self.files))
+
+    def register_glob(self, pattern: str) -> "DataRegistry":
+        return self.add(GlobSource(pattern, self.files))
+
+    def register_sqlite(self, path: Path) -> "DataRegistry":
+        return self.add(SQLiteSource(path, batch_size=self.batch_size, files=self.files))
+
+    @classmethod
+    def from_config(cls, data: Optional[DataSourceConfig] = None) -> "DataRegistry":
+        """Registry for SETTINGS.data (or the given DataSourceConfig)."""
+        data = data or SETTINGS.data
+        registry = cls(dict(data.statement_files), data.batch_size)
+        if data.directories:
+            registry.add(DirectorySource(data.directories, registry.files))
+        for pattern in data.globs:
+            registry.register_glob(pattern)
+        if data.sqlite:
+            registry.register_sqlite(Path(data.sqlite))
+        return registry
+
+    def companies(self) -> List[str]:
+        return list(self._sources)
+
+    def __contains__(self, company: str) -> bool:
+        return company in self._sources
+
+    def get(self, company: str) -> LazyStatements:
+        if company not in self._sources:
+            raise KeyError(f"Unknown company: {company}")
+        return LazyStatements(self, company)
+
+    def read(self, key: str, companies: Sequence[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Statement frames for the given companies, grouped by source and read in
+        batches of batch_size companies.
+        """
+        by_source: Dict[int, Tuple[DataSource, List[str]]] = {}
+        for company in companies:
+            source = self._sources[company]
+            by_source.setdefault(id(source), (source, []))[1].append(company)
+
+        frames = {}
+        for source, members in by_source.values():
+            for start in range(0, len(members), self.batch_size):
+                frames.update(source.read(key, members[start:start + self.batch_size]))
+        return {company: frames[company] for company in companies if company in frames}
+
+    def load_panel(self, companies: Optional[Sequence[str]] = None, validate: bool = True, company_col: str = "company") -> Tuple[Dict[str, pd.DataFrame], ValidationReport]:
+        """
+        Reads statements one at a time (in validation order) for the companies
+        still valid, validating each stacked statement in one vectorized pass, so
+        a company rejected on its first statement is never read further. Returns
+        the long-format panel of the surviving companies and the validation
+        report covering every requested company.
+        """
+        remaining = list(companies) if companies is not None else self.companies()
+        report = ValidationReport(companies=list(remaining))
+        order = [key for key in REQUIRED_COLUMNS if key in self.statements] + [key for key in self.statements if key not in REQUIRED_COLUMNS]
+        stacked: Dict[str, pd.DataFrame] = {}
+
+        for key in order:
+            frames = self.read(key, remaining)
+            report.violations.extend(Violation(company, key, None, "missing_statement") for company in remaining if company not in frames)
+            if not frames:
+                remaining = []
+                break
+            df = pd.concat([frame.assign(**{company_col: company}) for company, frame in frames.items()], ignore_index=True)
+            if validate and key in REQUIRED_COLUMNS:
+                report.violations.extend(validate_panel({key: df}, company_col, [key]).violations)
+            bad = {v.company for v in report.violations}
+            remaining = [company for company in remaining if company not in bad]
+            stacked[key] = df
+
+        panel = {}
+        for key, df in stacked.items():
+            panel[key] = df[df[company_col].isin(remaining)].reset_index(drop=True)
+        return (panel if remaining else {}), report
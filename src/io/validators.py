@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
-from typing import Dict, List
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+from .loaders import period_index
 
 REQUIRED_COLUMNS = {
     "income_statement": [
@@ -13,30 +16,157 @@ REQUIRED_COLUMNS = {
     ]
 }
 
-def validate_data(data: Dict[str, pd.DataFrame]) -> None:
+def validate_data(data: Mapping[str, pd.DataFrame]) -> None:
     """
     Validates that the required columns are present in each DataFrame.
+    Statements are checked in REQUIRED_COLUMNS order, so a lazy mapping stops
+    loading at the first invalid statement.
     """
-    for key, cols in REQUIRED_COLUMNS.items():
+    for key in REQUIRED_COLUMNS:
         if key not in data:
             raise ValueError(f"Missing dataframe for: {key}")
-        
-        df = data[key]
-        missing = [col for col in cols if col not in df.columns]
-        
-        if missing:
-            raise ValueError(f"Missing columns in {key}: {missing}")
-        
-        # Check specific constraints
-        # 1. Years in ascending order
-        if not df["year"].is_monotonic_increasing:
-             raise ValueError(f"Years in {key} must be sorted in ascending order.")
-             
-        # 2. No NaN in numeric columns (simple check)
-        numeric_cols = df.select_dtypes(include="number").columns
-        if df[numeric_cols].isnull().any().any():
-             raise ValueError(f"Found NaN values in numeric columns of {key}.")
-             
-        # 3. Check for duplicates in year
-        if df["year"].duplicated().any():
-             raise ValueError(f"Duplicate years found in {key}.")
+        validate_statement(key, data[key])
+
+def validate_statement(key: str, df: pd.DataFrame) -> None:
+    """
+    Validates a single statement: required columns, sorted unique years (or
+    (year, quarter) periods for quarterly statements), no NaN.
+    """
+    cols = REQUIRED_COLUMNS[key]
+    missing = [col for col in cols if col not in df.columns]
+    
+    if missing:
+        raise ValueError(f"Missing columns in {key}: {missing}")
+    
+    # Check specific constraints
+    # 1. Years in ascending order
+    periods = pd.Series(period_index(df))
+    if not periods.is_monotonic_increasing:
+         raise ValueError(f"Years in {key} must be sorted in ascending order.")
+         
+    # 2. No NaN in numeric columns (simple check)
+    numeric_cols = df.select_dtypes(include="number").columns
+    if df[numeric_cols].isnull().any().any():
+         raise ValueError(f"Found NaN values in numeric columns of {key}.")
+         
+    # 3. Check for duplicates in year
+    if periods.duplicated().any():
+         raise ValueError(f"Duplicate years found in {key}.")
+
+# Rules checked by validate_panel (same checks as validate_statement)
+RULES = ["missing_statement", "missing_column", "unsorted_years", "nan_values", "duplicate_year"]
+
+@dataclass
+class Violation:
+    company: str
+    statement: str
+    column: Optional[str]
+    rule: str
+    rows: List[int] = field(default_factory=list)  # panel row labels (empty for missing data)
+
+@dataclass
+class ValidationReport:
+    """
+    Every violation found in a panel, plus the companies that were checked.
+    Companies with at least one violation are quarantined by quarantine().
+    """
+    companies: List[str]
+    violations: List[Violation] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+    @property
+    def bad_companies(self) -> List[str]:
+        bad = {v.company for v in self.violations}
+        return [company for company in self.companies if company in bad]
+
+    @property
+    def valid_companies(self) -> List[str]:
+        bad = {v.company for v in self.violations}
+        return [company for company in self.companies if company not in bad]
+
+    def by_company(self) -> Dict[str, List[Violation]]:
+        grouped: Dict[str, List[Violation]] = {}
+        for violation in self.violations:
+            grouped.setdefault(violation.company, []).append(violation)
+        return grouped
+
+    def to_frame(self) -> pd.DataFrame:
+        columns = ["company", "statement", "column", "rule", "rows"]
+        return pd.DataFrame([asdict(v) for v in self.violations], columns=columns)
+
+    def summary(self) -> str:
+        return f"{len(self.valid_companies)} of {len(self.companies)} companies valid, {len(self.violations)} violations in {len(self.bad_companies)} companies"
+
+def _group_rows(names: np.ndarray, codes: np.ndarray, labels: np.ndarray) -> List[Tuple[str, List[int]]]:
+    """(company, row labels) for each company code present, in code order."""
+    if len(codes) == 0:
+        return []
+    order = np.argsort(codes, kind="stable")
+    codes, labels = codes[order], labels[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    return [(str(names[codes[start]]), labels[start:end].tolist()) for start, end in zip(starts, np.r_[starts[1:], len(codes)])]
+
+def validate_panel(panel: Mapping[str, pd.DataFrame], company_col: str = "company", statements: Optional[Sequence[str]] = None) -> ValidationReport:
+    """
+    Runs every validate_statement check for every company of a long-format panel
+    (see stack_panel) in one vectorized pass per statement, collecting all
+    violations instead of raising on the first.
+    """
+    statements = list(statements) if statements is not None else list(REQUIRED_COLUMNS)
+    companies = pd.unique(np.concatenate([panel[key][company_col].astype(str).to_numpy() for key in statements if key in panel] or [np.array([], dtype=str)]))
+    report = ValidationReport(companies=[str(c) for c in companies])
+
+    for key in statements:
+        if key not in panel:
+            report.violations.extend(Violation(c, key, None, "missing_statement") for c in report.companies)
+            continue
+        df = panel[key]
+        codes, names = pd.factorize(df[company_col].astype(str))
+        labels = df.index.to_numpy()
+
+        present = set(names)
+        report.violations.extend(Violation(c, key, None, "missing_statement") for c in report.companies if c not in present)
+        missing = [col for col in REQUIRED_COLUMNS[key] if col not in df.columns]
+        report.violations.extend(Violation(c, key, col, "missing_column") for col in missing for c in names)
+
+        if "year" in df.columns:
+            years = period_index(df)
+            # Consecutive rows of the same company (stable order keeps each company's own row order)
+            order = np.argsort(codes, kind="stable")
+            same = codes[order][1:] == codes[order][:-1]
+            backwards = order[1:][same & (years[order][1:] < years[order][:-1])]
+            for company, rows in _group_rows(names, codes[backwards], labels[backwards]):
+                report.violations.append(Violation(company, key, "year", "unsorted_years", rows))
+
+            duplicated = np.flatnonzero(pd.DataFrame({"c": codes, "y": years}).duplicated().to_numpy())
+            for company, rows in _group_rows(names, codes[duplicated], labels[duplicated]):
+                report.violations.append(Violation(company, key, "year", "duplicate_year", rows))
+
+        # A column absent from one company's frame is all-NaN for it once stacked
+        row_counts = dict(zip(names, np.bincount(codes, minlength=len(names))))
+        numeric_cols = [col for col in df.select_dtypes(include="number").columns if col != company_col]
+        nan_rows, nan_cols = np.nonzero(df[numeric_cols].isna().to_numpy())
+        for j in np.unique(nan_cols):
+            rows = nan_rows[nan_cols == j]
+            for company, company_rows in _group_rows(names, codes[rows], labels[rows]):
+                if len(company_rows) == row_counts[company] and numeric_cols[j] in REQUIRED_COLUMNS[key]:
+                    report.violations.append(Violation(company, key, numeric_cols[j], "missing_column"))
+                else:
+                    report.violations.append(Violation(company, key, numeric_cols[j], "nan_values", company_rows))
+
+    return report
+
+def quarantine(panel: Mapping[str, pd.DataFrame], report: ValidationReport, company_col: str = "company") -> Tuple[Dict[str, pd.DataFrame], Dict[str, pd.DataFrame]]:
+    """
+    Splits a panel into (clean, quarantined) panels by the report's bad companies.
+    """
+    bad = report.bad_companies
+    clean, quarantined = {}, {}
+    for key, df in panel.items():
+        mask = df[company_col].astype(str).isin(bad).to_numpy()
+        clean[key] = df[~mask].reset_index(drop=True)
+        quarantined[key] = df[mask].reset_index(drop=True)
+    return clean, quarantined
@@ -0,0 +1,117 @@
+import time
+from dataclasses import astuple, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from config import SETTINGS
+from ..io.loaders import load_statement, statement_files
+from ..io.validators import validate_data
+from ..finance.cache import frame_fingerprint, make_key
+from ..finance.metrics import calculate_historical_metrics, historical_averages
+from ..finance.projections import project_financials
+from ..finance.dcf import calculate_dcf
+from ..finance.checks import check_projection_consistency
+from ..finance.sensitivity import calculate_sensitivity_grid
+from ..reporting.export import export_summary
+
+# Scenario fields each stage reads; the other fields cannot affect that stage
+OPERATING_FIELDS = ("revenue_growth", "ebit_margin", "capex_pct_rev", "depreciation_pct_capex", "nwc_pct_rev_change")
+# Driver schedules shape the projections too; terminal_g is the default fade target
+PROJECTION_FIELDS = OPERATING_FIELDS + ("schedules", "terminal_g")
+
+@dataclass
+class IncrementalReport:
+    recomputed: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        return f"{len(self.recomputed)} stages recomputed, {len(self.skipped)} skipped in {self.seconds * 1e3:.1f} ms (recomputed: {', '.join(self.recomputed) or 'none'})"
+
+class IncrementalValuation:
+    """
+    Dependency-tracked version of run_all. Every stage (node) remembers a key built
+    from exactly the inputs it reads: statement files, upstream values, and the
+    SETTINGS fields it uses. run() recomputes only nodes whose key changed and
+    reuses everything else, e.g. a WACC edit reuses the projections and only
+    re-discounts them; an edit to a non-final historical year re-runs the metrics
+    but not the projections, which depend only on the last year.
+    Edit SETTINGS (or the data files) in place, then call run() again.
+    """
+    def __init__(self, base_dir: Path, plots: bool = False):
+        self.data_dir = base_dir / "data"
+        self.output_dir = base_dir / "outputs"
+        self.plots = plots
+        self._nodes: Dict[str, Tuple[str, Any]] = {}
+
+    def key_of(self, name: str) -> Optional[str]:
+        node = self._nodes.get(name)
+        return node[0] if node else None
+
+    def _node(self, name: str, key_parts: Sequence[Any], compute: Callable[[], Any], report: IncrementalReport) -> Any:
+        key = make_key(*key_parts)
+        node = self._nodes.get(name)
+        if node is not None and node[0] == key:
+            report.skipped.append(name)
+            return node[1]
+
+        start = time.perf_counter()
+        value = compute()
+        report.stage_seconds[name] = time.perf_counter() - start
+        report.recomputed.append(name)
+        self._nodes[name] = (key, value)
+        return value
+
+    def _load(self, key: str) -> Tuple[Any, str]:
+        df = load_statement(self.data_dir, key)
+        return df, frame_fingerprint(df)
+
+    def run(self) -> IncrementalReport:
+        report = IncrementalReport()
+        start = time.perf_counter()
+        self.output_dir.mkdir(exist_ok=True)
+
+        # Loaders: keyed on file identity (mtime/size); content fingerprint flows downstream
+        data, data_fps = {}, {}
+        for key, filename in statement_files().items():
+            stat = (self.data_dir / filename).stat()
+            data[key], data_fps[key] = self._node(f"load:{key}", [filename, stat.st_mtime_ns, stat.st_size], lambda: self._load(key), report)
+
+        self._node("validate", [data_fps], lambda: validate_data(data), report)
+        historical = self._node("metrics", [data_fps, SETTINGS.tax_rate], lambda: calculate_historical_metrics(data), report)
+
+        # Projections read only the last historical year
+        last_year = historical.iloc[-1]
+        anchor = (float(last_year["revenue"]), float(last_year["year"]))
+        averages = historical_averages(historical)
+
+        results, warnings = {}, []
+        for name, params in SETTINGS.scenarios.items():
+            drivers = tuple(getattr(params, f) for f in PROJECTION_FIELDS)
+            proj = self._node(f"projections:{name}", [anchor, drivers, SETTINGS.years_forecast, SETTINGS.tax_rate], lambda: project_financials(historical, params), report)
+            proj_key = self.key_of(f"projections:{name}")
+
+            res = self._node(f"dcf:{name}", [proj_key, params.wacc, params.terminal_g, SETTINGS.net_debt, SETTINGS.discounting, name], lambda: calculate_dcf(proj, params, SETTINGS.net_debt, name), report)
+            scenario_warnings = self._node(f"checks:{name}", [proj_key, averages.ebit_margin, params.terminal_g, name], lambda: check_projection_consistency(historical, proj, name, averages), report)
+
+            results[name] = res
+            if res.terminal_share_warning:
+                warnings.append(f"[{name}] {res.terminal_share_warning}")
+            warnings.extend(scenario_warnings)
+
+        sensitivity_data = {}
+        if "base" in results:
+            sensitivity = SETTINGS.sensitivity
+            sensitivity_data = self._node("sensitivity", [self.key_of("projections:base"), sensitivity.wacc_values, sensitivity.terminal_g_values, SETTINGS.discounting], lambda: calculate_sensitivity_grid(self._nodes["projections:base"][1]), report)
+
+        result_keys = [self.key_of(f"dcf:{name}") for name in results]
+        chart_insights = {}
+        if self.plots and sensitivity_data:
+            from ..reporting.plots import plot_all
+            chart_insights = self._node("plots", [result_keys, self.key_of("sensitivity")], lambda: plot_all(results, sensitivity_data, self.output_dir), report)
+
+        assumptions = [astuple(params) for params in SETTINGS.scenarios.values()]
+        self._node("export", [result_keys, assumptions, warnings, self.key_of("sensitivity"), chart_insights], lambda: export_summary(results, sensitivity_data, warnings, chart_insights, self.output_dir), report)
+
+        report.seconds = time.perf_counter() - start
+        return report
@@ -1,115 +1,320 @@
+import json
 import pandas as pd
-from datetime import datetime
 from pathlib import Path
+from typing import Dict, Mapping, Optional, Union
 from config import SETTINGS
 from ..io.loaders import load_data
-from ..io.validators import validate_data
-from ..finance.metrics import calculate_historical_metrics
+from ..io.registry import DataRegistry
+from ..io.validators import validate_data, validate_panel, quarantine
+from ..finance.metrics import calculate_historical_metrics, historical_averages
 from ..finance.scenarios import run_scenarios
-from ..finance.checks import check_projection_consistency
-from ..finance.sensitivity import calculate_sensitivity_grid
+from ..finance.batch import run_batch, iter_batch, BatchValuation
+from ..finance.montecarlo import run_monte_carlo, MonteCarloResult
+from ..finance.projections import project_financials
+from ..finance.checks import consistency_warnings
+from ..finance.greeks import calculate_greeks
+from ..finance.sensitivity import calculate_sensitivity_grid, calculate_sensitivity_cube
 from ..reporting.export import export_summary
-from ..reporting.plots import plot_all
+from ..reporting.render import render_charts
+from ..reporting.stream import StreamWriter, StreamedExport
+from ..runtime.executor import Executor
+from ..runtime.instrumentation import count, instrumented, span
+from .runlog import RunLogger
 
-def log_message(message: str, log_file: Path) -> None:
-    """
-    Logs message to console and appends to log file.
-    """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    formatted_msg = f"[{timestamp}] {message}"
-    print(formatted_msg)
-    with open(log_file, "a") as f:
-        f.write(formatted_msg + "\n")
-
-def run_all(base_dir: Path) -> None:
+def run_all(base_dir: Path, executor: Optional[Executor] = None, charts: Optional[str] = None) -> None:
     """
     Orchestrates the entire valuation pipeline in professional batch mode.
+    Scenario and sensitivity fan-out uses the given executor (default: built
+    from SETTINGS.execution). charts overrides SETTINGS.charts.mode for this
+    run ("on", "off" or "defer"). With SETTINGS.instrumentation.enabled, stage
+    spans and counters are exported to outputs/ (instrumentation.jsonl, trace.json).
     """
-    data_dir = base_dir / "data"
+    if executor is None:
+        with Executor() as executor:
+            return run_all(base_dir, executor, charts)
+            
     output_dir = base_dir / "outputs"
     output_dir.mkdir(exist_ok=True)
+    with instrumented() as instrumentation, RunLogger(output_dir / "run_log.txt") as log:
+        try:
+            with span("run_all"):
+                _run_pipeline(base_dir, executor, charts, log)
+        finally:
+            if instrumentation is not None:
+                instrumentation.export(output_dir)
+
+def _run_pipeline(base_dir: Path, executor: Executor, charts: Optional[str], log: RunLogger) -> None:
+    data_dir = base_dir / "data"
+    output_dir = base_dir / "outputs"
     
-    log_file = output_dir / "run_log.txt"
-    with open(log_file, "w") as f:
-        f.write(f"Run Log initialized at {datetime.now()}\n")
-        
-    log_message("Starting Valuation Pipeline (Executive Mode)...", log_file)
+    log.info("Starting Valuation Pipeline (Executive Mode)...")
     
     # 1. Load Data
-    log_message(f"Loading data from {data_dir}...", log_file)
+    log.info(f"Loading data from {data_dir}...")
     try:
-        data = load_data(data_dir)
+        with span("load"):
+            data = load_data(data_dir, fmt="auto")
+            count("rows_loaded", sum(len(df) for df in data.values()))
     except FileNotFoundError as e:
-        log_message(f"[ERROR] Could not load data: {e}", log_file)
+        log.error(f"Could not load data: {e}")
         return
         
     # 2. Validate Data
-    log_message("Validating data structure...", log_file)
+    log.info("Validating data structure...")
     try:
-        validate_data(data)
+        with span("validate"):
+            validate_data(data)
     except ValueError as e:
-        log_message(f"[ERROR] Data validation failed: {e}", log_file)
+        log.error(f"Data validation failed: {e}")
         return
         
     # 3. Calculate Historical Metrics
-    log_message("Calculating historical metrics...", log_file)
-    historical_df = calculate_historical_metrics(data)
+    log.info("Calculating historical metrics...")
+    with span("metrics"):
+        historical_df = calculate_historical_metrics(data)
     
     # 4. Scenarios
     net_debt = SETTINGS.net_debt
-    log_message(f"Running scenarios with Net Debt: {net_debt:,.2f} {SETTINGS.currency_unit}...", log_file)
+    log.info(f"Running scenarios with Net Debt: {net_debt:,.2f} {SETTINGS.currency_unit}...")
     
     try:
-        results = run_scenarios(historical_df, net_debt)
+        with span("scenarios", backend=executor.backend):
+            results = run_scenarios(historical_df, net_debt, executor)
     except ValueError as e:
-        log_message(f"[ERROR] Scenario calculation failed: {e}", log_file)
+        log.error(f"Scenario calculation failed: {e}")
         return
     
     # 5. Consistency Checks & Warnings
     all_warnings = []
-    log_message("Running economic consistency checks...", log_file)
+    log.info("Running economic consistency checks...")
     
-    for name, res in results.items():
-        if res.terminal_share_warning:
-            msg = f"[{name}] {res.terminal_share_warning}"
-            all_warnings.append(msg)
-            log_message(f"[WARN] {msg}", log_file)
-            
-        scenario_warnings = check_projection_consistency(historical_df, res.projections, name)
-        for w in scenario_warnings:
-            all_warnings.append(w)
-            log_message(f"[WARN] {w}", log_file)
+    with span("checks"):
+        averages = historical_averages(historical_df)
+        for name, res in results.items():
+            if res.terminal_share_warning:
+                msg = f"[{name}] {res.terminal_share_warning}"
+                all_warnings.append(msg)
+                log.warning(msg, scenario=name, check="terminal_share", terminal_share_pct=res.terminal_share_pct)
+                
+            for w in consistency_warnings(historical_df, res.projections, name, averages):
+                all_warnings.append(str(w))
+                log.warning(str(w), scenario=w.scenario, check=w.check, **w.values)
+        count("warnings", len(all_warnings))
 
     # 6. Sensitivity Analysis (Base Case)
     sensitivity_data = {}
     base_res = results.get("base")
     
     if base_res:
-        log_message("Calculating sensitivity grid (Base Case)...", log_file)
-        sensitivity_data = calculate_sensitivity_grid(base_res.projections)
-        log_message(f"[INSIGHT] {sensitivity_data['driver_analysis']}", log_file)
+        log.info("Calculating sensitivity grid (Base Case)...")
+        with span("sensitivity"):
+            sensitivity_data = calculate_sensitivity_grid(base_res.projections, executor)
+        log.info(f"[INSIGHT] {sensitivity_data['driver_analysis']}")
+        
+        base_params = SETTINGS.scenarios["base"]
+        if not base_params.schedules:  # the closed form needs constant drivers
+            with span("greeks"):
+                greeks = calculate_greeks(historical_df, {"base": base_params}).entry("base")
+            ranking = ", ".join(f"{name} ({swing:,.0f})" for name, swing in greeks.driver_ranking()[:3])
+            log.info(f"[INSIGHT] Analytic EV swings (default bumps): {ranking}")
+        
+        extra_axes = SETTINGS.sensitivity.extra_axes
+        if extra_axes:
+            axes = {"wacc": SETTINGS.sensitivity.wacc_values, "terminal_g": SETTINGS.sensitivity.terminal_g_values}
+            axes.update(extra_axes)
+            log.info(f"Calculating {len(axes)}-D sensitivity cube ({', '.join(axes)})...")
+            with span("sensitivity_cube", axes=list(axes)):
+                cube = calculate_sensitivity_cube(historical_df, SETTINGS.scenarios["base"], axes, executor)
+            sensitivity_data["driver_ranking"] = cube.driver_ranking()
+            ranking = ", ".join(f"{name} ({impact:,.0f})" for name, impact in cube.driver_ranking())
+            log.info(f"[INSIGHT] Drivers ranked by EV impact: {ranking}")
     else:
-        log_message("[WARNING] Base scenario not found, skipping sensitivity.", log_file)
+        log.warning("Base scenario not found, skipping sensitivity.")
     
     # 7. Generate All Plots
-    # This step now generates all requested charts (EV Composition, Waterfall, Lines, Heatmap)
-    log_message("Generating executive visualisations...", log_file)
+    # Charts are rendered in parallel, skipped when their inputs are unchanged, or deferred/disabled per run
+    log.info("Generating executive visualisations...")
     chart_insights = {}
     try:
-        chart_insights = plot_all(results, sensitivity_data, output_dir)
+        with span("plots"):
+            chart_insights, render_report = render_charts(results, sensitivity_data, output_dir, charts)
         for chart_name, insight in chart_insights.items():
-            log_message(f"[PLOT] {chart_name}: {insight}", log_file)
+            log.info(f"[PLOT] {chart_name}: {insight}")
+        for line in render_report.lines():
+            log.info(f"[TIMING] {line}")
     except Exception as e:
-        log_message(f"[ERROR] Plot generation failed: {e}", log_file)
+        log.error(f"Plot generation failed: {e}")
         # Continue to export remaining data
     
     # 8. Export Comprehensive Output
-    log_message(f"Exporting comprehensive results to {output_dir}...", log_file)
-    export_summary(results, sensitivity_data, all_warnings, chart_insights, output_dir)
+    log.info(f"Exporting comprehensive results to {output_dir}...")
+    with span("export"):
+        export_summary(results, sensitivity_data, all_warnings, chart_insights, output_dir)
     
     # 9. Summary Log
-    log_message("VALUATION SUMMARY (Enterprise Value):", log_file)
+    log.info("VALUATION SUMMARY (Enterprise Value):")
     for name, res in results.items():
-        log_message(f"- {name.capitalize()}: {res.enterprise_value:,.2f} ({SETTINGS.currency_unit})", log_file)
+        log.info(f"- {name.capitalize()}: {res.enterprise_value:,.2f} ({SETTINGS.currency_unit})")
+        
+    log.info("Pipeline completed successfully.")
+
+def run_batch_all(base_dir: Path, panel: Union[Dict[str, pd.DataFrame], DataRegistry], net_debt: Optional[Union[float, Mapping[str, float]]] = None, executor: Optional[Executor] = None) -> Optional[Union[BatchValuation, StreamedExport]]:
+    """
+    Batch mode: values every company of a long-format (company x year) panel under
+    all configured scenarios and exports batch_results.csv. No plots are produced.
+    Companies failing validation are quarantined (logged and written to
+    validation_report.csv) and the rest of the batch proceeds. Given a
+    DataRegistry, statements are bulk-loaded and validated as they are read.
+    With SETTINGS.export.streaming, companies are valued and written in chunks
+    (batch_summary.ndjson plus batch_projections.<format>) and the export
+    statistics are returned instead of the BatchValuation.
+    """
+    output_dir = base_dir / "outputs"
+    output_dir.mkdir(exist_ok=True)
+    with RunLogger(output_dir / "batch_log.txt", title="Batch Log") as log:
+        return _run_batch(output_dir, panel, net_debt, executor, log)
+
+def _run_batch(output_dir: Path, panel: Union[Dict[str, pd.DataFrame], DataRegistry], net_debt: Optional[Union[float, Mapping[str, float]]], executor: Optional[Executor], log: RunLogger) -> Optional[Union[BatchValuation, StreamedExport]]:
+    # 1. Load (registry) and validate every company in one pass; bad companies are quarantined
+    if isinstance(panel, DataRegistry):
+        log.info(f"Loading {len(panel.companies())} companies from the data registry...")
+        panel, report = panel.load_panel()
+    else:
+        log.info("Validating data structure...")
+        report = validate_panel(panel)
+        panel, _ = quarantine(panel, report)
+        
+    log.info(f"Validation: {report.summary()}")
+    if not report.ok:
+        report.to_frame().to_csv(output_dir / "validation_report.csv", index=False)
+        for company, violations in report.by_company().items():
+            rules = ", ".join(f"{v.rule} ({v.statement}{'.' + v.column if v.column else ''})" for v in violations)
+            log.warning(f"Quarantined {company}: {rules}", company=company, violations=[v.rule for v in violations])
+    if not report.valid_companies:
+        log.error("No company passed data validation.")
+        return None
+        
+    n_companies = len(report.valid_companies)
+    log.info(f"Starting Batch Valuation for {n_companies} companies...")
+    
+    # 2. Metrics, projections and DCF in one vectorized pass
+    log.info(f"Running {len(SETTINGS.scenarios)} scenarios per company...")
+    if SETTINGS.export.streaming:
+        return _stream_batch(output_dir, panel, net_debt, executor, log)
+    try:
+        batch = run_batch(panel, net_debt, executor=executor)
+    except ValueError as e:
+        log.error(f"Scenario calculation failed: {e}")
+        return None
+        
+    # 3. Export
+    log.info(f"Exporting batch results to {output_dir}...")
+    batch.to_frame().to_csv(output_dir / "batch_results.csv", index=False)
+    
+    log.info("Batch pipeline completed successfully.")
+    return batch
+
+def _stream_batch(output_dir: Path, panel: Dict[str, pd.DataFrame], net_debt: Optional[Union[float, Mapping[str, float]]], executor: Optional[Executor], log: RunLogger) -> Optional[StreamedExport]:
+    log.info(f"Streaming results in chunks of {SETTINGS.export.chunk_companies:,} companies ({SETTINGS.export.projections_format} projections)...")
+    try:
+        with StreamWriter(output_dir) as writer:
+            for chunk in iter_batch(panel, net_debt, executor=executor):
+                writer.write_batch(chunk)
+    except ValueError as e:
+        log.error(f"Scenario calculation failed: {e}")
+        return None
+        
+    stats = writer.close()
+    log.info(f"Wrote {stats.summary_rows:,} summary rows and {stats.projection_rows:,} projection rows in {stats.chunks} chunks to {output_dir}")
+    log.info("Batch pipeline completed successfully.")
+    return stats
+
+def run_monte_carlo_all(base_dir: Path, executor: Optional[Executor] = None, **overrides) -> Optional[MonteCarloResult]:
+    """
+    Monte Carlo mode: EV distribution for SETTINGS.monte_carlo, exported to
+    monte_carlo.json. Keyword overrides replace MonteCarloConfig fields.
+    """
+    output_dir = base_dir / "outputs"
+    output_dir.mkdir(exist_ok=True)
+    with RunLogger(output_dir / "monte_carlo_log.txt", title="Monte Carlo Log") as log:
+        return _run_monte_carlo(base_dir / "data", output_dir, executor, log, overrides)
+
+def _run_monte_carlo(data_dir: Path, output_dir: Path, executor: Optional[Executor], log: RunLogger, overrides: Dict) -> Optional[MonteCarloResult]:
+    try:
+        data = load_data(data_dir, fmt="auto")
+        validate_data(data)
+    except (FileNotFoundError, ValueError) as e:
+        log.error(f"Could not load data: {e}")
+        return None
+        
+    historical_df = calculate_historical_metrics(data)
+    mc = SETTINGS.monte_carlo
+    n_draws = overrides.get("n_draws", mc.n_draws)
+    log.info(f"Running {n_draws:,} Monte Carlo draws around the '{mc.base_scenario}' scenario...")
+    
+    try:
+        result = run_monte_carlo(historical_df, SETTINGS.net_debt, executor=executor, **overrides)
+    except (ValueError, ImportError) as e:
+        log.error(f"Monte Carlo failed: {e}")
+        return None
+        
+    if result.n_invalid:
+        log.warning(f"{result.n_invalid:,} draws rejected (terminal growth >= WACC).")
+    log.info(f"EV mean {result.ev_mean:,.2f}, std {result.ev_std:,.2f}; P(EV < net debt) = {result.prob_ev_below_net_debt:.2%}")
+    
+    with open(output_dir / "monte_carlo.json", "w") as f:
+        json.dump(result.to_dict(), f, indent=4)
+        
+    log.info("Monte Carlo completed successfully.")
+    return result
+
+def run_sensitivity_all(base_dir: Path, executor: Optional[Executor] = None, scenario: str = "base") -> Optional[Dict]:
+    """
+    Sensitivity mode: the WACC x terminal growth grid around one scenario's
+    projections (plus the SETTINGS.sensitivity.extra_axes cube ranking), exported
+    to sensitivity_grid.csv and sensitivity.json. No charts are drawn.
+    """
+    output_dir = base_dir / "outputs"
+    output_dir.mkdir(exist_ok=True)
+    with RunLogger(output_dir / "sensitivity_log.txt", title="Sensitivity Log") as log:
+        return _run_sensitivity(base_dir / "data", output_dir, executor, log, scenario)
+
+def _run_sensitivity(data_dir: Path, output_dir: Path, executor: Optional[Executor], log: RunLogger, scenario: str) -> Optional[Dict]:
+    if scenario not in SETTINGS.scenarios:
+        log.error(f"Unknown scenario: {scenario}. Expected one of {list(SETTINGS.scenarios)}")
+        return None
+    try:
+        data = load_data(data_dir, fmt="auto")
+        validate_data(data)
+    except (FileNotFoundError, ValueError) as e:
+        log.error(f"Could not load data: {e}")
+        return None
+        
+    historical_df = calculate_historical_metrics(data)
+    params = SETTINGS.scenarios[scenario]
+    log.info(f"Calculating sensitivity grid ({scenario} projections)...")
+    sensitivity_data = calculate_sensitivity_grid(project_financials(historical_df, params), executor)
+    log.info(f"[INSIGHT] {sensitivity_data['driver_analysis']}")
+    
+    extra_axes = SETTINGS.sensitivity.extra_axes
+    if extra_axes:
+        axes = {"wacc": SETTINGS.sensitivity.wacc_values, "terminal_g": SETTINGS.sensitivity.terminal_g_values}
+        axes.update(extra_axes)
+        log.info(f"Calculating {len(axes)}-D sensitivity cube ({', '.join(axes)})...")
+        sensitivity_data["driver_ranking"] = calculate_sensitivity_cube(historical_df, params, axes, executor).driver_ranking()
+    ranking = ", ".join(f"{name} ({impact:,.0f})" for name, impact in sensitivity_data["driver_ranking"])
+    log.info(f"[INSIGHT] Drivers ranked by EV impact: {ranking}")
+    
+    sensitivity_data["matrix"].to_csv(output_dir / "sensitivity_grid.csv", index_label="wacc")
+    with open(output_dir / "sensitivity.json", "w") as f:
+        json.dump({
+            "scenario": scenario,
+            "ev_base": float(sensitivity_data["ev_base"]),
+            "ev_min": float(sensitivity_data["ev_min"]),
+            "ev_max": float(sensitivity_data["ev_max"]),
+            "driver_analysis": sensitivity_data["driver_analysis"],
+            "driver_ranking": {name: float(impact) for name, impact in sensitivity_data["driver_ranking"]},
+        }, f, indent=4)
         
-    log_message("Pipeline completed successfully.", log_file)
+    log.info("Sensitivity analysis completed successfully.")
+    return sensitivity_data
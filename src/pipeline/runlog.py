@@ -0,0 +1,159 @@
+import atexit
+import json
+import queue
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from config import SETTINGS
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+# Text-log tag per level; INFO lines carry no tag, as in the original run logs
+TAGS = {"DEBUG": "[DEBUG] ", "INFO": "", "WARNING": "[WARN] ", "ERROR": "[ERROR] "}
+
+_FLUSH = object()
+_STOP = object()
+
+class RunLogger:
+    """
+    Buffered run log. log() only enqueues a record (blocking when the bounded
+    queue is full, so nothing is dropped); a background thread writes batches to
+    the text log, a JSON-lines sink (same name, .jsonl) and the console. The log
+    is flushed on flush(), close(), context exit (including errors) and
+    interpreter exit. If a sink fails, the writer records the error and keeps
+    draining the queue without writing; further records are ignored and
+    flush() and close() re-raise the error.
+    """
+    def __init__(self, log_file: Path, title: str = "Run Log", level: Optional[str] = None, echo: Optional[bool] = None, queue_size: Optional[int] = None, batch_size: int = 256):
+        settings = SETTINGS.logging
+        self.log_file = Path(log_file)
+        self.jsonl_file = self.log_file.with_suffix(".jsonl")
+        self.level = LEVELS[(level or settings.level).upper()]
+        self.echo = settings.echo if echo is None else echo
+        self.batch_size = batch_size
+        self.counts: Dict[str, int] = {name: 0 for name in LEVELS}
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size or settings.queue_size)
+        self._flushed = threading.Condition()
+        self._flush_requests = 0
+        self._flush_done = 0
+        self._closed = False
+        self._error: Optional[Exception] = None
+        self._text = open(self.log_file, "w")
+        self._jsonl = open(self.jsonl_file, "w")
+        self._text.write(f"{title} initialized at {datetime.now()}\n")
+        self._thread = threading.Thread(target=self._writer, name=f"runlog-{self.log_file.name}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, level: str, message: str, **fields: Any) -> None:
+        level = level.upper()
+        if LEVELS[level] < self.level or self._closed or self._error is not None:
+            return
+        self.counts[level] += 1
+        self._queue.put((datetime.now(), level, message, fields))
+
+    def debug(self, message: str, **fields: Any) -> None:
+        self.log("DEBUG", message, **fields)
+
+    def info(self, message: str, **fields: Any) -> None:
+        self.log("INFO", message, **fields)
+
+    def warning(self, message: str, **fields: Any) -> None:
+        self.log("WARNING", message, **fields)
+
+    def error(self, message: str, **fields: Any) -> None:
+        self.log("ERROR", message, **fields)
+
+    def _write(self, batch: List[tuple]) -> None:
+        text_lines, json_lines = [], []
+        for timestamp, level, message, fields in batch:
+            text_lines.append(f"[{timestamp:%Y-%m-%d %H:%M:%S}] {TAGS[level]}{message}\n")
+            record = {"ts": timestamp.isoformat(timespec="microseconds"), "level": level, "message": message}
+            record.update(fields)
+            json_lines.append(json.dumps(record, default=str) + "\n")
+        text = "".join(text_lines)
+        self._text.write(text)
+        self._jsonl.write("".join(json_lines))
+        if self.echo:
+            sys.stdout.write(text)
+
+    def _sync(self) -> None:
+        self._text.flush()
+        self._jsonl.flush()
+        if self.echo:
+            sys.stdout.flush()
+
+    def _guarded(self, sink_op: Callable[..., None], *args: Any) -> None:
+        """Runs a sink operation unless one already failed; records the first error."""
+        if self._error is not None:
+            return
+        try:
+            sink_op(*args)
+        except Exception as exc:
+            self._error = exc
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _writer(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = []
+            # Drain whatever is already queued into one write
+            while item is not _FLUSH and item is not _STOP:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    self._guarded(self._write, batch)
+                    batch = []
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+                    break
+            if batch:
+                self._guarded(self._write, batch)
+            if item is None:
+                continue
+            self._guarded(self._sync)
+            with self._flushed:
+                self._flush_done += 1
+                self._flushed.notify_all()
+            if item is _STOP:
+                return
+
+    def flush(self) -> None:
+        """
+        Blocks until every record logged so far is written and flushed; raises
+        the error of a failed sink.
+        """
+        if self._closed:
+            return
+        with self._flushed:
+            self._flush_requests += 1
+            target = self._flush_requests
+        self._queue.put(_FLUSH)
+        with self._flushed:
+            self._flushed.wait_for(lambda: self._flush_done >= target)
+        self._raise_error()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._text.close()
+        self._jsonl.close()
+        atexit.unregister(self.close)
+        self._raise_error()
+
+    def __enter__(self) -> "RunLogger":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.error(f"Pipeline aborted: {exc_type.__name__}: {exc}", exception=exc_type.__name__)
+        self.close()
@@ -0,0 +1,335 @@
+import json
+import math
+import threading
+import time
+import numpy as np
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from config import SETTINGS, ScenarioParams
+from ..io.loaders import load_data
+from ..io.validators import validate_data
+from ..finance.cache import ResultCache, frame_fingerprint, make_key
+from ..finance.dcf import calculate_dcf_arrays, terminal_share_warning
+from ..finance.discounting import discount_times
+from ..finance.metrics import calculate_historical_metrics
+from ..finance.projections import SCENARIO_DRIVERS, project_arrays, stack_scenario_params, stack_scenario_schedules
+from .runlog import RunLogger
+
+@dataclass
+class ValuationRequest:
+    scenario: str
+    params: ScenarioParams
+    net_debt: float
+
+class LatencyStats:
+    """
+    Completed-request latencies (the last max_samples) and throughput since start.
+    """
+    def __init__(self, max_samples: Optional[int] = None):
+        self._samples = deque(maxlen=max_samples or SETTINGS.server.latency_samples)
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.completed = 0
+        self.errors = 0
+
+    def record(self, seconds: float, ok: bool = True) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self.completed += 1
+            self.errors += not ok
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            samples = np.array(self._samples)
+            completed, errors = self.completed, self.errors
+        uptime = time.perf_counter() - self.started
+        # None (JSON null) until a request completes
+        p50, p99 = (float(q) for q in np.percentile(samples, [50, 99]) * 1000) if samples.size else (None, None)
+        return {
+            "requests": completed,
+            "errors": errors,
+            "p50_ms": p50,
+            "p99_ms": p99,
+            "mean_ms": float(samples.mean() * 1000) if samples.size else None,
+            "throughput_rps": completed / uptime if uptime > 0 else 0.0,
+            "uptime_s": uptime,
+        }
+
+def _finite(name: str, value: Any) -> float:
+    """value as a float; ValueError unless it is a finite JSON number."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{name} must be a finite number, got {value!r}")
+    return float(value)
+
+class RequestBatcher:
+    """
+    Coalesces items submitted from many threads: the first pending item opens a
+    window of window_s seconds (closed early at max_batch items), then evaluate
+    runs once on the whole batch from a single worker thread. evaluate returns
+    one result per item; an Exception in its place fails only that item's future.
+    """
+    def __init__(self, evaluate: Callable[[List[Any]], List[Any]], window_s: float, max_batch: int):
+        if max_batch < 1:
+            raise ValueError(f"max_batch must be positive, got {max_batch}")
+        self.evaluate = evaluate
+        self.window_s = window_s
+        self.max_batch = max_batch
+        self.batches = 0
+        self.items = 0
+        self.largest = 0
+        self._pending: List[Tuple[Any, Future]] = []
+        self._ready = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._worker, name="request-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any) -> Future:
+        future = Future()
+        with self._ready:
+            if self._closed:
+                raise RuntimeError("RequestBatcher is closed")
+            self._pending.append((item, future))
+            self._ready.notify()
+        return future
+
+    def _next_batch(self) -> List[Tuple[Any, Future]]:
+        with self._ready:
+            while not self._pending and not self._closed:
+                self._ready.wait()
+            deadline = time.perf_counter() + self.window_s
+            while len(self._pending) < self.max_batch and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._ready.wait(remaining)
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            return batch
+
+    def _worker(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            self.batches += 1
+            self.items += len(batch)
+            self.largest = max(self.largest, len(batch))
+            try:
+                results = self.evaluate([item for item, _ in batch])
+            except Exception as e:
+                results = [e] * len(batch)
+            for (_, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def stats(self) -> Dict[str, float]:
+        return {"batches": self.batches, "mean_batch": self.items / self.batches if self.batches else 0.0, "largest_batch": self.largest}
+
+    def close(self) -> None:
+        """Evaluates what is pending, then stops the worker."""
+        with self._ready:
+            self._closed = True
+            self._ready.notify()
+        self._thread.join()
+
+class ValuationService:
+    """
+    Warm valuation state for server mode: statements and historical metrics
+    are loaded once (as run_all's load/validate/metrics stages do), and requests - a scenario plus driver overrides - are coalesced by a
+    RequestBatcher into one vectorized project_arrays + calculate_dcf_arrays
+    pass. Identical requests are answered from a resident ResultCache.
+    """
+    def __init__(self, base_dir: Path, window_ms: Optional[float] = None, max_batch: Optional[int] = None, cache: Optional[ResultCache] = None):
+        self.data_dir = base_dir / "data"
+        self.data = load_data(self.data_dir, fmt="auto")
+        validate_data(self.data)
+        self.historical = calculate_historical_metrics(self.data)
+        self.last_revenue = float(self.historical.iloc[-1]["revenue"])
+        self.times = discount_times(SETTINGS.years_forecast, int(self.historical.iloc[-1]["year"]) + 1)
+        self.cache = cache if cache is not None else ResultCache()
+        self._history_key = frame_fingerprint(self.historical)
+
+        window_ms = SETTINGS.server.batch_window_ms if window_ms is None else window_ms
+        self.batcher = RequestBatcher(self._evaluate, window_ms / 1000, max_batch or SETTINGS.server.max_batch)
+        self.latency = LatencyStats()
+
+    def parse(self, payload: Dict[str, Any]) -> ValuationRequest:
+        """{"scenario": name, "overrides": {driver: value}, "net_debt": value} -> request."""
+        if not isinstance(payload, dict):
+            raise ValueError(f"A valuation request must be a JSON object, got {type(payload).__name__}")
+        scenario = payload.get("scenario", "base")
+        if scenario not in SETTINGS.scenarios:
+            raise ValueError(f"Unknown scenario: {scenario}. Expected one of {list(SETTINGS.scenarios)}")
+        overrides = payload.get("overrides")
+        if overrides is None:
+            overrides = {}
+        if not isinstance(overrides, dict):
+            raise ValueError(f"overrides must be an object of driver values, got {type(overrides).__name__}")
+        unknown = [name for name in overrides if name not in SCENARIO_DRIVERS]
+        if unknown:
+            raise ValueError(f"Unknown overrides: {unknown}. Expected any of {SCENARIO_DRIVERS}")
+        params = replace(SETTINGS.scenarios[scenario], **{name: _finite(name, value) for name, value in overrides.items()})
+        return ValuationRequest(scenario, params, _finite("net_debt", payload.get("net_debt", SETTINGS.net_debt)))
+
+    def _evaluate(self, requests: List[ValuationRequest]) -> List[Union[Dict[str, Any], Exception]]:
+        results: List[Union[Dict[str, Any], Exception]] = [None] * len(requests)
+        valid = []
+        for i, request in enumerate(requests):
+            if request.params.terminal_g >= request.params.wacc:
+                results[i] = ValueError(f"Terminal growth (g={request.params.terminal_g:.1%}) must be less than WACC (wacc={request.params.wacc:.1%}) for standard Gordon Growth Model to work.")
+            else:
+                valid.append(i)
+        if not valid:
+            return results
+
+        scenarios = {str(i): requests[i].params for i in valid}
+        params = stack_scenario_params(scenarios)
+        projections = project_arrays(
+            self.last_revenue,
+            params["revenue_growth"],
+            params["ebit_margin"],
+            params["capex_pct_rev"],
+            params["depreciation_pct_capex"],
+            params["nwc_pct_rev_change"],
+            schedules=stack_scenario_schedules(scenarios)
+        )
+        net_debt = np.array([requests[i].net_debt for i in valid])
+        dcf = calculate_dcf_arrays(projections.fcf, params["wacc"], params["terminal_g"], net_debt, self.times)
+
+        for k, i in enumerate(valid):
+            share = float(dcf["terminal_share_pct"][k])
+            results[i] = {
+                "scenario": requests[i].scenario,
+                "enterprise_value": float(dcf["enterprise_value"][k]),
+                "equity_value": float(dcf["equity_value"][k]),
+                "terminal_value": float(dcf["terminal_value"][k]),
+                "pv_explicit": float(dcf["pv_explicit"][k]),
+                "pv_terminal": float(dcf["pv_terminal"][k]),
+                "terminal_share_pct": share,
+                "terminal_share_warning": terminal_share_warning(share),
+                "wacc": float(params["wacc"][k]),
+                "terminal_g": float(params["terminal_g"][k]),
+                "batch_size": len(valid),
+            }
+        return results
+
+    def value(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Values one request (blocking); ValueError for bad input or g >= wacc."""
+        start = time.perf_counter()
+        ok = False
+        try:
+            request = self.parse(payload)
+            key = make_key("server", request.params, request.net_debt, self._history_key)
+            result = self.cache.get_or_compute(key, lambda: self.batcher.submit(request).result())
+            ok = True
+            return result
+        finally:
+            self.latency.record(time.perf_counter() - start, ok)
+
+    def value_many(self, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Values a list of requests, all joining the same batch; entries that fail
+        (e.g. g >= wacc) come back as {"error": message}. Bad input raises ValueError.
+        """
+        start = time.perf_counter()
+        requests = [self.parse(payload) for payload in payloads]
+        futures = [self.batcher.submit(request) for request in requests]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except ValueError as e:
+                results.append({"error": str(e)})
+        elapsed = time.perf_counter() - start
+        for result in results:
+            self.latency.record(elapsed, "error" not in result)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.latency.summary(), **self.batcher.stats(), "cache": self.cache.stats()}
+
+    def close(self) -> None:
+        self.batcher.close()
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so load tests reuse connections
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def _reply(self, status: int, body: Any) -> None:
+        data = json.dumps(body, allow_nan=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        service = self.server.service
+        if self.path == "/health":
+            self._reply(200, {"status": "ok", "company": SETTINGS.company_name})
+        elif self.path == "/stats":
+            self._reply(200, service.stats())
+        else:
+            self._reply(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/value":
+            self._reply(404, {"error": f"Unknown path: {self.path}"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except json.JSONDecodeError as e:
+            self._reply(400, {"error": f"Invalid JSON: {e}"})
+            return
+        try:
+            if isinstance(payload, list):
+                self._reply(200, self.server.service.value_many(payload))
+            else:
+                self._reply(200, self.server.service.value(payload))
+        except (TypeError, ValueError) as e:
+            self._reply(400, {"error": str(e)})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        log = self.server.log
+        if log is not None:
+            log.debug(format % args)
+
+def make_server(service: ValuationService, host: Optional[str] = None, port: Optional[int] = None, log: Optional[RunLogger] = None) -> ThreadingHTTPServer:
+    """
+    HTTP front end of a ValuationService (port 0 picks a free port):
+    POST /value (one request object or a list), GET /stats, GET /health.
+    """
+    server = ThreadingHTTPServer((host or SETTINGS.server.host, SETTINGS.server.port if port is None else port), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    server.log = log
+    return server
+
+def serve(base_dir: Path, host: Optional[str] = None, port: Optional[int] = None) -> None:
+    """
+    Runs the valuation server until interrupted, logging to outputs/server_log.txt;
+    latency and batching statistics are logged on shutdown.
+    """
+    output_dir = base_dir / "outputs"
+    output_dir.mkdir(exist_ok=True)
+    with RunLogger(output_dir / "server_log.txt", title="Server Log") as log:
+        log.info(f"Loading data from {base_dir / 'data'}...")
+        service = ValuationService(base_dir)
+        server = make_server(service, host, port, log)
+        bound_host, bound_port = server.server_address[:2]
+        log.info(f"Serving valuations on http://{bound_host}:{bound_port} (batch window {SETTINGS.server.batch_window_ms} ms)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            log.info("Shutting down...")
+        finally:
+            server.server_close()
+            service.close()
+            stats = service.stats()
+            if stats["requests"]:
+                log.info(f"Served {stats['requests']:,} requests: p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms, {stats['throughput_rps']:.0f} req/s, mean batch {stats['mean_batch']:.1f}", **{k: v for k, v in stats.items() if k != "cache"})
@@ -3,6 +3,7 @@ import pandas as pd
 from pathlib import Path
 from typing import Dict, Any, List
 from ..finance.dcf import ValuationResult
+from ..finance.projections import scenario_paths
 from config import SETTINGS
 
 def export_summary(results: Dict[str, ValuationResult], sensitivity_data: Dict[str, Any], warnings: List[str], chart_insights: Dict[str, str], output_dir: Path) -> None:
@@ -44,18 +45,26 @@ def export_summary(results: Dict[str, ValuationResult], sensitivity_data: Dict[s
                 }
             } if params else {}
         }
+        if params and params.schedules:
+            summary_data[scenario_name]["assumptions"]["schedules"] = {name: path.tolist() for name, path in scenario_paths(params).items()}
+        discounting = SETTINGS.discounting
+        if params and discounting.convention != "end":
+            summary_data[scenario_name]["assumptions"]["discounting"] = {
+                "convention": discounting.convention,
+                "valuation_date": discounting.valuation_date,
+            }
         
         # Projections
-        proj = res.projections.copy()
-        proj["scenario"] = scenario_name
-        projections_list.append(proj)
+        # assign() adds the column to a shallow copy; the concat below is the only data copy
+        projections_list.append(res.projections.assign(scenario=scenario_name))
 
     # Sensitivity Analysis Section
     summary_data["sensitivity_analysis"] = {
         "ev_base": sensitivity_data.get("ev_base"),
         "ev_min": sensitivity_data.get("ev_min"),
         "ev_max": sensitivity_data.get("ev_max"),
-        "driver_analysis": sensitivity_data.get("driver_analysis")
+        "driver_analysis": sensitivity_data.get("driver_analysis"),
+        "driver_ranking": dict(sensitivity_data.get("driver_ranking", []))
     }
 
     # Chart Insights
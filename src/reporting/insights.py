@@ -0,0 +1,58 @@
+"""
+Insight strings for the executive charts. Kept apart from plots.py so they can
+be computed (and logged/exported) without importing matplotlib.
+"""
+from typing import Any, Dict, List
+
+def ev_composition_insight(results: Dict[str, Any]) -> str:
+    base_share = results.get("base").terminal_share_pct
+    return f"Terminal Value represents {base_share:.1%} of Enterprise Value in the Base case."
+
+def fcf_projection_insight(results: Dict[str, Any]) -> str:
+    if not results:
+        return "No projection data available."
+    base_proj = results.get("base").projections
+    if len(base_proj) > 1:
+        start_fcf = base_proj.iloc[0]["fcf"]
+        end_fcf = base_proj.iloc[-1]["fcf"]
+        if start_fcf != 0:
+            cagr = (end_fcf / start_fcf) ** (1 / (len(base_proj) - 1)) - 1
+            direction = "grows" if cagr > 0 else "declines"
+            return f"FCF {direction} at a CAGR of {cagr:.1%} over the projection period (Base Case)."
+    return "FCF Projections available."
+
+def ebit_to_fcf_insight(base_res: Any) -> str:
+    if not base_res:
+        return ""
+    row = base_res.projections.iloc[0]
+    conversion = row["fcf"] / row["ebit"] if row["ebit"] != 0 else 0
+    return f"Cash conversion ratio (FCF/EBIT) is {conversion:.1%}."
+
+def sensitivity_1d_insights(sensitivity_data: Dict[str, Any]) -> List[str]:
+    matrix = sensitivity_data["matrix"]
+    # Cells with g >= wacc are NaN: compare the first and last valued cells of each slice
+    ev_wacc = matrix[matrix.columns[len(matrix.columns)//2]].dropna()
+    ev_g = matrix.loc[matrix.index[len(matrix.index)//2]].dropna()
+    if len(ev_wacc) < 2 or len(ev_g) < 2:
+        return ["Not enough valid sensitivity cells (g < WACC) to compare EV across WACC.",
+                "Not enough valid sensitivity cells (g < WACC) to compare EV across Growth."]
+    
+    # Insight WACC
+    drop_pct = (ev_wacc.iloc[-1] / ev_wacc.iloc[0]) - 1
+    # Insight g
+    growth_pct = (ev_g.iloc[-1] / ev_g.iloc[0]) - 1
+    return [
+        f"EV decreases by {abs(drop_pct):.1%} as WACC increases from {ev_wacc.index[0]:.1%} to {ev_wacc.index[-1]:.1%}.",
+        f"EV increases by {growth_pct:.1%} as Growth increases from {ev_g.index[0]:.1%} to {ev_g.index[-1]:.1%}."
+    ]
+
+def chart_insights(results: Dict[str, Any], sensitivity_data: Dict[str, Any]) -> Dict[str, str]:
+    """The insights plot_all returns, computed without rendering anything."""
+    sens_insights = sensitivity_1d_insights(sensitivity_data)
+    return {
+        "ev_composition": ev_composition_insight(results),
+        "fcf_projection": fcf_projection_insight(results),
+        "ebit_to_fcf_bridge": ebit_to_fcf_insight(results.get("base")),
+        "sensitivity_wacc": sens_insights[0],
+        "sensitivity_g": sens_insights[1]
+    }
@@ -1,12 +1,15 @@
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # headless: charts are only ever written to files
 import matplotlib.pyplot as plt
 from pathlib import Path
 from typing import Dict, Any, List
 from config import SETTINGS
+from .insights import ebit_to_fcf_insight, ev_composition_insight, fcf_projection_insight, sensitivity_1d_insights
 
 def setup_plot_style():
-    """Configures clean, professional plotting style."""
+    """Configures clean, professional plotting style (once per process, before rendering)."""
     plt.rcParams["figure.dpi"] = 100
     plt.rcParams["font.family"] = "sans-serif"
     plt.rcParams["font.size"] = 10
@@ -25,7 +28,9 @@ def save_plot_and_data(fig: plt.Figure, data: pd.DataFrame, name: str, output_di
 
 def plot_sensitivity_heatmap(sensitivity_data: Dict[str, Any], output_dir: Path) -> None:
     """
-    Generates a sensitivity heatmap from pre-calculated data.
+    Generates a sensitivity heatmap from pre-calculated data. Cells are
+    annotated up to SETTINGS.charts.annotate_max_cells; larger grids are read
+    from the colorbar.
     """
     ev_df = sensitivity_data["matrix"]
     ev_matrix = ev_df.values
@@ -35,7 +40,6 @@ def plot_sensitivity_heatmap(sensitivity_data: Dict[str, Any], output_dir: Path)
     # Export CSV
     ev_df.to_csv(output_dir / "sensitivity_ev.csv")
     
-    setup_plot_style()
     # Plotting
     try:
         fig, ax = plt.subplots(figsize=(10, 8))
@@ -43,14 +47,15 @@ def plot_sensitivity_heatmap(sensitivity_data: Dict[str, Any], output_dir: Path)
         # Create heatmap using imshow
         im = ax.imshow(ev_matrix, cmap="RdYlGn", aspect='auto')
         
-        # Add text annotations
-        for i in range(len(wacc_values)):
-            for j in range(len(g_values)):
-                val = ev_matrix[i, j]
-                text_color = "black" if val > np.median(ev_matrix) else "white" 
-                val_str = f"{val:,.0f}" if val > 0 else "N/A"
-                text = ax.text(j, i, val_str,
-                            ha="center", va="center", color=text_color, fontsize=8)
+        # Annotate cells only while they stay legible (and cheap: one text artist each)
+        if ev_matrix.size <= SETTINGS.charts.annotate_max_cells:
+            median_ev = np.nanmedian(ev_matrix)
+            for i in range(len(wacc_values)):
+                for j in range(len(g_values)):
+                    val = ev_matrix[i, j]
+                    text_color = "black" if val > median_ev else "white" 
+                    val_str = f"{val:,.0f}" if val > 0 else "N/A"
+                    ax.text(j, i, val_str, ha="center", va="center", color=text_color, fontsize=8)
 
         # Set ticks and labels
         ax.set_xticks(np.arange(len(g_values)))
@@ -90,7 +95,6 @@ def plot_ev_composition(results: Dict[str, Any], output_dir: Path) -> str:
         "pv_terminal": pv_terminal
     })
     
-    setup_plot_style()
     fig, ax = plt.subplots(figsize=(8, 6))
     
     # Calculate positions
@@ -115,17 +119,13 @@ def plot_ev_composition(results: Dict[str, Any], output_dir: Path) -> str:
             ax.text(i, exp + term/2, f"{term/total:.0%}", ha='center', va='center', color='white', fontsize=9)
         
     save_plot_and_data(fig, data, "ev_composition", output_dir)
-    
-    # Insight
-    base_share = results.get("base").terminal_share_pct
-    return f"Terminal Value represents {base_share:.1%} of Enterprise Value in the Base case."
+    return ev_composition_insight(results)
 
 def plot_fcf_projection(results: Dict[str, Any], output_dir: Path) -> str:
     """
     Plots the projected Free Cash Flow for Base, Downside, and Upside scenarios.
     Returns an insight string.
     """
-    setup_plot_style()
     fig, ax = plt.subplots(figsize=(10, 6))
     
     colors = {"base": "#4e79a7", "upside": "#59a14f", "downside": "#e15759"}
@@ -157,18 +157,7 @@ def plot_fcf_projection(results: Dict[str, Any], output_dir: Path) -> str:
         save_plot_and_data(fig, pd.concat(all_data), "fcf_projection", output_dir)
     else:
         plt.close(fig)
-        return "No projection data available."
-    
-    # Insight
-    base_proj = results.get("base").projections
-    if len(base_proj) > 1:
-        start_fcf = base_proj.iloc[0]["fcf"]
-        end_fcf = base_proj.iloc[-1]["fcf"]
-        if start_fcf != 0:
-            cagr = (end_fcf / start_fcf) ** (1 / (len(base_proj) - 1)) - 1
-            direction = "grows" if cagr > 0 else "declines"
-            return f"FCF {direction} at a CAGR of {cagr:.1%} over the projection period (Base Case)."
-    return "FCF Projections available."
+    return fcf_projection_insight(results)
 
 def plot_ebit_to_fcf_bridge(base_res: Any, output_dir: Path) -> str:
     """
@@ -208,7 +197,6 @@ def plot_ebit_to_fcf_bridge(base_res: Any, output_dir: Path) -> str:
     
     data = pd.DataFrame({"component": categories, "value": changes, "year": int(row["year"])})
     
-    setup_plot_style()
     fig, ax = plt.subplots(figsize=(10, 6))
     
     # Plot bars
@@ -239,22 +227,18 @@ def plot_ebit_to_fcf_bridge(base_res: Any, output_dir: Path) -> str:
     ax.set_ylabel(f"Value ({SETTINGS.currency_unit})")
     
     save_plot_and_data(fig, data, "ebit_to_fcf_bridge", output_dir)
-    
-    conversion = fcf / ebit if ebit != 0 else 0
-    return f"Cash conversion ratio (FCF/EBIT) is {conversion:.1%}."
+    return ebit_to_fcf_insight(base_res)
 
 def plot_sensitivity_1d(sensitivity_data: Dict[str, Any], output_dir: Path) -> List[str]:
     """
     Generates 1D sensitivity plots: EV vs WACC and EV vs g.
     """
-    insights = []
     matrix = sensitivity_data["matrix"] # DataFrame index=WACC, cols=g
     
     # 1. EV vs WACC (at median g)
     mid_g = matrix.columns[len(matrix.columns)//2]
     ev_wacc = matrix[mid_g] # Series: Index WACC, Values EV
     
-    setup_plot_style()
     fig1, ax1 = plt.subplots(figsize=(8, 5))
     ax1.plot(ev_wacc.index, ev_wacc.values, marker='o', color="#e15759", linewidth=2)
     ax1.set_xlabel("WACC")
@@ -264,10 +248,6 @@ def plot_sensitivity_1d(sensitivity_data: Dict[str, Any], output_dir: Path) -> L
     ax1.grid(True, which='both', linestyle='--')
     
     save_plot_and_data(fig1, ev_wacc.reset_index(name="ev"), "ev_vs_wacc", output_dir)
-    
-    # Insight WACC
-    drop_pct = (ev_wacc.iloc[-1] / ev_wacc.iloc[0]) - 1
-    insights.append(f"EV decreases by {abs(drop_pct):.1%} as WACC increases from {ev_wacc.index[0]:.1%} to {ev_wacc.index[-1]:.1%}.")
 
     # 2. EV vs g (at median WACC)
     mid_wacc = matrix.index[len(matrix.index)//2]
@@ -282,15 +262,11 @@ def plot_sensitivity_1d(sensitivity_data: Dict[str, Any], output_dir: Path) -> L
     ax2.grid(True, which='both', linestyle='--')
     
     save_plot_and_data(fig2, ev_g.reset_index(name="ev"), "ev_vs_terminal_g", output_dir)
-    
-    # Insight g
-    growth_pct = (ev_g.iloc[-1] / ev_g.iloc[0]) - 1
-    insights.append(f"EV increases by {growth_pct:.1%} as Growth increases from {ev_g.index[0]:.1%} to {ev_g.index[-1]:.1%}.")
-    
-    return insights
+    return sensitivity_1d_insights(sensitivity_data)
 
 def plot_all(results: Dict[str, Any], sensitivity_data: Dict[str, Any], output_dir: Path) -> Dict[str, str]:
-    """Orchestrates all plotting functions and returns a dict of insights."""
+    """Orchestrates all plotting functions (serially) and returns a dict of insights."""
+    setup_plot_style()
     insights = {}
     
     # 1. Sensitivity Heatmap
@@ -0,0 +1,193 @@
+import json
+import pickle
+import time
+import pandas as pd
+from dataclasses import dataclass, field, fields, is_dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from config import CHART_BACKENDS, CHART_MODES, SETTINGS
+from ..finance.cache import frame_fingerprint, make_key
+from ..runtime.executor import Executor
+from ..runtime.instrumentation import count
+from .insights import chart_insights
+
+MANIFEST = "render_manifest.json"
+PENDING = "pending_charts.pkl"
+# Bump when chart drawing code changes so unchanged inputs are re-rendered once
+RENDER_VERSION = 2
+
+# Chart -> (plots.py function, files it writes relative to output_dir). Names, not
+# functions, so matplotlib is only imported by the process that draws
+CHARTS = {
+    "sensitivity_heatmap": ("plot_sensitivity_heatmap", ["plots/sensitivity.png", "sensitivity_ev.csv"]),
+    "ev_composition": ("plot_ev_composition", ["plots/ev_composition.png", "ev_composition.csv"]),
+    "fcf_projection": ("plot_fcf_projection", ["plots/fcf_projection.png", "fcf_projection.csv"]),
+    "ebit_to_fcf_bridge": ("plot_ebit_to_fcf_bridge", ["plots/ebit_to_fcf_bridge.png", "ebit_to_fcf_bridge.csv"]),
+    "sensitivity_1d": ("plot_sensitivity_1d", ["plots/ev_vs_wacc.png", "ev_vs_wacc.csv", "plots/ev_vs_terminal_g.png", "ev_vs_terminal_g.csv"]),
+}
+
+@dataclass
+class ChartTask:
+    name: str
+    args: Tuple[Any, ...]  # plot function arguments before output_dir
+    key: str  # hash of the inputs the chart is drawn from
+
+@dataclass
+class RenderReport:
+    status: Dict[str, str] = field(default_factory=dict)  # rendered, skipped, deferred, disabled or failed
+    seconds: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    total_seconds: float = 0.0
+
+    def lines(self) -> List[str]:
+        lines = []
+        for name, status in self.status.items():
+            detail = f" in {self.seconds[name]:.3f} s" if name in self.seconds else ""
+            error = f": {self.errors[name]}" if name in self.errors else ""
+            lines.append(f"{name}: {status}{detail}{error}")
+        lines.append(f"charts total: {self.total_seconds:.3f} s")
+        return lines
+
+def _fingerprint(value: Any) -> Any:
+    """Hashable, content-based stand-in for chart inputs (frames by content)."""
+    if isinstance(value, pd.DataFrame):
+        return frame_fingerprint(value)
+    if is_dataclass(value):
+        return (type(value).__name__, tuple((f.name, _fingerprint(getattr(value, f.name))) for f in fields(value)))
+    if isinstance(value, dict):
+        return tuple((key, _fingerprint(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_fingerprint(item) for item in value)
+    return value
+
+def chart_tasks(results: Dict[str, Any], sensitivity_data: Dict[str, Any]) -> List[ChartTask]:
+    """
+    One task per chart with only the data it draws. Sensitivity charts need
+    sensitivity_data["matrix"] and are left out without it.
+    """
+    inputs = {
+        "ev_composition": (results,),
+        "fcf_projection": (results,),
+        "ebit_to_fcf_bridge": (results.get("base"),),
+    }
+    if "matrix" in sensitivity_data:
+        matrix_only = {"matrix": sensitivity_data["matrix"]}
+        inputs = {"sensitivity_heatmap": (matrix_only,), **inputs, "sensitivity_1d": (matrix_only,)}
+
+    # Settings that change how a chart is drawn are part of its key
+    options = {"sensitivity_heatmap": (SETTINGS.charts.annotate_max_cells,)}
+    return [
+        ChartTask(name, args, make_key(name, RENDER_VERSION, SETTINGS.currency_unit, _fingerprint(args), options.get(name, ())))
+        for name, args in inputs.items()
+    ]
+
+_STYLE_READY = False
+
+def _render_task(output_dir: Path, task: ChartTask) -> Tuple[float, Optional[str]]:
+    """Worker: draws one chart, returning (seconds, error)."""
+    global _STYLE_READY
+    from . import plots
+    if not _STYLE_READY:
+        plots.setup_plot_style()
+        _STYLE_READY = True
+
+    start = time.perf_counter()
+    try:
+        getattr(plots, CHARTS[task.name][0])(*task.args, output_dir)
+        error = None
+    except Exception as e:
+        error = str(e)
+    return time.perf_counter() - start, error
+
+def _is_current(task: ChartTask, manifest: Dict[str, str], output_dir: Path) -> bool:
+    return manifest.get(task.name) == task.key and all((output_dir / path).exists() for path in CHARTS[task.name][1])
+
+def _render(tasks: List[ChartTask], output_dir: Path, executor: Optional[Executor], report: RenderReport) -> None:
+    backend = executor.backend if executor is not None else SETTINGS.charts.backend
+    if backend not in CHART_BACKENDS:
+        raise ValueError(f"Charts cannot be rendered on the {backend!r} backend (pyplot is not thread-safe). Expected one of {CHART_BACKENDS}")
+    (output_dir / "plots").mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / "plots" / MANIFEST
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+
+    todo = []
+    for task in tasks:
+        if SETTINGS.charts.skip_unchanged and _is_current(task, manifest, output_dir):
+            report.status[task.name] = "skipped"
+        else:
+            todo.append(task)
+
+    if todo:
+        if executor is None:
+            with Executor(SETTINGS.charts.backend, SETTINGS.charts.max_workers) as pool:
+                timings = pool.map(partial(_render_task, output_dir), todo, chunk_size=1)
+        else:
+            timings = executor.map(partial(_render_task, output_dir), todo, chunk_size=1)
+
+        for task, (seconds, error) in zip(todo, timings):
+            report.seconds[task.name] = seconds
+            if error is None:
+                report.status[task.name] = "rendered"
+                manifest[task.name] = task.key
+            else:
+                report.status[task.name] = "failed"
+                report.errors[task.name] = error
+                manifest.pop(task.name, None)
+        manifest_path.write_text(json.dumps(manifest, indent=4))
+
+def render_charts(results: Dict[str, Any], sensitivity_data: Dict[str, Any], output_dir: Path, mode: Optional[str] = None, executor: Optional[Executor] = None) -> Tuple[Dict[str, str], RenderReport]:
+    """
+    Renders the plot_all charts and returns (insights, report). Insights are
+    always computed in-process; drawing depends on mode (default
+    SETTINGS.charts.mode): "on" renders charts whose input hash changed since the
+    last render, in parallel on SETTINGS.charts.backend (or the given executor;
+    "serial" or "process" only);
+    "defer" queues them for render_pending(); "off" draws nothing.
+    """
+    mode = mode or SETTINGS.charts.mode
+    if mode not in CHART_MODES:
+        raise ValueError(f"Unknown chart mode: {mode}. Expected one of {CHART_MODES}")
+
+    start = time.perf_counter()
+    insights = chart_insights(results, sensitivity_data)
+    tasks = chart_tasks(results, sensitivity_data)
+    report = RenderReport()
+    pending_path = output_dir / "plots" / PENDING
+
+    if mode == "off":
+        report.status = {task.name: "disabled" for task in tasks}
+    elif mode == "defer":
+        pending_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(pending_path, "wb") as f:
+            pickle.dump(tasks, f, protocol=pickle.HIGHEST_PROTOCOL)
+        report.status = {task.name: "deferred" for task in tasks}
+    else:
+        _render(tasks, output_dir, executor, report)
+        pending_path.unlink(missing_ok=True)
+
+    for status in report.status.values():
+        count(f"charts_{status}")
+    report.total_seconds = time.perf_counter() - start
+    return insights, report
+
+def render_pending(output_dir: Path, executor: Optional[Executor] = None) -> RenderReport:
+    """Renders the charts a deferred run queued in output_dir (no-op if none)."""
+    start = time.perf_counter()
+    report = RenderReport()
+    pending_path = output_dir / "plots" / PENDING
+    if pending_path.exists():
+        with open(pending_path, "rb") as f:
+            tasks = pickle.load(f)
+        _render(tasks, output_dir, executor, report)
+        pending_path.unlink()
+    report.total_seconds = time.perf_counter() - start
+    return report
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Render charts deferred by a previous run (--charts defer).")
+    parser.add_argument("output_dir", type=Path)
+    args = parser.parse_args()
+    for line in render_pending(args.output_dir).lines():
+        print(line)
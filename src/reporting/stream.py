@@ -0,0 +1,185 @@
+import json
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from config import SETTINGS
+from ..finance.batch import BatchValuation, COMPANY_COL
+from ..finance.dcf import ValuationResult
+from ..finance.projections import PROJECTION_COLUMNS
+from ..io.columnar import _require_pyarrow
+
+PROJECTION_FORMATS = ("csv", "bin", "arrow", "parquet")
+SUMMARY_FILE = "batch_summary.ndjson"
+PROJECTIONS_STEM = "batch_projections"
+
+# Compact binary layout: one packed 64-byte record per company/scenario/year.
+# Company and scenario are codes into the .companies (one name per line) and
+# .schema.json sidecars.
+BIN_DTYPE = np.dtype([(COMPANY_COL, "<u4"), ("scenario", "<u2"), ("year", "<i2")] + [(col, "<f8") for col in PROJECTION_COLUMNS])
+
+SUMMARY_FIELDS = ["enterprise_value", "equity_value", "terminal_value", "pv_explicit", "pv_terminal", "wacc", "terminal_g", "terminal_share_pct", "terminal_share_warning"]
+
+@dataclass
+class StreamedExport:
+    companies: int = 0
+    summary_rows: int = 0
+    projection_rows: int = 0
+    chunks: int = 0
+    files: List[Path] = field(default_factory=list)
+
+def batch_projection_frame(batch: BatchValuation) -> pd.DataFrame:
+    """Long-format projections of a batch: one row per company/scenario/year."""
+    n_companies, n_scenarios, n_years = batch.projections["fcf"].shape
+    years = batch.last_years[:, None, None] + np.arange(1, n_years + 1)
+    frame = pd.DataFrame({
+        COMPANY_COL: np.repeat(batch.companies, n_scenarios * n_years),
+        "scenario": np.tile(np.repeat(batch.scenarios, n_years), n_companies),
+        "year": np.broadcast_to(years, (n_companies, n_scenarios, n_years)).ravel().astype(np.int64),
+    })
+    for col in PROJECTION_COLUMNS:
+        frame[col] = batch.projections[col].ravel()
+    return frame
+
+def results_frames(company: str, results: Dict[str, ValuationResult]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """(summary, projections) frames for one company's run_scenarios output."""
+    summary = pd.DataFrame([
+        {COMPANY_COL: company, "scenario": name, **{f: getattr(res, f) for f in SUMMARY_FIELDS}}
+        for name, res in results.items()
+    ])
+    projections = pd.concat([
+        res.projections[["year"] + PROJECTION_COLUMNS].assign(**{COMPANY_COL: company, "scenario": name})
+        for name, res in results.items()
+    ], ignore_index=True)
+    projections["year"] = projections["year"].astype(np.int64)
+    return summary, projections[[COMPANY_COL, "scenario", "year"] + PROJECTION_COLUMNS]
+
+class StreamWriter:
+    """
+    Writes valuation results as they are produced: the summary as
+    newline-delimited JSON (one object per company/scenario) and projections
+    appended chunk by chunk as CSV, compact binary records ("bin"), an Arrow IPC
+    file or Parquet row groups (pyarrow). Only the current chunk is held in
+    memory. Each company must arrive in a single chunk.
+    """
+    def __init__(self, output_dir: Path, fmt: Optional[str] = None):
+        fmt = fmt or SETTINGS.export.projections_format
+        if fmt not in PROJECTION_FORMATS:
+            raise ValueError(f"Unknown projections format: {fmt}. Expected one of {PROJECTION_FORMATS}")
+        if fmt in ("arrow", "parquet"):
+            _require_pyarrow()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.fmt = fmt
+        self.summary_path = output_dir / SUMMARY_FILE
+        self.projections_path = output_dir / f"{PROJECTIONS_STEM}.{fmt}"
+        self.stats = StreamedExport(files=[self.summary_path, self.projections_path])
+
+        self._summary = open(self.summary_path, "w")
+        self._writer: Any = None  # pyarrow writer, created from the first chunk's schema
+        self._scenarios: Dict[str, int] = {}
+        self._closed = False
+        if fmt == "csv":
+            self._projections = open(self.projections_path, "w", newline="")
+        elif fmt == "bin":
+            self._projections = open(self.projections_path, "wb")
+            self._companies = open(self.projections_path.with_suffix(".companies"), "w")
+            self.stats.files += [self.projections_path.with_suffix(".companies"), self.projections_path.with_suffix(".schema.json")]
+
+    def write_batch(self, batch: BatchValuation) -> None:
+        """Appends one BatchValuation (e.g. an iter_batch chunk)."""
+        self.write(batch.to_frame()[[COMPANY_COL, "scenario"] + SUMMARY_FIELDS], batch_projection_frame(batch))
+
+    def write_results(self, company: str, results: Dict[str, ValuationResult]) -> None:
+        """Appends one company's run_scenarios output."""
+        self.write(*results_frames(company, results))
+
+    def write(self, summary: pd.DataFrame, projections: pd.DataFrame) -> None:
+        """Appends a chunk: summary rows and long-format (company, scenario, year, ...) projections."""
+        if self._closed:
+            raise ValueError("StreamWriter is closed")
+        text = summary.to_json(orient="records", lines=True)
+        self._summary.write(text if text.endswith("\n") else text + "\n")
+
+        if self.fmt == "csv":
+            projections.to_csv(self._projections, header=self.stats.chunks == 0, index=False)
+        elif self.fmt == "bin":
+            self._write_bin(projections)
+        else:
+            self._write_arrow(projections)
+
+        self.stats.companies += summary[COMPANY_COL].nunique()
+        self.stats.summary_rows += len(summary)
+        self.stats.projection_rows += len(projections)
+        self.stats.chunks += 1
+
+    def _write_bin(self, projections: pd.DataFrame) -> None:
+        codes, names = pd.factorize(projections[COMPANY_COL], sort=False)
+        records = np.empty(len(projections), dtype=BIN_DTYPE)
+        records[COMPANY_COL] = codes + self.stats.companies
+        for name in projections["scenario"].unique():
+            self._scenarios.setdefault(name, len(self._scenarios))
+        records["scenario"] = projections["scenario"].map(self._scenarios).to_numpy()
+        records["year"] = projections["year"].to_numpy()
+        for col in PROJECTION_COLUMNS:
+            records[col] = projections[col].to_numpy()
+        records.tofile(self._projections)
+        self._companies.write("".join(f"{name}\n" for name in names))
+
+    def _write_arrow(self, projections: pd.DataFrame) -> None:
+        pa = _require_pyarrow()
+        table = pa.Table.from_pandas(projections, preserve_index=False)
+        if self._writer is None:
+            if self.fmt == "arrow":
+                self._writer = pa.ipc.new_file(str(self.projections_path), table.schema)
+            else:
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(str(self.projections_path), table.schema)
+        self._writer.write_table(table)
+
+    def close(self) -> StreamedExport:
+        if self._closed:
+            return self.stats
+        self._closed = True
+        self._summary.close()
+        if self.fmt in ("csv", "bin"):
+            self._projections.close()
+        if self.fmt == "bin":
+            self._companies.close()
+            schema = {"dtype": [list(item) for item in BIN_DTYPE.descr], "scenarios": list(self._scenarios), "rows": self.stats.projection_rows}
+            with open(self.projections_path.with_suffix(".schema.json"), "w") as f:
+                json.dump(schema, f, indent=4)
+        elif self._writer is not None:
+            self._writer.close()
+        return self.stats
+
+    def __enter__(self) -> "StreamWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def read_summary(path: Path) -> pd.DataFrame:
+    return pd.read_json(path, orient="records", lines=True)
+
+def read_projections(path: Path) -> pd.DataFrame:
+    """Reads a streamed projections file back into a long-format frame."""
+    fmt = path.suffix.lstrip(".")
+    if fmt == "csv":
+        return pd.read_csv(path)
+    if fmt == "bin":
+        records = np.fromfile(path, dtype=BIN_DTYPE)
+        companies = np.array(path.with_suffix(".companies").read_text().splitlines())
+        schema = json.loads(path.with_suffix(".schema.json").read_text())
+        frame = pd.DataFrame({
+            COMPANY_COL: companies[records[COMPANY_COL]] if len(records) else np.array([], dtype=str),
+            "scenario": np.array(schema["scenarios"])[records["scenario"]] if len(records) else np.array([], dtype=str),
+            "year": records["year"].astype(np.int64),
+        })
+        for col in PROJECTION_COLUMNS:
+            frame[col] = records[col]
+        return frame
+    if fmt in ("arrow", "parquet"):
+        _require_pyarrow()
+        return pd.read_feather(path) if fmt == "arrow" else pd.read_parquet(path)
+    raise ValueError(f"Unknown projections format: {fmt}. Expected one of {PROJECTION_FORMATS}")
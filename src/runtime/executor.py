@@ -0,0 +1,149 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import config
+from config import BACKENDS, SETTINGS
+
+def _init_worker(settings: config.Config) -> None:
+    """
+    Process initializer: mirrors the parent's SETTINGS so workers started with
+    spawn/forkserver see the same (possibly overridden) configuration.
+    """
+    config.SETTINGS.__dict__.update(settings.__dict__)
+
+def _run_chunk(func: Callable, chunk: Sequence) -> List:
+    return [func(item) for item in chunk]
+
+def split_chunks(items: Sequence, n_chunks: int) -> List[Sequence]:
+    """
+    Splits items into at most n_chunks contiguous, near-equal chunks (order preserved).
+    """
+    n_chunks = max(1, min(n_chunks, len(items)))
+    bounds = np.linspace(0, len(items), n_chunks + 1).astype(int)
+    return [items[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+class Executor:
+    """
+    Fans work items out over a serial loop, a thread pool or a process pool.
+    map() always returns results in input order, so every backend produces the
+    same output as the serial path.
+    """
+    def __init__(self, backend: Optional[str] = None, max_workers: Optional[int] = None, chunk_size: Optional[int] = None):
+        execution = SETTINGS.execution
+        self.backend = backend or execution.backend
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown executor backend: {self.backend}. Expected one of {BACKENDS}")
+        self.max_workers = max_workers or execution.max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size or execution.chunk_size
+        self._pool = None
+
+    @property
+    def uses_processes(self) -> bool:
+        return self.backend == "process"
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.backend == "thread":
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+            elif self.backend == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker, initargs=(SETTINGS,))
+        return self._pool
+
+    def map(self, func: Callable, items: Sequence, chunk_size: Optional[int] = None) -> List:
+        """
+        Applies func to every item. Items are grouped into chunked work units
+        (chunk_size items each, default: spread evenly over the workers).
+        func must be picklable (module-level, or a functools.partial of one) for
+        the process backend.
+        """
+        items = list(items)
+        if self.backend == "serial" or self.max_workers == 1 or len(items) <= 1:
+            return [func(item) for item in items]
+
+        chunk_size = chunk_size or self.chunk_size
+        if chunk_size:
+            chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        else:
+            chunks = split_chunks(items, self.max_workers)
+
+        pool = self._get_pool()
+        futures = [pool.submit(_run_chunk, func, chunk) for chunk in chunks]
+        return [result for future in futures for result in future.result()]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> "Executor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+@dataclass(frozen=True)
+class SharedArrays:
+    """
+    Picklable handle to a dict of arrays. For the process backend the arrays live
+    in shared memory blocks and only (name, shape, dtype) is pickled; otherwise the
+    arrays are carried directly. Use open() in the worker to get ndarray views.
+    """
+    refs: Tuple[Tuple[str, str, Tuple[int, ...], str], ...] = ()
+    local: Optional[Dict[str, np.ndarray]] = None
+
+    @contextmanager
+    def open(self) -> Iterator[Dict[str, np.ndarray]]:
+        if self.local is not None:
+            yield self.local
+            return
+        blocks = []
+        arrays = {}
+        try:
+            for key, shm_name, shape, dtype in self.refs:
+                block = _attach(shm_name)
+                blocks.append(block)
+                arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            yield arrays
+        finally:
+            arrays.clear()
+            for block in blocks:
+                try:
+                    block.close()
+                except BufferError:
+                    pass  # caller still holds a view; the mapping is released with it
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attaches to an existing block without registering it for cleanup (parent owns it)."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+@contextmanager
+def share_arrays(arrays: Dict[str, np.ndarray], executor: Executor) -> Iterator[SharedArrays]:
+    """
+    Publishes arrays to the executor's workers. Shared memory blocks are created
+    only for the process backend and are unlinked when the context exits.
+    """
+    if not executor.uses_processes:
+        yield SharedArrays(local={key: np.asarray(arr) for key, arr in arrays.items()})
+        return
+
+    blocks = []
+    try:
+        refs = []
+        for key, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            block = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=block.buf)[...] = arr
+            refs.append((key, block.name, arr.shape, arr.dtype.str))
+        yield SharedArrays(refs=tuple(refs))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
@@ -0,0 +1,222 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from config import SETTINGS
+
+try:
+    import resource
+except ImportError:  # not available on Windows; peak RSS is then omitted
+    resource = None
+
+JSONL_FILE = "instrumentation.jsonl"
+CHROME_TRACE_FILE = "trace.json"
+
+def _peak_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # bytes on macOS, KiB elsewhere
+
+@dataclass
+class SpanRecord:
+    name: str
+    path: str  # parent/child names from the outermost span
+    depth: int
+    thread: int
+    start_us: float  # since the instrumentation started
+    wall_s: float
+    cpu_s: float  # thread CPU time spent inside the span
+    attrs: Dict[str, Any] = field(default_factory=dict)
+    counters: Dict[str, float] = field(default_factory=dict)
+    peak_rss_kb: Optional[int] = None
+    rss_growth_kb: Optional[int] = None  # growth of the process peak RSS during the span
+    alloc_delta_kb: Optional[float] = None  # traced allocations still live at exit (tracemalloc)
+    alloc_peak_kb: Optional[float] = None  # traced peak during the span, relative to its start
+
+class _Span:
+    """An open span; records itself on exit."""
+    __slots__ = ("owner", "name", "attrs", "counters", "path", "depth", "start", "cpu_start", "rss_start", "alloc_start", "alloc_peak")
+
+    def __init__(self, owner: "Instrumentation", name: str, attrs: Dict[str, Any]):
+        self.owner = owner
+        self.name = name
+        self.attrs = attrs
+        self.counters: Dict[str, float] = {}
+
+    def __enter__(self) -> "_Span":
+        stack = self.owner._stack()
+        parent = stack[-1] if stack else None
+        self.path = f"{parent.path}/{self.name}" if parent else self.name
+        self.depth = len(stack)
+        if self.owner.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                parent.alloc_peak = max(parent.alloc_peak, peak)
+            tracemalloc.reset_peak()
+            self.alloc_start = self.alloc_peak = current
+        self.rss_start = _peak_rss_kb()
+        stack.append(self)
+        self.cpu_start = time.thread_time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        wall = time.perf_counter() - self.start
+        cpu = time.thread_time() - self.cpu_start
+        stack = self.owner._stack()
+        stack.pop()
+
+        record = SpanRecord(
+            name=self.name,
+            path=self.path,
+            depth=self.depth,
+            thread=threading.get_ident(),
+            start_us=(self.start - self.owner.origin) * 1e6,
+            wall_s=wall,
+            cpu_s=cpu,
+            attrs=self.attrs,
+            counters=self.counters,
+        )
+        rss = _peak_rss_kb()
+        if rss is not None:
+            record.peak_rss_kb = rss
+            record.rss_growth_kb = rss - self.rss_start
+        if self.owner.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            self.alloc_peak = max(self.alloc_peak, peak)
+            record.alloc_delta_kb = (current - self.alloc_start) / 1024
+            record.alloc_peak_kb = (self.alloc_peak - self.alloc_start) / 1024
+            if stack:
+                stack[-1].alloc_peak = max(stack[-1].alloc_peak, self.alloc_peak)
+        self.owner._add(record)
+
+class Instrumentation:
+    """
+    Collects nested spans (wall and CPU time, peak RSS, optional tracemalloc
+    allocation deltas) and named counters, and exports them as JSON lines and a
+    Chrome trace (chrome://tracing or Perfetto). Spans nest per thread.
+    """
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.records: List[SpanRecord] = []
+        self.counters: Dict[str, float] = {}
+        self.origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+
+    def _stack(self) -> List[_Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _add(self, record: SpanRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def start(self) -> None:
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def stop(self) -> None:
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def span(self, name: str, **attrs: Any) -> _Span:
+        return _Span(self, name, attrs)
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Adds to a run-wide counter and to the innermost open span's counters."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+        stack = self._stack()
+        if stack:
+            stack[-1].counters[name] = stack[-1].counters.get(name, 0) + value
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Calls, wall and CPU seconds per span path."""
+        totals: Dict[str, Dict[str, float]] = {}
+        for record in self.records:
+            entry = totals.setdefault(record.path, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0})
+            entry["calls"] += 1
+            entry["wall_s"] += record.wall_s
+            entry["cpu_s"] += record.cpu_s
+        return totals
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        pid = os.getpid()
+        events = []
+        for record in sorted(self.records, key=lambda r: r.start_us):
+            args = dict(record.attrs, cpu_s=record.cpu_s, **record.counters)
+            for key in ("peak_rss_kb", "alloc_delta_kb", "alloc_peak_kb"):
+                if getattr(record, key) is not None:
+                    args[key] = getattr(record, key)
+            events.append({"name": record.name, "cat": record.path.split("/")[0], "ph": "X", "ts": record.start_us, "dur": record.wall_s * 1e6, "pid": pid, "tid": record.thread, "args": args})
+        end_us = max((r.start_us + r.wall_s * 1e6 for r in self.records), default=0.0)
+        for name, value in self.counters.items():
+            events.append({"name": name, "ph": "C", "ts": end_us, "pid": pid, "args": {name: value}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, output_dir: Path) -> Tuple[Path, Path]:
+        """Writes instrumentation.jsonl (one span per line, then the counters) and trace.json."""
+        output_dir.mkdir(parents=True, exist_ok=True)
+        jsonl_path = output_dir / JSONL_FILE
+        with open(jsonl_path, "w") as f:
+            for record in self.records:
+                f.write(json.dumps(dict(type="span", **asdict(record)), default=str) + "\n")
+            f.write(json.dumps({"type": "counters", "counters": self.counters}) + "\n")
+
+        trace_path = output_dir / CHROME_TRACE_FILE
+        with open(trace_path, "w") as f:
+            json.dump(self.chrome_trace(), f, default=str)
+        return jsonl_path, trace_path
+
+# The active instrumentation; None (the default) turns span()/count() into no-ops
+ACTIVE: Optional[Instrumentation] = None
+_NULL_SPAN = nullcontext()
+
+def span(name: str, **attrs: Any):
+    """Context manager timing a (nested) span; a shared no-op when disabled."""
+    instrumentation = ACTIVE
+    if instrumentation is None:
+        return _NULL_SPAN
+    return instrumentation.span(name, **attrs)
+
+def count(name: str, value: float = 1) -> None:
+    """Increments a counter when instrumentation is enabled."""
+    instrumentation = ACTIVE
+    if instrumentation is not None:
+        instrumentation.count(name, value)
+
+@contextmanager
+def instrumented(enabled: Optional[bool] = None, trace_memory: Optional[bool] = None) -> Iterator[Optional[Instrumentation]]:
+    """
+    Activates instrumentation for the block (defaults from SETTINGS.instrumentation).
+    Yields the new Instrumentation, or None when disabled or when an outer block
+    is already active (its owner exports).
+    """
+    global ACTIVE
+    settings = SETTINGS.instrumentation
+    enabled = settings.enabled if enabled is None else enabled
+    if not enabled or ACTIVE is not None:
+        yield None
+        return
+
+    instrumentation = Instrumentation(settings.trace_memory if trace_memory is None else trace_memory)
+    instrumentation.start()
+    ACTIVE = instrumentation
+    try:
+        yield instrumentation
+    finally:
+        ACTIVE = None
+        instrumentation.stop()
@@ -0,0 +1,13 @@
+import pytest
+from pathlib import Path
+from src.io.loaders import load_data
+from src.finance.metrics import calculate_historical_metrics
+
+@pytest.fixture(scope="session")
+def data_dir():
+    """The repository's sample statements (data/)."""
+    return Path(__file__).resolve().parents[1] / "data"
+
+@pytest.fixture(scope="module")
+def historical(data_dir):
+    return calculate_historical_metrics(load_data(data_dir))
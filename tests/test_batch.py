@@ -0,0 +1,52 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.io.loaders import load_data, stack_panel
+from src.finance.metrics import calculate_historical_metrics
+from src.finance.scenarios import run_scenarios
+from src.finance.batch import run_batch, calculate_panel_metrics
+
+def make_company_data(data_dir):
+    """
+    Ambev data plus a scaled variant, so the panel has companies with different histories.
+    """
+    ambev = load_data(data_dir)
+    scaled = {key: df.copy() for key, df in ambev.items()}
+    scaled["income_statement"]["revenue"] = scaled["income_statement"]["revenue"] * 1.37
+    scaled["balance_sheet"]["inventory"] = scaled["balance_sheet"]["inventory"] * 2
+    return {"AMBV": ambev, "SCALED": scaled}
+
+def test_panel_metrics_match_single_company(data_dir):
+    company_data = make_company_data(data_dir)
+    panel_metrics = calculate_panel_metrics(stack_panel(company_data))
+    
+    for company, data in company_data.items():
+        single = calculate_historical_metrics(data).reset_index(drop=True)
+        batch = panel_metrics[panel_metrics["company"] == company].reset_index(drop=True)
+        for col in ["nwc", "delta_nwc", "ebit", "nopat", "fcf"]:
+            assert np.array_equal(single[col].to_numpy(), batch[col].to_numpy())
+
+def test_batch_matches_single_company_path(data_dir):
+    company_data = make_company_data(data_dir)
+    net_debt = {"AMBV": 6580.0, "SCALED": 100.0}
+    batch = run_batch(stack_panel(company_data), net_debt)
+    
+    for company, data in company_data.items():
+        single = run_scenarios(calculate_historical_metrics(data), net_debt[company])
+        batch_results = batch.to_valuation_results(company)
+        
+        for name, res in single.items():
+            other = batch_results[name]
+            assert res.enterprise_value == other.enterprise_value
+            assert res.equity_value == other.equity_value
+            assert res.pv_terminal == other.pv_terminal
+            assert res.terminal_share_warning == other.terminal_share_warning
+            pd.testing.assert_frame_equal(res.projections, other.projections)
+
+def test_batch_frame_layout(data_dir):
+    batch = run_batch(stack_panel(make_company_data(data_dir)))
+    frame = batch.to_frame()
+    
+    assert len(frame) == 2 * len(batch.scenarios)
+    assert list(frame["company"].unique()) == ["AMBV", "SCALED"]
+    assert (frame["equity_value"] == frame["enterprise_value"] - batch.net_debt[0]).all()
@@ -0,0 +1,17 @@
+from benchmarks.suite import CASES, case_id, compare
+
+def result(**seconds):
+    return {"results": {key: {"seconds": value} for key, value in seconds.items()}}
+
+def test_compare_flags_only_regressions_beyond_tolerance(capsys):
+    baseline = result(a=1.0, b=1.0, c=1.0, gone=1.0)
+    current = result(a=1.10, b=1.30, c=0.5, new=2.0)
+    assert compare(baseline, current, tolerance=0.15) == ["b"]
+    out = capsys.readouterr().out
+    assert "missing" in out and "new" in out and "faster" in out
+
+def test_suite_covers_every_kernel_and_run_all():
+    names = {name for name, *_ in CASES}
+    assert {"historical_metrics", "project_financials", "calculate_dcf", "sensitivity_grid", "export_summary", "plot_all", "run_all"} <= names
+    ids = [case_id(name, params) for name, _, params, _ in CASES]
+    assert len(ids) == len(set(ids))
@@ -0,0 +1,109 @@
+import pytest
+import pandas as pd
+import numpy as np
+from config import SETTINGS
+from src.finance.cache import ResultCache, cached_project_financials, cached_calculate_dcf
+from src.finance.projections import project_financials
+from src.finance.scenarios import run_scenarios
+from src.runtime.executor import Executor
+
+HISTORY = pd.DataFrame([{"year": 2022, "revenue": 57000.0}, {"year": 2023, "revenue": 62000.0}])
+
+def test_hits_and_misses():
+    cache = ResultCache(max_entries=10, max_bytes=10**8)
+    base = SETTINGS.scenarios["base"]
+    
+    first = cached_project_financials(HISTORY, base, cache)
+    second = cached_project_financials(HISTORY, base, cache)
+    changed = HISTORY.assign(revenue=[57000.0, 63000.0])
+    cached_project_financials(changed, base, cache)
+    
+    pd.testing.assert_frame_equal(first, project_financials(HISTORY, base))
+    pd.testing.assert_frame_equal(first, second)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+def test_cached_values_are_not_shared():
+    cache = ResultCache(max_entries=10, max_bytes=10**8)
+    base = SETTINGS.scenarios["base"]
+    proj = cached_project_financials(HISTORY, base, cache)
+    proj["fcf"] = 0.0
+    
+    assert (cached_project_financials(HISTORY, base, cache)["fcf"] != 0).all()
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = ResultCache(max_entries=2, max_bytes=10**8)
+    for i in range(3):
+        cache.get_or_compute(f"k{i}", lambda: i)
+    assert cache.stats()["evictions"] == 1
+    cache.get_or_compute("k0", lambda: "recomputed")
+    assert cache.stats()["misses"] == 4
+    
+    small = ResultCache(max_entries=100, max_bytes=20_000)
+    for i in range(4):
+        small.get_or_compute(f"arr{i}", lambda: np.zeros(1000))  # 8 kB each
+    assert small.stats()["entries"] == 2
+    assert small.bytes <= 20_000
+
+def test_settings_change_invalidates(monkeypatch):
+    cache = ResultCache(max_entries=10, max_bytes=10**8)
+    base = SETTINGS.scenarios["base"]
+    before = cached_project_financials(HISTORY, base, cache)
+    
+    monkeypatch.setattr(SETTINGS, "tax_rate", 0.25)
+    after = cached_project_financials(HISTORY, base, cache)
+    
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["hits"] == 0
+    assert (after["nopat"] > before["nopat"]).all()
+
+def test_disk_spill_survives_restart(tmp_path):
+    base = SETTINGS.scenarios["base"]
+    proj = project_financials(HISTORY, base)
+    cold = ResultCache(max_entries=10, max_bytes=10**8, disk_dir=tmp_path)
+    expected = cached_calculate_dcf(proj, base, 6580.0, "base", cold)
+    
+    warm = ResultCache(max_entries=10, max_bytes=10**8, disk_dir=tmp_path)
+    result = cached_calculate_dcf(proj, base, 6580.0, "base", warm)
+    
+    assert warm.stats()["disk_hits"] == 1
+    assert result.enterprise_value == expected.enterprise_value
+
+def test_disk_spill_is_bounded(tmp_path):
+    cache = ResultCache(max_entries=10, max_bytes=10**8, disk_dir=tmp_path, disk_max_bytes=2500)
+    for i in range(5):
+        cache.get_or_compute(f"k{i}", lambda: np.full(100, i, dtype=float))  # ~950 bytes pickled
+
+    stats = cache.stats()
+    assert stats["disk_evictions"] == 3
+    assert stats["disk_bytes"] == sum(path.stat().st_size for path in tmp_path.glob("*.pkl")) <= 2500
+    
+    warm = ResultCache(max_entries=10, max_bytes=10**8, disk_dir=tmp_path, disk_max_bytes=2500)
+    assert warm.stats()["disk_bytes"] == stats["disk_bytes"]
+    assert warm.get_or_compute("k4", lambda: None)[0] == 4
+    assert warm.get_or_compute("k0", lambda: "recomputed") == "recomputed"
+
+def test_run_scenarios_with_cache_matches_uncached():
+    cache = ResultCache(max_entries=100, max_bytes=10**8)
+    plain = run_scenarios(HISTORY, 6580.0)
+    run_scenarios(HISTORY, 6580.0, cache=cache)
+    cached = run_scenarios(HISTORY, 6580.0, cache=cache)
+    
+    assert cache.stats()["hits"] == 2 * len(SETTINGS.scenarios)
+    for name, res in plain.items():
+        assert cached[name].enterprise_value == res.enterprise_value
+
+def test_parallel_run_scenarios_uses_cache():
+    cache = ResultCache(max_entries=100, max_bytes=10**8)
+    serial = run_scenarios(HISTORY, 6580.0, cache=cache)
+    with Executor("thread", 2) as executor:
+        parallel = run_scenarios(HISTORY, 6580.0, executor=executor, cache=cache)
+        assert cache.stats()["hits"] == 2 * len(SETTINGS.scenarios)
+        
+        cache.clear()
+        run_scenarios(HISTORY, 6580.0, executor=executor, cache=cache)
+    again = run_scenarios(HISTORY, 6580.0, cache=cache)
+    
+    assert cache.stats()["hits"] == 4 * len(SETTINGS.scenarios)
+    for name, res in serial.items():
+        assert parallel[name].enterprise_value == again[name].enterprise_value == res.enterprise_value
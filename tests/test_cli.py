@@ -0,0 +1,49 @@
+import json
+import shutil
+import subprocess
+import sys
+import pytest
+from pathlib import Path
+from src.cli import _legacy_argv, build_parser, main
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+@pytest.fixture
+def base_dir(tmp_path):
+    shutil.copytree(ROOT_DIR / "data", tmp_path / "data")
+    return tmp_path
+
+def test_no_plots_path_does_not_import_matplotlib():
+    code = "import sys, src.cli, src.pipeline.orchestrator; print('matplotlib' in sys.modules, 'pandas' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout
+    assert out.split() == ["False", "True"]
+    code = "import sys, src.cli; src.cli.build_parser(); print('numpy' in sys.modules or 'pandas' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout.strip() == "False"
+
+def test_legacy_flags_map_to_commands():
+    assert _legacy_argv([]) == ["value"]
+    assert _legacy_argv(["--charts", "off"]) == ["value", "--charts", "off"]
+    assert _legacy_argv(["--serve", "--port", "0"]) == ["serve", "--port", "0"]
+    assert _legacy_argv(["montecarlo", "--draws", "10"]) == ["montecarlo", "--draws", "10"]
+    assert _legacy_argv(["--base-dir", "x", "--charts", "off"]) == ["--base-dir", "x", "value", "--charts", "off"]
+    assert _legacy_argv(["--serve", "--base-dir=x"]) == ["--base-dir=x", "serve"]
+    assert build_parser().parse_args(_legacy_argv(["--base-dir", "x"])).base_dir == Path("x")
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(["value", "--charts", "sometimes"])
+
+def test_sensitivity_and_montecarlo_commands(base_dir):
+    assert main(["--base-dir", str(base_dir), "sensitivity"]) == 0
+    summary = json.loads((base_dir / "outputs" / "sensitivity.json").read_text())
+    assert summary["scenario"] == "base" and summary["ev_min"] <= summary["ev_base"] <= summary["ev_max"]
+    assert (base_dir / "outputs" / "sensitivity_grid.csv").exists()
+    assert main(["--base-dir", str(base_dir), "sensitivity", "--scenario", "unknown"]) == 1
+
+    assert main(["--base-dir", str(base_dir), "montecarlo", "--draws", "500", "--chunk-size", "250"]) == 0
+    assert json.loads((base_dir / "outputs" / "monte_carlo.json").read_text())["n_draws"] == 500
+
+def test_value_then_export_only(base_dir):
+    assert main(["--base-dir", str(base_dir), "value", "--charts", "defer"]) == 0
+    assert (base_dir / "outputs" / "summary.json").exists()
+    assert not list((base_dir / "outputs" / "plots").glob("*.png"))
+    assert main(["--base-dir", str(base_dir), "export-only"]) == 0
+    assert (base_dir / "outputs" / "plots" / "ev_composition.png").exists()
@@ -0,0 +1,49 @@
+import os
+import shutil
+import pytest
+import pandas as pd
+import numpy as np
+from src.io.columnar import convert_csv_to_columnar, load_columnar, has_columnar
+from src.io.loaders import load_data
+from src.io.validators import REQUIRED_COLUMNS
+
+@pytest.fixture
+def data_dir(data_dir, tmp_path):
+    """Writable copy of the sample data (overrides the conftest fixture)."""
+    shutil.copytree(data_dir, tmp_path / "data")
+    return tmp_path / "data"
+
+def test_npy_bundle_round_trip(data_dir):
+    convert_csv_to_columnar(data_dir)
+    
+    csv_data = load_data(data_dir)
+    columnar_data = load_data(data_dir, fmt="columnar")
+    for key, df in csv_data.items():
+        pd.testing.assert_frame_equal(columnar_data[key], df)
+        assert not columnar_data[key]["year"].to_numpy().flags.writeable  # memory-mapped
+
+def test_column_projection(data_dir):
+    path = data_dir / "ambev_income_statement.csv"
+    pd.read_csv(path).assign(notes=1.0).to_csv(path, index=False)
+    bundle = convert_csv_to_columnar(data_dir)
+    
+    assert list(load_columnar(bundle)["income_statement"].columns) == REQUIRED_COLUMNS["income_statement"]
+    assert list(load_columnar(bundle, {"income_statement": ["year", "notes"]})["income_statement"].columns) == ["year", "notes"]
+
+def test_auto_prefers_fresh_bundle_only(data_dir):
+    convert_csv_to_columnar(data_dir)
+    assert has_columnar(data_dir)
+    
+    # A CSV edited after the conversion makes the bundle stale
+    path = data_dir / "ambev_cash_flow.csv"
+    later = os.stat(data_dir / "columnar" / "manifest.json").st_mtime + 10
+    os.utime(path, (later, later))
+    assert not has_columnar(data_dir)
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_pyarrow_formats(data_dir, fmt):
+    pytest.importorskip("pyarrow")
+    convert_csv_to_columnar(data_dir, fmt=fmt)
+    
+    for key, df in load_data(data_dir).items():
+        pd.testing.assert_frame_equal(load_data(data_dir, fmt="columnar")[key], df)
@@ -1,7 +1,7 @@
 import pytest
 import pandas as pd
 import numpy as np
-from src.finance.dcf import calculate_dcf, ValuationResult
+from src.finance.dcf import DCF_FIELDS, calculate_dcf, calculate_dcf_arrays, dcf_buffers, ValuationResult
 from config import ScenarioParams
 
 def test_dcf_calculation():
@@ -79,3 +79,34 @@ def test_dcf_invalid_g():
     
     with pytest.raises(ValueError, match="must be less than WACC"):
         calculate_dcf(projections, scenario, 0, "test")
+
+def test_dcf_projections_share_input_columns():
+    projections = pd.DataFrame({"year": [2024.0, 2025.0, 2026.0], "fcf": [100.0, 110.0, 120.0]})
+    scenario = ScenarioParams(revenue_growth=0.05, ebit_margin=0.20, wacc=0.10, terminal_g=0.02, capex_pct_rev=0.1, depreciation_pct_capex=0.8, nwc_pct_rev_change=0.1)
+    result = calculate_dcf(projections, scenario, 0, "test")
+    assert list(result.projections.columns) == ["year", "fcf", "period", "discount_factor", "pv_fcf"]
+    assert np.shares_memory(result.projections["fcf"].to_numpy(), projections["fcf"].to_numpy())
+    assert list(projections.columns) == ["year", "fcf"]
+    assert result.pv_explicit == result.projections["pv_fcf"].sum()
+    
+    # Re-valuing the result's projections replaces the added columns in place
+    again = calculate_dcf(result.projections, scenario, 0, "test")
+    assert list(again.projections.columns) == list(result.projections.columns)
+    assert again.enterprise_value == result.enterprise_value
+
+def test_dcf_arrays_preallocated_buffers():
+    rng = np.random.default_rng(1)
+    fcf = rng.uniform(50, 150, (200, 5))
+    wacc, g = rng.uniform(0.08, 0.12, 200), rng.uniform(0.0, 0.03, 200)
+    expected = calculate_dcf_arrays(fcf, wacc, g, 25.0)
+    buffers = dcf_buffers((200,), 5)
+    for _ in range(2):  # reused buffers give the same answer
+        result = calculate_dcf_arrays(fcf, wacc, g, 25.0, out=buffers)
+        for name in DCF_FIELDS + ("discount_factors",):
+            assert np.array_equal(result[name], expected[name])
+            assert result[name] is buffers[name]
+    assert np.array_equal(result["pv_fcf"], fcf * expected["discount_factors"])
+    
+    # A scalar rate fills the full-size factor buffer
+    result = calculate_dcf_arrays(fcf, 0.1, 0.02, 0.0, out=buffers)
+    assert np.array_equal(result["enterprise_value"], calculate_dcf_arrays(fcf, 0.1, 0.02, 0.0)["enterprise_value"])
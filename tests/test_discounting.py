@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from config import SETTINGS, DiscountingConfig
+from src.io.loaders import load_data, stack_panel
+from src.finance.batch import run_batch
+from src.finance.dcf import calculate_dcf_arrays
+from src.finance.discounting import DiscountTable, discount_times
+from src.finance.greeks import calculate_greeks
+from src.finance.montecarlo import run_monte_carlo
+from src.finance.projections import project_financials
+from src.finance.scenarios import run_scenarios
+from src.finance.sensitivity import calculate_sensitivity_grid
+
+def test_conventions():
+    assert discount_times(5).tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert discount_times(3, config=DiscountingConfig("mid")).tolist() == [0.5, 1.5, 2.5]
+
+    dated = DiscountingConfig("dates")
+    assert np.allclose(discount_times(2, 2024, dated), [366 / 365, 731 / 365])
+    assert np.allclose(discount_times(2, 2024, DiscountingConfig("dates", valuation_date="2024-07-01")), [183 / 365, 548 / 365])
+    assert discount_times(2, np.array([[2024], [2025]]), dated).shape == (2, 1, 2)
+    with pytest.raises(ValueError, match="first forecast year"):
+        discount_times(2, config=dated)
+    with pytest.raises(ValueError, match="Unknown discounting convention"):
+        discount_times(2, config=DiscountingConfig("continuous"))
+
+def test_default_results_unchanged(historical):
+    """Year-end discounting is bit-identical to (1 + wacc) ** -period."""
+    results = run_scenarios(historical, SETTINGS.net_debt)
+    for name, res in results.items():
+        period = res.projections["period"].to_numpy()
+        assert np.array_equal(res.projections["discount_factor"].to_numpy(), (1 + res.wacc) ** -period)
+
+    base = results["base"].projections
+    grid = calculate_sensitivity_grid(base)["matrix"]
+    wacc, g = grid.index.to_numpy()[:, None], grid.columns.to_numpy()[None, :]
+    fcf = base["fcf"].to_numpy()
+    factors = (1 + wacc[..., None]) ** -np.arange(1, len(fcf) + 1)
+    expected = np.sum(fcf * factors, axis=-1) + fcf[-1] * (1 + g) / (wacc - g) * factors[..., -1]
+    assert np.array_equal(grid.to_numpy(), np.where(wacc > g, expected, np.nan))
+
+def test_table_reuses_rows():
+    table = DiscountTable(max_rows=8)
+    times = discount_times(5)
+    rates = np.array([[0.09, 0.11], [0.11, 0.09]])
+    first = table.factors(rates, times)
+    assert np.array_equal(first, (1 + rates[..., None]) ** -times)
+    assert table.stats() == {"rows": 2, "hits": 0, "misses": 2}
+    table.factors(np.full(1_000, 0.11), times)
+    assert table.hits == 1 and len(table) == 2
+    # A different schedule is a different key; more distinct rates than rows bypass the table
+    table.factors(0.11, discount_times(5, config=DiscountingConfig("mid")))
+    assert table.misses == 3
+    assert np.array_equal(table.factors(np.linspace(0.05, 0.15, 50), times), (1 + np.linspace(0.05, 0.15, 50)[:, None]) ** -times)
+    assert len(table) == 3
+
+@pytest.mark.parametrize("config", [DiscountingConfig("mid"), DiscountingConfig("dates", valuation_date="2024-03-31")])
+def test_entry_points_agree_under_convention(historical, monkeypatch, config, data_dir):
+    monkeypatch.setattr(SETTINGS, "discounting", config)
+    results = run_scenarios(historical, SETTINGS.net_debt)
+    times = discount_times(SETTINGS.years_forecast, int(historical["year"].iloc[-1]) + 1)
+    base = results["base"]
+    assert np.allclose(base.projections["discount_factor"], (1 + base.wacc) ** -times, rtol=1e-15)
+
+    batch = run_batch(stack_panel({"AMBV": load_data(data_dir)})).to_valuation_results("AMBV")
+    greeks = calculate_greeks(historical)
+    for i, name in enumerate(SETTINGS.scenarios):
+        assert np.isclose(batch[name].enterprise_value, results[name].enterprise_value, rtol=1e-12)
+        assert np.isclose(greeks.enterprise_value[i], results[name].enterprise_value, rtol=1e-12)
+
+    grid = calculate_sensitivity_grid(base.projections)
+    assert np.isclose(grid["matrix"].loc[base.wacc, base.terminal_g], base.enterprise_value, rtol=1e-12)
+    fixed = run_monte_carlo(historical, SETTINGS.net_debt, n_draws=10, chunk_size=10, drivers={}, correlation={})
+    assert np.isclose(fixed.ev_mean, base.enterprise_value, rtol=1e-12)
+
+def test_mid_year_shifts_every_cash_flow_half_a_year(historical, monkeypatch):
+    end = run_scenarios(historical, SETTINGS.net_debt)["base"]
+    monkeypatch.setattr(SETTINGS, "discounting", DiscountingConfig("mid"))
+    mid = run_scenarios(historical, SETTINGS.net_debt)["base"]
+    assert np.isclose(mid.enterprise_value, end.enterprise_value * (1 + end.wacc) ** 0.5, rtol=1e-12)
+
+    # Greeks follow the discount times
+    fcf = project_financials(historical, SETTINGS.scenarios["base"])["fcf"].to_numpy()
+    ev = lambda w: float(calculate_dcf_arrays(fcf, w, end.terminal_g, 0.0)["enterprise_value"])
+    h = 1e-6
+    assert np.isclose(calculate_greeks(historical).entry("base").delta("wacc"), (ev(end.wacc + h) - ev(end.wacc - h)) / (2 * h), rtol=1e-6)
@@ -0,0 +1,52 @@
+import pytest
+import pandas as pd
+import numpy as np
+from functools import partial
+from src.io.loaders import load_data, stack_panel
+from src.finance.metrics import calculate_historical_metrics
+from src.finance.scenarios import run_scenarios
+from src.finance.sensitivity import calculate_sensitivity_grid
+from src.finance.batch import run_batch
+from src.runtime.executor import Executor, share_arrays
+
+def _square(x):
+    return x * x
+
+def _column_sum(shared, index):
+    with shared.open() as arrays:
+        return float(arrays["matrix"][:, index].sum())
+
+@pytest.mark.parametrize("backend", ["serial", "thread", "process"])
+def test_map_preserves_order(backend):
+    with Executor(backend, max_workers=3) as executor:
+        assert executor.map(_square, range(20), chunk_size=4) == [x * x for x in range(20)]
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_shared_arrays_reach_workers(backend):
+    matrix = np.arange(12, dtype=float).reshape(3, 4)
+    with Executor(backend, max_workers=2) as executor:
+        with share_arrays({"matrix": matrix}, executor) as shared:
+            sums = executor.map(partial(_column_sum, shared), range(4))
+    assert sums == list(matrix.sum(axis=0))
+
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_parallel_pipeline_matches_serial(backend, data_dir):
+    data = load_data(data_dir)
+    historical = calculate_historical_metrics(data)
+    serial = run_scenarios(historical, 6580.0)
+    serial_grid = calculate_sensitivity_grid(serial["base"].projections)
+    panel = stack_panel({f"C{i}": data for i in range(7)})
+    serial_batch = run_batch(panel)
+    
+    with Executor(backend, max_workers=2) as executor:
+        parallel = run_scenarios(historical, 6580.0, executor)
+        parallel_grid = calculate_sensitivity_grid(parallel["base"].projections, executor)
+        parallel_batch = run_batch(panel, executor=executor)
+        
+    assert list(parallel) == list(serial)
+    for name, res in serial.items():
+        assert parallel[name].enterprise_value == res.enterprise_value
+        pd.testing.assert_frame_equal(parallel[name].projections, res.projections)
+    pd.testing.assert_frame_equal(parallel_grid["matrix"], serial_grid["matrix"])
+    for field, values in serial_batch.valuation.items():
+        assert np.array_equal(parallel_batch.valuation[field], values)
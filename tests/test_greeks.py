@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from config import SETTINGS
+from src.io.loaders import load_data
+from src.finance.dcf import calculate_dcf_arrays
+from src.finance.greeks import DRIVERS, calculate_greeks, ev_greeks_arrays
+from src.finance.metrics import calculate_historical_metrics
+from src.finance.projections import project_arrays
+from src.finance.scenarios import run_scenarios
+
+def ev(last_revenue: float, x: np.ndarray) -> float:
+    p = dict(zip(DRIVERS, x))
+    projections = project_arrays(last_revenue, p["revenue_growth"], p["ebit_margin"], p["capex_pct_rev"], p["depreciation_pct_capex"], p["nwc_pct_rev_change"])
+    return float(calculate_dcf_arrays(projections.fcf, p["wacc"], p["terminal_g"], 0.0)["enterprise_value"])
+
+@pytest.mark.parametrize("name", ["base", "downside", "upside"])
+def test_greeks_match_finite_differences(name):
+    x0 = np.array([getattr(SETTINGS.scenarios[name], d) for d in DRIVERS])
+    greeks = ev_greeks_arrays(1000.0, *x0)
+    eye = np.eye(len(DRIVERS))
+
+    h = 1e-5
+    gradient = np.array([(ev(1000.0, x0 + h * e) - ev(1000.0, x0 - h * e)) / (2 * h) for e in eye])
+    assert np.allclose(greeks.gradient, gradient, rtol=1e-6, atol=1e-4)
+
+    h = 1e-4
+    hessian = np.array([[
+        (ev(1000.0, x0 + h * (ei + ej)) - ev(1000.0, x0 + h * (ei - ej)) - ev(1000.0, x0 - h * (ei - ej)) + ev(1000.0, x0 - h * (ei + ej))) / (4 * h * h)
+        for ej in eye] for ei in eye])
+    assert np.allclose(greeks.hessian, hessian, rtol=1e-4, atol=1e-2)
+    assert np.allclose(greeks.hessian, np.swapaxes(greeks.hessian, -1, -2))
+
+def test_scenario_greeks_and_batch_broadcasting(data_dir):
+    historical = calculate_historical_metrics(load_data(data_dir))
+    greeks = calculate_greeks(historical)
+    results = run_scenarios(historical, SETTINGS.net_debt)
+    for i, name in enumerate(greeks.labels):
+        assert np.isclose(greeks.enterprise_value[i], results[name].enterprise_value, rtol=1e-12)
+    assert greeks.delta("wacc").shape == (3,) and np.all(greeks.delta("wacc") < 0)
+    assert np.allclose(greeks.gamma("wacc", "terminal_g"), greeks.gamma("terminal_g", "wacc"))
+    ranking = greeks.entry("base").driver_ranking()
+    assert {name for name, _ in ranking} == set(DRIVERS)
+    assert ranking[0][1] >= ranking[-1][1]
+    # Swings keep the gamma term: the larger of the two second-order moves
+    down, up = greeks.entry("base").tornado()["wacc"]
+    assert dict(ranking)["wacc"] == max(abs(down), abs(up)) > abs(up - down) / 2
+
+    # Thousands of companies x scenarios in one call
+    revenue = np.linspace(100, 10_000, 2_000)[:, None]
+    batch = ev_greeks_arrays(revenue, *(np.array([getattr(s, d) for s in SETTINGS.scenarios.values()]) for d in DRIVERS))
+    assert batch.gradient.shape == (2_000, 3, len(DRIVERS)) and batch.swings().shape == (2_000, 3, len(DRIVERS))
+    assert np.allclose(batch.gradient[-1], greeks.gradient * (10_000 / historical["revenue"].iloc[-1]))
+
+def test_greeks_reject_growth_above_wacc():
+    with pytest.raises(ValueError, match="must be less than WACC"):
+        ev_greeks_arrays(1000.0, 0.05, 0.28, 0.03, 0.03, 0.15, 0.8, 0.1)
+
+def test_gradient_only_greeks():
+    full = ev_greeks_arrays(1000.0, *(np.array([getattr(s, d) for s in SETTINGS.scenarios.values()]) for d in DRIVERS))
+    first = ev_greeks_arrays(1000.0, *(np.array([getattr(s, d) for s in SETTINGS.scenarios.values()]) for d in DRIVERS), second_order=False)
+    first.labels = full.labels = list(SETTINGS.scenarios)
+    assert first.hessian is None and np.array_equal(first.gradient, full.gradient)
+    base = first.entry("base")
+    assert base.delta("wacc") == full.entry("base").delta("wacc") and len(base.to_frame()) == 1
+    for method in [lambda: base.gamma("wacc"), base.tornado, base.swings, base.driver_ranking]:
+        with pytest.raises(ValueError, match="second_order=True"):
+            method()
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from dataclasses import asdict
+from config import SETTINGS
+from src.finance.greeks import DRIVERS
+from src.finance.implied import implied_assumption, solve_implied
+from src.finance.scenarios import run_scenarios
+
+@pytest.mark.parametrize("driver", DRIVERS)
+def test_recovers_scenario_driver_from_its_equity_value(historical, driver):
+    results = run_scenarios(historical, SETTINGS.net_debt)
+    for name, scenario in SETTINGS.scenarios.items():
+        solution = implied_assumption(historical, scenario, driver, results[name].equity_value)
+        assert solution.status == "converged"
+        assert np.isclose(solution.value, getattr(scenario, driver), rtol=1e-8, atol=1e-9)
+
+def test_vectorized_targets_respect_growth_below_wacc():
+    rng = np.random.default_rng(0)
+    targets = rng.uniform(1e4, 1e6, 2_000)
+    revenue = rng.uniform(1e3, 1e5, 2_000)
+    params = asdict(SETTINGS.scenarios["base"])
+
+    solution = solve_implied("wacc", targets, revenue, params, net_debt=6580.0)
+    assert solution.value.shape == (2_000,) and solution.converged.all()
+    assert np.all(solution.value > params["terminal_g"])
+    assert np.all(np.abs(solution.residual) <= 1e-10 * targets)
+    assert solution.newton_steps.sum() > 0.5 * solution.iterations.sum()
+
+    growth = solve_implied("terminal_g", targets, revenue, params, net_debt=6580.0)
+    ok = growth.converged
+    assert np.all(growth.value[ok] < params["wacc"])
+    assert set(growth.status[~ok]) <= {"no_bracket"} and np.isnan(growth.value[~ok]).all()
+    assert "converged" in growth.summary() and len(growth.to_frame()) == 2_000
+
+def test_unreachable_target_and_bad_driver(historical):
+    scenario = SETTINGS.scenarios["base"]
+    solution = implied_assumption(historical, scenario, "ebit_margin", [1e12, 1e5], bracket=(0.0, 0.5))
+    assert list(solution.status) == ["no_bracket", "converged"]
+    with pytest.raises(ValueError, match="Unknown driver"):
+        implied_assumption(historical, scenario, "beta", 1e5)
@@ -0,0 +1,62 @@
+import json
+import shutil
+import pytest
+import pandas as pd
+import numpy as np
+from config import SETTINGS, DriverSchedule
+from src.io.loaders import load_data
+from src.finance.metrics import calculate_historical_metrics
+from src.finance.scenarios import run_scenarios
+from src.pipeline.incremental import IncrementalValuation
+
+@pytest.fixture
+def engine(tmp_path, data_dir):
+    shutil.copytree(data_dir, tmp_path / "data")
+    engine = IncrementalValuation(tmp_path)
+    engine.run()
+    return engine
+
+def test_second_run_skips_everything(engine):
+    report = engine.run()
+    assert report.recomputed == []
+    assert "export" in report.skipped
+
+def test_wacc_change_only_rediscounts(engine, monkeypatch):
+    monkeypatch.setattr(SETTINGS.scenarios["base"], "wacc", 0.12)
+    report = engine.run()
+    
+    assert report.recomputed == ["dcf:base", "export"]
+    summary = json.loads((engine.output_dir / "summary.json").read_text())
+    expected = run_scenarios(calculate_historical_metrics(load_data(engine.data_dir)), SETTINGS.net_debt)
+    assert np.isclose(summary["base"]["enterprise_value"], expected["base"].enterprise_value)
+
+def test_non_final_year_edit_keeps_projections(engine):
+    path = engine.data_dir / "ambev_income_statement.csv"
+    df = pd.read_csv(path)
+    df.loc[df["year"] == 2021, "revenue"] += 1000
+    df.to_csv(path, index=False)
+    report = engine.run()
+    
+    assert "metrics" in report.recomputed
+    assert not any(name.startswith(("projections:", "dcf:")) for name in report.recomputed)
+    assert "load:balance_sheet" in report.skipped
+
+def test_schedule_change_reprojects(engine, monkeypatch):
+    monkeypatch.setattr(SETTINGS.scenarios["base"], "schedules", {"revenue_growth": DriverSchedule("linear")})
+    report = engine.run()
+
+    assert {"projections:base", "dcf:base", "sensitivity"} <= set(report.recomputed)
+    assert [name for name in report.recomputed if name.startswith("projections:")] == ["projections:base"]
+    summary = json.loads((engine.output_dir / "summary.json").read_text())
+    expected = run_scenarios(calculate_historical_metrics(load_data(engine.data_dir)), SETTINGS.net_debt)
+    assert np.isclose(summary["base"]["enterprise_value"], expected["base"].enterprise_value)
+
+def test_discounting_change_rediscounts(engine, monkeypatch):
+    monkeypatch.setattr(SETTINGS.discounting, "convention", "mid")
+    report = engine.run()
+
+    assert not any(name.startswith(("load:", "metrics", "projections:")) for name in report.recomputed)
+    assert {f"dcf:{name}" for name in SETTINGS.scenarios} | {"sensitivity", "export"} <= set(report.recomputed)
+    summary = json.loads((engine.output_dir / "summary.json").read_text())
+    expected = run_scenarios(calculate_historical_metrics(load_data(engine.data_dir)), SETTINGS.net_debt)
+    assert np.isclose(summary["base"]["enterprise_value"], expected["base"].enterprise_value)
@@ -0,0 +1,44 @@
+import json
+import shutil
+from config import SETTINGS
+from src.runtime.instrumentation import count, instrumented, span
+from src.pipeline.orchestrator import run_all
+
+def test_disabled_spans_are_shared_no_ops():
+    with instrumented(enabled=False) as instrumentation:
+        assert instrumentation is None
+        assert span("a") is span("b")
+        count("rows")  # ignored
+
+def test_nested_spans_and_counters():
+    with instrumented(enabled=True, trace_memory=True) as instrumentation:
+        with span("outer", stage="x"):
+            count("rows", 10)
+            with span("inner"):
+                count("rows", 5)
+                blob = [0] * 100_000
+            del blob
+        with instrumented(enabled=True) as nested:
+            assert nested is None  # the outer block owns the run
+    
+    inner, outer = instrumentation.records
+    assert (outer.path, inner.path) == ("outer", "outer/inner")
+    assert outer.attrs == {"stage": "x"}
+    assert outer.counters == {"rows": 10} and inner.counters == {"rows": 5}
+    assert instrumentation.counters == {"rows": 15}
+    assert outer.wall_s >= inner.wall_s > 0
+    assert outer.alloc_peak_kb >= inner.alloc_peak_kb > 700  # 100k pointers
+    assert span("after") is span("again")  # deactivated on exit
+
+def test_run_all_exports_jsonl_and_chrome_trace(tmp_path, monkeypatch, data_dir):
+    shutil.copytree(data_dir, tmp_path / "data")
+    monkeypatch.setattr(SETTINGS.instrumentation, "enabled", True)
+    run_all(tmp_path, charts="off")
+    
+    lines = [json.loads(line) for line in (tmp_path / "outputs" / "instrumentation.jsonl").read_text().splitlines()]
+    paths = {line["path"] for line in lines if line["type"] == "span"}
+    assert {"run_all", "run_all/load", "run_all/scenarios/scenario/dcf", "run_all/sensitivity", "run_all/export"} <= paths
+    assert lines[-1]["counters"]["grid_cells_evaluated"] == len(SETTINGS.sensitivity.wacc_values) * len(SETTINGS.sensitivity.terminal_g_values)
+    
+    trace = json.loads((tmp_path / "outputs" / "trace.json").read_text())
+    assert {event["ph"] for event in trace["traceEvents"]} == {"X", "C"}
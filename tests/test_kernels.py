@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from dataclasses import replace
+from config import SETTINGS, DriverSchedule
+from src.finance import kernels
+from src.finance.dcf import calculate_dcf
+from src.finance.discounting import discount_times
+from src.finance.kernels import enterprise_values, resolve_kernel
+from src.finance.montecarlo import run_monte_carlo
+from src.finance.projections import project_financials, scenario_paths
+
+def scenarios():
+    faded = replace(SETTINGS.scenarios["base"], schedules={
+        "revenue_growth": DriverSchedule("linear"),
+        "ebit_margin": DriverSchedule("stages", values=[0.30, 0.26], stage_years=[2]),
+    })
+    return [*SETTINGS.scenarios.values(), faded]
+
+def kernel_inputs(historical, scenario):
+    """(args, schedules, times) valuing one scenario as a batch of one draw."""
+    last = historical.iloc[-1]
+    args = [np.array([last["revenue"]])] + [np.array([getattr(scenario, name)]) for name in ["revenue_growth", "ebit_margin", "capex_pct_rev", "depreciation_pct_capex", "nwc_pct_rev_change", "wacc", "terminal_g"]]
+    schedules = {name: path[None] for name, path in scenario_paths(scenario).items()}
+    return args, schedules, discount_times(SETTINGS.years_forecast, int(last["year"]) + 1)
+
+@pytest.mark.parametrize("kernel", ["numpy", "numba"])
+def test_kernels_match_calculate_dcf(historical, kernel):
+    if kernel == "numba":
+        pytest.importorskip("numba")
+    for scenario in scenarios():
+        expected = calculate_dcf(project_financials(historical, scenario), scenario, SETTINGS.net_debt, "x").enterprise_value
+        args, schedules, times = kernel_inputs(historical, scenario)
+        ev = enterprise_values(*args, times, schedules=schedules, kernel=kernel)
+        assert ev.shape == (1,) and np.isclose(ev[0], expected, rtol=1e-12, atol=0)
+
+def test_fused_loop_matches_array_kernels(historical):
+    """The loop numba compiles, run as plain Python, against the NumPy path."""
+    rng = np.random.default_rng(3)
+    n, years = 50, SETTINGS.years_forecast
+    base = SETTINGS.scenarios["base"]
+    growth, margin = rng.normal(0.05, 0.02, n), rng.normal(0.28, 0.02, n)
+    wacc, g = rng.uniform(0.09, 0.12, n), rng.uniform(0.01, 0.04, n)
+    schedules = {"capex_pct_rev": rng.uniform(0.03, 0.06, (n, years))}
+    times = discount_times(years)
+    expected = enterprise_values(1000.0, growth, margin, base.capex_pct_rev, base.depreciation_pct_capex, base.nwc_pct_rev_change, wacc, g, times, schedules=schedules, kernel="numpy")
+
+    out = np.empty(n)
+    per_year = lambda x: np.broadcast_to(np.asarray(x, dtype=float)[..., None], (n, years))
+    kernels._fused_ev_loop(np.full(n, 1000.0), per_year(growth), per_year(margin), schedules["capex_pct_rev"], per_year(base.depreciation_pct_capex),
+                           per_year(base.nwc_pct_rev_change), np.full(n, SETTINGS.tax_rate), wacc, g, times, out)
+    np.testing.assert_allclose(out, expected, rtol=1e-12)
+
+def test_kernel_selection(monkeypatch, historical):
+    monkeypatch.setattr(kernels, "numba", None)
+    assert resolve_kernel("auto") == "numpy" and resolve_kernel("numpy") == "numpy"
+    with pytest.raises(ImportError, match="pip install numba"):
+        resolve_kernel("numba")
+    with pytest.raises(ImportError, match="pip install numba"):
+        run_monte_carlo(historical, SETTINGS.net_debt, n_draws=10, chunk_size=10, kernel="numba")
+    with pytest.raises(ValueError, match="Unknown kernel"):
+        resolve_kernel("fortran")
+
+    # Without numba "auto" is the NumPy path
+    auto = run_monte_carlo(historical, SETTINGS.net_debt, n_draws=2_000, chunk_size=500)
+    assert auto == run_monte_carlo(historical, SETTINGS.net_debt, n_draws=2_000, chunk_size=500, kernel="numpy")
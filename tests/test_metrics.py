@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dataclasses import replace
+from benchmarks.synthetic import make_history, make_panel, to_quarterly
+from src.io.validators import validate_data, validate_panel
+from src.finance.batch import calculate_panel_metrics
+from src.finance.checks import consistency_warnings
+from src.finance.metrics import apply_metric_formulas, calculate_historical_metrics, historical_averages, panel_averages, rolling_averages
+from src.finance.projections import project_financials
+from config import SETTINGS
+
+def test_aligned_join_matches_merges():
+    panel = make_panel(20, 6, seed=3)
+    # Missing and shuffled rows exercise the inner join and the sort
+    panel["balance_sheet"] = panel["balance_sheet"].drop(index=[2, 31]).sample(frac=1.0, random_state=0)
+    keys = ["company", "year"]
+    merged = panel["income_statement"].merge(panel["balance_sheet"], on=keys).merge(panel["cash_flow"], on=keys)
+    expected = apply_metric_formulas(merged.sort_values(keys, kind="stable").reset_index(drop=True), group_col="company")
+    pd.testing.assert_frame_equal(calculate_panel_metrics(panel), expected, check_exact=True)
+
+    history = make_history(8)
+    merged = history["income_statement"].merge(history["balance_sheet"], on="year").merge(history["cash_flow"], on="year")
+    pd.testing.assert_frame_equal(calculate_historical_metrics(history), apply_metric_formulas(merged).sort_values("year"), check_exact=True)
+
+def test_ttm_rows_at_q4_equal_annual_rows():
+    panel = make_panel(4, 6)
+    quarterly = to_quarterly(panel)
+    validate_data({key: df[df["company"] == "C000001"].drop(columns="company") for key, df in quarterly.items()})
+    assert validate_panel(quarterly).ok
+
+    annual = calculate_panel_metrics(panel)
+    ttm = calculate_panel_metrics(quarterly)
+    # Three quarters per company lack a full window
+    assert len(ttm) == 4 * (6 * 4 - 3)
+    q4 = ttm[ttm["quarter"] == 4].reset_index(drop=True)
+    for col in ["revenue", "ebit", "capex_abs", "delta_nwc", "fcf"]:
+        assert np.allclose(q4[col], annual[col], rtol=1e-12)
+
+def test_ttm_gap_and_projection_anchor():
+    history = to_quarterly(make_history(5))
+    # Dropping one quarter breaks the four windows that contain it
+    history = {key: df.drop(index=9).reset_index(drop=True) for key, df in history.items()}
+    ttm = calculate_historical_metrics(history)
+    assert len(ttm) == 20 - 3 - 4
+    projections = project_financials(ttm, SETTINGS.scenarios["base"])
+    assert projections["year"].iloc[0] == ttm["year"].iloc[-1] + 1
+    assert np.isclose(projections["revenue"].iloc[0], ttm["revenue"].iloc[-1] * (1 + SETTINGS.scenarios["base"].revenue_growth))
+
+def test_rolling_and_panel_averages():
+    metrics = rolling_averages(calculate_panel_metrics(make_panel(3, 5)), years=2, group_col="company")
+    margin = (metrics["ebit"] / metrics["revenue"]).to_numpy()
+    first_rows = np.flatnonzero(metrics["company"].ne(metrics["company"].shift()).to_numpy())
+    assert np.isnan(metrics["ebit_margin_avg"].to_numpy()[first_rows]).all()
+    assert np.isclose(metrics["ebit_margin_avg"].iloc[1], margin[:2].mean())
+    assert np.allclose(metrics["ebit_margin_avg"].dropna(), metrics.groupby("company")["ebit_margin"].rolling(2).mean().dropna())
+
+    averages = panel_averages(metrics, "company")
+    assert np.allclose(averages["capex_pct_rev"], metrics.groupby("company")["capex_pct_rev"].mean())
+    with pytest.raises(ValueError, match="years must be positive"):
+        rolling_averages(metrics, years=0)
+
+def test_checks_share_historical_averages():
+    historical = calculate_historical_metrics(make_history(6))
+    averages = historical_averages(historical)
+    assert averages.ebit_margin == (historical["ebit"] / historical["revenue"]).mean()
+    projections = project_financials(historical, SETTINGS.scenarios["base"])
+    assert consistency_warnings(historical, projections, "base", averages) == consistency_warnings(historical, projections, "base")
+    # The averages passed in are what the margin check compares against
+    shifted = consistency_warnings(historical, projections, "base", replace(averages, ebit_margin=0.9))
+    assert "ebit_margin_deviation" in {w.check for w in shifted}
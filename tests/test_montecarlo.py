@@ -0,0 +1,78 @@
+import pytest
+import pandas as pd
+import numpy as np
+from config import SETTINGS, Distribution
+from src.finance.montecarlo import run_monte_carlo, QuantileSketch, RunningMoments
+
+HISTORY = pd.DataFrame([{"year": 2023, "revenue": 62000.0}])
+
+def test_seeded_runs_are_reproducible():
+    first = run_monte_carlo(HISTORY, 6580.0, n_draws=20_000, chunk_size=5_000)
+    second = run_monte_carlo(HISTORY, 6580.0, n_draws=20_000, chunk_size=5_000)
+    other_seed = run_monte_carlo(HISTORY, 6580.0, n_draws=20_000, chunk_size=5_000, seed=7)
+    
+    assert first == second
+    assert first.ev_mean != other_seed.ev_mean
+    assert first.n_draws == 20_000
+
+def test_fixed_drivers_reproduce_base_case():
+    """
+    With every driver fixed at the base scenario, each draw equals the base EV.
+    """
+    base = SETTINGS.scenarios["base"]
+    drivers = {name: Distribution("fixed", mean=getattr(base, name)) for name in ["revenue_growth", "ebit_margin", "wacc", "terminal_g"]}
+    result = run_monte_carlo(HISTORY, 6580.0, n_draws=1_000, chunk_size=300, drivers=drivers, correlation={})
+    
+    assert result.ev_std < 1e-6 * result.ev_mean
+    assert np.isclose(result.ev_quantiles[0.5], result.ev_mean)
+    assert result.prob_ev_below_net_debt == 0.0
+
+def test_invalid_draws_dropped_or_raised():
+    drivers = {
+        "wacc": Distribution("uniform", low=0.02, high=0.06),
+        "terminal_g": Distribution("fixed", mean=0.04),
+    }
+    result = run_monte_carlo(HISTORY, 6580.0, n_draws=10_000, chunk_size=2_500, drivers=drivers, correlation={})
+    
+    assert 0 < result.n_invalid < result.n_draws
+    assert result.n_valid + result.n_invalid == result.n_draws
+    assert abs(result.n_invalid / result.n_draws - 0.5) < 0.05
+    
+    with pytest.raises(ValueError, match="must be less than WACC"):
+        run_monte_carlo(HISTORY, 6580.0, n_draws=1_000, chunk_size=1_000, drivers=drivers, correlation={}, on_invalid="raise")
+
+def test_streaming_statistics_match_exact():
+    values = np.random.default_rng(0).lognormal(0, 1, 200_000)
+    sketch = QuantileSketch(500)
+    moments = RunningMoments()
+    for chunk in np.array_split(values, 9):
+        sketch.update(chunk)
+        moments.update(chunk)
+        
+    assert np.isclose(moments.mean, values.mean())
+    assert np.isclose(moments.variance, values.var(ddof=1))
+    for q in [0.01, 0.05, 0.5, 0.95, 0.99]:
+        assert np.isclose(sketch.quantile(q), np.quantile(values, q), rtol=0.01)
+    assert len(sketch.means) <= 501
+
+@pytest.mark.parametrize("dist, match", [
+    (Distribution("uniform"), "finite low < high"),
+    (Distribution("uniform", low=0.1, high=0.05), "finite low < high"),
+    (Distribution("triangular", low=0.08, high=0.12), "low <= mode <= high"),
+    (Distribution("triangular", low=0.08, mode=0.2, high=0.12), "low <= mode <= high"),
+    (Distribution("normal", mean=0.1, std=-0.01), "std >= 0"),
+    (Distribution("lognormal", mean=0.1), "Unknown distribution kind"),
+])
+def test_invalid_distributions_rejected(dist, match):
+    with pytest.raises(ValueError, match=match):
+        run_monte_carlo(HISTORY, 6580.0, n_draws=100, chunk_size=100, drivers={"wacc": dist}, correlation={})
+
+@pytest.mark.parametrize("overrides, field", [
+    ({"chunk_size": 0}, "chunk_size"),
+    ({"chunk_size": -10}, "chunk_size"),
+    ({"n_draws": 0}, "n_draws"),
+    ({"n_draws": 2.5}, "n_draws"),
+])
+def test_invalid_draw_counts_rejected(overrides, field):
+    with pytest.raises(ValueError, match=f"{field} must be a positive integer"):
+        run_monte_carlo(HISTORY, 6580.0, **{"n_draws": 100, "chunk_size": 100, **overrides})
@@ -0,0 +1,57 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.finance.projections import project_arrays, project_financials
+from config import SETTINGS, ScenarioParams
+
+def make_scenario(**overrides) -> ScenarioParams:
+    params = dict(
+        revenue_growth=0.05,
+        ebit_margin=0.20,
+        wacc=0.10,
+        terminal_g=0.02,
+        capex_pct_rev=0.1,
+        depreciation_pct_capex=0.8,
+        nwc_pct_rev_change=0.1
+    )
+    params.update(overrides)
+    return ScenarioParams(**params)
+
+def test_project_financials_known_values():
+    """
+    First projected year by hand: revenue 100 growing 5%.
+    """
+    history = pd.DataFrame([{"year": 2023, "revenue": 100.0}])
+    proj = project_financials(history, make_scenario())
+    row = proj.iloc[0]
+    
+    assert len(proj) == SETTINGS.years_forecast
+    assert row["year"] == 2024
+    assert np.isclose(row["revenue"], 105)
+    assert np.isclose(row["ebit"], 21)
+    assert np.isclose(row["nopat"], 21 * (1 - SETTINGS.tax_rate))
+    assert np.isclose(row["capex"], 10.5)
+    assert np.isclose(row["depreciation"], 8.4)
+    assert np.isclose(row["delta_nwc"], 0.5)
+    assert np.isclose(row["fcf"], row["nopat"] + 8.4 - 10.5 - 0.5)
+
+def test_project_arrays_matches_dataframe_api():
+    """
+    Each row of a vectorized run equals the single-scenario DataFrame projection.
+    """
+    history = pd.DataFrame([{"year": 2023, "revenue": 62000.0}])
+    growth = np.array([0.02, 0.05, 0.08])
+    margin = np.array([0.24, 0.28, 0.32])
+    arrays = project_arrays(62000.0, growth, margin, 0.15, 0.8, 0.1)
+    
+    assert arrays.fcf.shape == (3, SETTINGS.years_forecast)
+    for i in range(3):
+        proj = project_financials(history, make_scenario(revenue_growth=growth[i], ebit_margin=margin[i], capex_pct_rev=0.15))
+        for col in ["revenue", "ebit", "capex", "delta_nwc", "fcf"]:
+            assert np.array_equal(arrays.as_dict()[col][i], proj[col].to_numpy())
+
+def test_project_arrays_horizon_override():
+    arrays = project_arrays([100.0, 200.0], 0.1, 0.2, 0.1, 1.0, 0.0, years=30)
+    
+    assert arrays.revenue.shape == (2, 30)
+    assert np.allclose(arrays.revenue[:, -1], np.array([100.0, 200.0]) * 1.1 ** 30)
@@ -0,0 +1,82 @@
+import shutil
+import pytest
+import pandas as pd
+from src.io.loaders import load_data, stack_panel
+from src.io.registry import DataRegistry, DataSource, SQLiteSource, write_sqlite
+from src.io.validators import validate_data
+from src.pipeline.orchestrator import run_batch_all
+
+@pytest.fixture
+def company_dirs(tmp_path, data_dir):
+    """Three company directories; BAD has unsorted years in its income statement."""
+    root = tmp_path / "companies"
+    for company in ["AAA", "BBB", "BAD"]:
+        shutil.copytree(data_dir, root / company)
+    path = root / "BAD" / "ambev_income_statement.csv"
+    pd.read_csv(path).iloc[::-1].to_csv(path, index=False)
+    return root
+
+def test_lazy_statements_load_on_first_access(company_dirs, data_dir):
+    registry = DataRegistry().register("AAA", company_dirs / "AAA")
+    data = registry.get("AAA")
+    assert data.loaded == []
+
+    pd.testing.assert_frame_equal(data["balance_sheet"], load_data(data_dir)["balance_sheet"])
+    assert data.loaded == ["balance_sheet"]
+
+    validate_data(data)
+    assert sorted(data.loaded) == sorted(data)
+
+def test_invalid_company_stops_loading_at_first_bad_statement(company_dirs):
+    bad = DataRegistry().register_glob(str(company_dirs / "*")).get("BAD")
+    with pytest.raises(ValueError, match="sorted"):
+        validate_data(bad)
+    assert bad.loaded == ["income_statement"]
+
+def test_glob_and_sqlite_panels_match(company_dirs, tmp_path, data_dir):
+    from_dirs = DataRegistry().register_glob(str(company_dirs / "*"))
+    assert from_dirs.companies() == ["AAA", "BAD", "BBB"]
+    panel, report = from_dirs.load_panel()
+    assert report.bad_companies == ["BAD"]
+    assert list(panel["cash_flow"]["company"].unique()) == ["AAA", "BBB"]
+
+    data = load_data(data_dir)
+    db = write_sqlite(stack_panel({"AAA": data, "BBB": data}), tmp_path / "warehouse.sqlite")
+    from_db = DataRegistry(batch_size=1).register_sqlite(db)
+    db_panel, db_report = from_db.load_panel()
+    assert db_report.ok
+    for key, df in panel.items():
+        pd.testing.assert_frame_equal(db_panel[key], df)
+
+def test_sqlite_reads_are_batched(tmp_path, monkeypatch, data_dir):
+    data = load_data(data_dir)
+    db = write_sqlite(stack_panel({f"C{i}": data for i in range(7)}), tmp_path / "warehouse.sqlite")
+    queries = []
+    original = pd.read_sql_query
+    monkeypatch.setattr(pd, "read_sql_query", lambda *args, **kwargs: queries.append(1) or original(*args, **kwargs))
+
+    frames = SQLiteSource(db, batch_size=3).read("income_statement", [f"C{i}" for i in range(7)])
+    assert len(frames) == 7
+    assert len(queries) == 3
+
+def test_sqlite_round_trip_keeps_integer_periods(tmp_path, data_dir):
+    annual = load_data(data_dir)["income_statement"]
+    quarterly = annual.loc[annual.index.repeat(4)].reset_index(drop=True).assign(quarter=[1, 2, 3, 4] * len(annual))
+    db = write_sqlite(stack_panel({"ANN": {"income_statement": annual}, "QTR": {"income_statement": quarterly}}), tmp_path / "warehouse.sqlite")
+
+    frames = SQLiteSource(db).read("income_statement", ["ANN", "QTR"])
+    pd.testing.assert_frame_equal(frames["ANN"], annual)
+    pd.testing.assert_frame_equal(frames["QTR"], quarterly)
+
+def test_batch_from_registry_skips_invalid_companies(company_dirs, tmp_path):
+    registry = DataRegistry().register_glob(str(company_dirs / "*"))
+    batch = run_batch_all(tmp_path, registry)
+    assert batch.companies == ["AAA", "BBB"]
+    assert "Quarantined BAD" in (tmp_path / "outputs" / "batch_log.txt").read_text()
+
+def test_incomplete_source_fails_on_creation():
+    class CompaniesOnly(DataSource):
+        def companies(self):
+            return []
+    with pytest.raises(TypeError, match="abstract"):
+        CompaniesOnly()
@@ -0,0 +1,90 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from dataclasses import replace
+from config import SETTINGS
+from src.io.loaders import load_data
+from src.finance.metrics import calculate_historical_metrics
+from src.finance.scenarios import run_scenarios
+from src.finance.sensitivity import calculate_sensitivity_grid
+from matplotlib.axes import Axes
+from src.reporting.plots import plot_all, plot_sensitivity_heatmap
+from src.reporting.render import render_charts, render_pending
+from src.runtime.executor import Executor
+
+@pytest.fixture(scope="module")
+def inputs(data_dir):
+    results = run_scenarios(calculate_historical_metrics(load_data(data_dir)), SETTINGS.net_debt)
+    return results, calculate_sensitivity_grid(results["base"].projections)
+
+@pytest.fixture(autouse=True)
+def serial_charts(monkeypatch):
+    monkeypatch.setattr(SETTINGS, "charts", replace(SETTINGS.charts, backend="serial"))
+
+def test_off_renders_nothing_but_keeps_insights(inputs, tmp_path):
+    results, sensitivity = inputs
+    insights, report = render_charts(results, sensitivity, tmp_path, "off")
+    
+    assert set(report.status.values()) == {"disabled"}
+    assert not (tmp_path / "plots").exists()
+    direct = tmp_path / "direct"
+    direct.mkdir()
+    assert insights == plot_all(results, sensitivity, direct)
+
+def test_unchanged_charts_are_skipped(inputs, tmp_path):
+    results, sensitivity = inputs
+    _, first = render_charts(results, sensitivity, tmp_path, "on")
+    assert set(first.status.values()) == {"rendered"}
+    assert (tmp_path / "plots" / "sensitivity.png").exists()
+    
+    _, second = render_charts(results, sensitivity, tmp_path, "on")
+    assert set(second.status.values()) == {"skipped"}
+    
+    # Only the charts drawn from the scenario results change with a new EV split
+    changed = dict(results, downside=replace(results["downside"], pv_explicit=results["downside"].pv_explicit + 1))
+    _, third = render_charts(changed, sensitivity, tmp_path, "on")
+    assert [name for name, status in third.status.items() if status == "rendered"] == ["ev_composition", "fcf_projection"]
+    
+    # A deleted output forces a re-render
+    (tmp_path / "plots" / "ev_vs_wacc.png").unlink()
+    _, fourth = render_charts(changed, sensitivity, tmp_path, "on")
+    assert fourth.status["sensitivity_1d"] == "rendered"
+
+def test_deferred_charts_render_later(inputs, tmp_path):
+    results, sensitivity = inputs
+    _, report = render_charts(results, sensitivity, tmp_path, "defer")
+    assert set(report.status.values()) == {"deferred"}
+    assert not (tmp_path / "plots" / "sensitivity.png").exists()
+    
+    pending = render_pending(tmp_path)
+    assert set(pending.status.values()) == {"rendered"}
+    assert (tmp_path / "plots" / "sensitivity.png").exists()
+    assert render_pending(tmp_path).status == {}
+
+def test_large_heatmaps_skip_cell_labels(inputs, tmp_path, monkeypatch):
+    results, sensitivity = inputs
+    wacc, g = np.linspace(0.08, 0.14, 150), np.linspace(0.0, 0.05, 150)
+    grid = {"matrix": pd.DataFrame(np.random.default_rng(0).uniform(1e5, 3e5, (150, 150)), index=wacc, columns=g)}
+    texts = []
+    monkeypatch.setattr(Axes, "text", lambda self, *args, **kwargs: texts.append(args))
+    start = time.perf_counter()
+    plot_sensitivity_heatmap(grid, tmp_path)
+    assert not texts and time.perf_counter() - start < 10
+    plot_sensitivity_heatmap(sensitivity, tmp_path)
+    assert len(texts) == sensitivity["matrix"].size
+
+    # The threshold is part of the heatmap's render key
+    render_charts(results, sensitivity, tmp_path, "on")
+    monkeypatch.setattr(SETTINGS, "charts", replace(SETTINGS.charts, annotate_max_cells=0))
+    _, report = render_charts(results, sensitivity, tmp_path, "on")
+    assert [name for name, status in report.status.items() if status == "rendered"] == ["sensitivity_heatmap"]
+
+def test_thread_backend_rejected(inputs, tmp_path, monkeypatch):
+    results, sensitivity = inputs
+    monkeypatch.setattr(SETTINGS.charts, "backend", "thread")
+    with pytest.raises(ValueError, match="not thread-safe"):
+        render_charts(results, sensitivity, tmp_path)
+    with Executor("thread", 2) as executor, pytest.raises(ValueError, match="not thread-safe"):
+        render_charts(results, sensitivity, tmp_path, executor=executor)
+    render_charts(results, sensitivity, tmp_path, mode="defer")  # nothing is drawn yet
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic import make_panel
+from config import SETTINGS
+from src.io.loaders import load_data
+from src.finance.batch import run_batch
+from src.finance.metrics import calculate_historical_metrics
+from src.finance.results import ResultStore
+from src.finance.scenarios import run_scenarios
+from src.finance.sensitivity import calculate_sensitivity_grid
+from src.reporting.export import export_summary
+from src.reporting.plots import plot_all
+
+@pytest.fixture(scope="module")
+def results(data_dir):
+    return run_scenarios(calculate_historical_metrics(load_data(data_dir)), SETTINGS.net_debt)
+
+def test_views_match_results_and_feed_reporting(results, tmp_path):
+    store = ResultStore.from_results(results, "AMBV")
+    views = store.results("AMBV")
+    assert list(views) == list(results) and store.warnings[0] == ""
+    for name, res in results.items():
+        copy = views[name].to_result()
+        assert (copy.scenario_name, copy.enterprise_value, copy.wacc) == (res.scenario_name, res.enterprise_value, res.wacc)
+        pd.testing.assert_frame_equal(views[name].projections, res.projections, check_exact=True)
+        assert views[name].terminal_share_warning == res.terminal_share_warning
+    # Views are zero-copy and read-only
+    fcf = views["base"].projections["fcf"].to_numpy()
+    assert np.shares_memory(fcf, store.projections)
+    frame = views["base"].projections
+    with pytest.raises(ValueError, match="read-only"):
+        frame.loc[0, "fcf"] = 0.0
+
+    sensitivity = calculate_sensitivity_grid(results["base"].projections)
+    for out, source in [(tmp_path / "results", results), (tmp_path / "views", views)]:
+        out.mkdir()
+        export_summary(source, sensitivity, [], {}, out)
+        assert plot_all(source, sensitivity, out)["ev_composition"]
+    for name in ["summary.json", "projections.csv"]:
+        assert (tmp_path / "views" / name).read_bytes() == (tmp_path / "results" / name).read_bytes()
+
+def test_batch_store_matches_batch_outputs():
+    batch = run_batch(make_panel(40, 6, seed=2))
+    store = ResultStore.from_batch(batch)
+    assert len(store) == 40 * len(SETTINGS.scenarios)
+    assert store.projections.shape == (len(store), len(store.columns) - 1, SETTINGS.years_forecast)
+    pd.testing.assert_frame_equal(store.to_frame(), batch.to_frame(), check_exact=True)
+
+    company = batch.companies[7]
+    expected = batch.to_valuation_results(company)
+    for name, view in store.results(company).items():
+        pd.testing.assert_frame_equal(view.projections, expected[name].projections, check_dtype=False, check_exact=True)
+        assert view.company == company and view.equity_value == expected[name].equity_value
+    with pytest.raises(ValueError, match="Unknown company"):
+        store.results("missing")
+
+def test_save_load_memory_mapped_and_concat(results, tmp_path):
+    store = ResultStore.concat([ResultStore.from_results(results, "AMBV"), ResultStore.from_batch(run_batch(make_panel(5, 6)))])
+    assert store.companies[0] == "AMBV" and len(store) == 3 + 5 * 3
+    assert store[-1].company == store.companies[-1]
+
+    store.save(tmp_path / "store")
+    loaded = ResultStore.load(tmp_path / "store")
+    assert isinstance(loaded.projections, np.memmap)
+    assert np.shares_memory(loaded[4].projections["revenue"].to_numpy(), loaded.projections)
+    pd.testing.assert_frame_equal(loaded.to_frame(), store.to_frame(), check_exact=True)
+    for original, view in zip(store, loaded):
+        pd.testing.assert_frame_equal(view.projections, original.projections, check_exact=True)
+        assert view.scenario_name == original.scenario_name and view.terminal_share_warning == original.terminal_share_warning
@@ -0,0 +1,70 @@
+import json
+import shutil
+from pathlib import Path
+import pytest
+from src.pipeline.orchestrator import run_all
+from src.pipeline.runlog import RunLogger
+
+def _jsonl(path: Path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+def test_text_and_jsonl_sinks_keep_order(tmp_path, capsys):
+    with RunLogger(tmp_path / "log.txt", queue_size=4, batch_size=3) as log:
+        for i in range(50):
+            log.info(f"message {i}", index=i)
+        log.warning("careful", scenario="base")
+
+    lines = (tmp_path / "log.txt").read_text().splitlines()
+    assert lines[0].startswith("Run Log initialized at")
+    assert [line.split("] ", 1)[1] for line in lines[1:51]] == [f"message {i}" for i in range(50)]
+    assert lines[-1].endswith("[WARN] careful")
+
+    records = _jsonl(tmp_path / "log.jsonl")
+    assert [r["index"] for r in records[:50]] == list(range(50))  # bounded queue blocks, never drops
+    assert records[-1]["level"] == "WARNING" and records[-1]["scenario"] == "base"
+    assert "message 49" in capsys.readouterr().out
+
+def test_level_filter_and_flush(tmp_path):
+    log = RunLogger(tmp_path / "log.txt", level="WARNING", echo=False)
+    log.info("hidden")
+    log.error("shown", code=3)
+    log.flush()
+    (record,) = _jsonl(tmp_path / "log.jsonl")
+    assert (record["level"], record["message"], record["code"]) == ("ERROR", "shown", 3)
+    assert log.counts["ERROR"] == 1 and log.counts["INFO"] == 0
+    log.close()
+    log.close()  # idempotent
+    log.info("after close")  # ignored
+
+def test_error_path_is_flushed(tmp_path):
+    with pytest.raises(RuntimeError):
+        with RunLogger(tmp_path / "log.txt", echo=False) as log:
+            log.info("step")
+            raise RuntimeError("boom")
+
+    records = _jsonl(tmp_path / "log.jsonl")
+    assert [r["message"] for r in records] == ["step", "Pipeline aborted: RuntimeError: boom"]
+    assert records[-1]["exception"] == "RuntimeError"
+
+def test_failing_sink_is_reported(tmp_path, monkeypatch):
+    log = RunLogger(tmp_path / "log.txt", echo=False, queue_size=2, batch_size=1)
+    monkeypatch.setattr(log, "_write", lambda batch: 1 / 0)
+    for i in range(20):  # would block on the full queue if the writer had died
+        log.info(f"message {i}")
+    with pytest.raises(ZeroDivisionError):
+        log.flush()
+    log.info("ignored")
+    with pytest.raises(ZeroDivisionError):
+        log.close()
+    assert log.counts["INFO"] < 20
+
+def test_run_all_writes_structured_warnings(tmp_path, data_dir):
+    shutil.copytree(data_dir, tmp_path / "data")
+    run_all(tmp_path, charts="off")
+
+    records = _jsonl(tmp_path / "outputs" / "run_log.jsonl")
+    assert records[-1]["message"] == "Pipeline completed successfully."
+    warnings = [r for r in records if r["level"] == "WARNING"]
+    summary = json.loads((tmp_path / "outputs" / "summary.json").read_text())
+    assert len(warnings) == len(summary["consistency_warnings"])
+    assert all("scenario" in r and "check" in r for r in warnings)
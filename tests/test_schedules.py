@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from dataclasses import replace
+from config import SETTINGS, DriverSchedule
+from src.io.loaders import load_data, stack_panel
+from src.finance.batch import run_batch
+from src.finance.checks import check_projection_consistency
+from src.finance.greeks import calculate_greeks
+from src.finance.montecarlo import run_monte_carlo
+from src.finance.projections import project_arrays, project_financials, scenario_paths, schedule_path
+from src.finance.scenarios import run_scenarios
+from src.finance.sensitivity import calculate_sensitivity_cube
+from src.runtime.executor import Executor
+
+@pytest.fixture
+def faded(monkeypatch):
+    """Base scenario with growth fading linearly to terminal_g and a two-stage margin."""
+    base = replace(SETTINGS.scenarios["base"], schedules={
+        "revenue_growth": DriverSchedule("linear"),
+        "ebit_margin": DriverSchedule("stages", values=[0.30, 0.26], stage_years=[2]),
+    })
+    monkeypatch.setitem(SETTINGS.scenarios, "base", base)
+    return base
+
+def test_schedule_kinds():
+    assert schedule_path(DriverSchedule("vector", values=[0.1, 0.08]), 0.0, None, 4).tolist() == [0.1, 0.08, 0.08, 0.08]
+    assert schedule_path(DriverSchedule("stages", values=[0.1, 0.05, 0.03], stage_years=[2, 1]), 0.0, None, 5).tolist() == [0.1, 0.1, 0.05, 0.03, 0.03]
+    assert np.allclose(schedule_path(DriverSchedule("linear", fade_years=3), 0.09, 0.03, 5), [0.09, 0.06, 0.03, 0.03, 0.03])
+    assert np.allclose(schedule_path(DriverSchedule("exponential", half_life=1.0), 0.09, 0.03, 3), [0.09, 0.06, 0.045])
+    # Array starts give one path per start
+    assert schedule_path(DriverSchedule("linear"), np.array([0.05, 0.07]), 0.03, 10).shape == (2, 10)
+    with pytest.raises(ValueError, match="needs a target"):
+        schedule_path(DriverSchedule("linear"), 0.05, None, 5)
+    with pytest.raises(ValueError, match="Unknown schedule kind"):
+        schedule_path(DriverSchedule("cubic"), 0.05, 0.03, 5)
+
+def test_constant_schedule_matches_constant_driver():
+    base = SETTINGS.scenarios["base"]
+    args = (62000.0, base.revenue_growth, base.ebit_margin, base.capex_pct_rev, base.depreciation_pct_capex, base.nwc_pct_rev_change)
+    plain = project_arrays(*args, years=30)
+    scheduled = project_arrays(*args, years=30, schedules={"revenue_growth": np.full(30, base.revenue_growth), "ebit_margin": np.full(30, base.ebit_margin)})
+    for name, values in plain.as_dict().items():
+        assert np.array_equal(values, getattr(scheduled, name))
+
+def test_projection_follows_schedule(historical, faded):
+    projections = project_financials(historical, faded)
+    growth = projections["revenue"].pct_change().to_numpy()[1:]
+    expected = scenario_paths(faded)["revenue_growth"]
+    assert np.allclose(growth, expected[1:])
+    assert expected[0] == faded.revenue_growth and expected[-1] == faded.terminal_g
+    assert np.allclose(projections["ebit"] / projections["revenue"], [0.30, 0.30, 0.26, 0.26, 0.26])
+    # The fade removes the last-year growth warning
+    assert not any("higher than terminal growth" in w for w in check_projection_consistency(historical, projections, "base"))
+
+def test_all_paths_consume_schedules(historical, faded, data_dir):
+    single = run_scenarios(historical, SETTINGS.net_debt)
+    with Executor("thread", 2) as executor:
+        parallel = run_scenarios(historical, SETTINGS.net_debt, executor)
+    batch = run_batch(stack_panel({"AMBV": load_data(data_dir)})).to_valuation_results("AMBV")
+    for name in SETTINGS.scenarios:
+        assert np.isclose(parallel[name].enterprise_value, single[name].enterprise_value, rtol=1e-12)
+        assert np.isclose(batch[name].enterprise_value, single[name].enterprise_value, rtol=1e-12)
+
+    cube = calculate_sensitivity_cube(historical, faded, {"revenue_growth": [0.03, faded.revenue_growth, 0.07], "terminal_g": [faded.terminal_g]})
+    assert np.isclose(cube.ev[1, 0], single["base"].enterprise_value, rtol=1e-12)
+    assert cube.ev[0, 0] < cube.ev[1, 0] < cube.ev[2, 0]
+
+    fixed = run_monte_carlo(historical, SETTINGS.net_debt, n_draws=10, chunk_size=10, drivers={}, correlation={})
+    assert np.isclose(fixed.ev_mean, single["base"].enterprise_value, rtol=1e-12)
+
+    with pytest.raises(ValueError, match="constant drivers"):
+        calculate_greeks(historical)
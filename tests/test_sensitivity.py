@@ -0,0 +1,65 @@
+import pytest
+import pandas as pd
+import numpy as np
+from config import SETTINGS, ScenarioParams
+from src.finance.dcf import calculate_dcf
+from src.finance.projections import project_financials
+from src.finance.sensitivity import calculate_sensitivity_grid, calculate_sensitivity_cube
+from src.reporting.insights import sensitivity_1d_insights
+
+HISTORY = pd.DataFrame([{"year": 2023, "revenue": 62000.0}])
+
+def reference_ev(fcf, w, g):
+    """Cell-by-cell reference using the original loop formulas."""
+    periods = np.arange(1, len(fcf) + 1)
+    discount_factors = (1 + w) ** -periods
+    tv = fcf[-1] * (1 + g) / (w - g)
+    return np.sum(fcf * discount_factors) + tv * discount_factors[-1]
+
+def test_grid_matches_reference_and_masks_invalid(monkeypatch):
+    monkeypatch.setattr(SETTINGS.sensitivity, "wacc_values", [0.02, 0.05, 0.08, 0.11])
+    monkeypatch.setattr(SETTINGS.sensitivity, "terminal_g_values", [0.01, 0.03, 0.05])
+    fcf = np.array([100.0, 110.0, 120.0])
+    result = calculate_sensitivity_grid(pd.DataFrame({"fcf": fcf}))
+    matrix = result["matrix"]
+    
+    for w in matrix.index:
+        for g in matrix.columns:
+            if w <= g:
+                assert np.isnan(matrix.loc[w, g])
+            else:
+                assert matrix.loc[w, g] == reference_ev(fcf, w, g)
+    assert result["ev_max"] == np.nanmax(matrix.values)
+    assert [name for name, _ in result["driver_ranking"]] == ["wacc", "terminal_g"]
+    # Insights compare the valued cells only (wacc=2% is masked at g=3%)
+    wacc_insight, g_insight = sensitivity_1d_insights(result)
+    drop = 1 - matrix.loc[0.11, 0.03] / matrix.loc[0.05, 0.03]
+    assert wacc_insight == f"EV decreases by {drop:.1%} as WACC increases from 5.0% to 11.0%." and "nan" not in g_insight
+
+def test_cube_operational_axes_match_dcf():
+    base = SETTINGS.scenarios["base"]
+    axes = {"wacc": [0.09, 0.11], "terminal_g": [0.02, 0.03], "revenue_growth": [0.0, 0.05, 0.1], "ebit_margin": [0.25, 0.3]}
+    cube = calculate_sensitivity_cube(HISTORY, base, axes)
+    
+    assert cube.ev.shape == (2, 2, 3, 2)
+    index = (1, 0, 2, 1)
+    point = {name: axes[name][i] for name, i in zip(axes, index)}
+    params = ScenarioParams(**{**base.__dict__, **point})
+    expected = calculate_dcf(project_financials(HISTORY, params), params, 0, "point").enterprise_value
+    assert np.isclose(cube.ev[index], expected, rtol=1e-12)
+    
+    ranking = dict(cube.driver_ranking())
+    assert set(ranking) == set(axes)
+
+def test_cube_chunking_is_invariant(monkeypatch):
+    axes = {"wacc": np.linspace(0.05, 0.15, 37), "terminal_g": np.linspace(0.0, 0.06, 23), "tax_rate": [0.2, 0.34]}
+    full = calculate_sensitivity_cube(HISTORY, SETTINGS.scenarios["base"], axes)
+    monkeypatch.setattr(SETTINGS.sensitivity, "max_block_elements", 50)
+    chunked = calculate_sensitivity_cube(HISTORY, SETTINGS.scenarios["base"], axes)
+    
+    assert np.array_equal(full.ev, chunked.ev, equal_nan=True)
+    assert (~full.valid).any()
+
+def test_cube_rejects_unknown_axis():
+    with pytest.raises(ValueError, match="Unsupported sensitivity axes"):
+        calculate_sensitivity_cube(HISTORY, SETTINGS.scenarios["base"], {"beta": [1.0]})
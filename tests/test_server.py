@@ -0,0 +1,85 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+import numpy as np
+import pytest
+from pathlib import Path
+from config import SETTINGS
+from src.io.loaders import load_data
+from src.finance.cache import ResultCache
+from src.finance.metrics import calculate_historical_metrics
+from src.finance.scenarios import run_scenarios
+from src.pipeline.server import RequestBatcher, ValuationService, make_server
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+@pytest.fixture(scope="module")
+def service():
+    service = ValuationService(ROOT_DIR, window_ms=20, cache=ResultCache(disk_dir=None))
+    yield service
+    service.close()
+
+def test_batcher_coalesces_concurrent_items():
+    batches = []
+    batcher = RequestBatcher(lambda items: batches.append(list(items)) or [ValueError("odd") if x % 2 else x * 10 for x in items], window_s=0.2, max_batch=100)
+    futures = []
+    threads = [threading.Thread(target=lambda x=x: futures.append((x, batcher.submit(x)))) for x in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for x, future in futures:
+        if x % 2:
+            with pytest.raises(ValueError, match="odd"):
+                future.result(timeout=5)
+        else:
+            assert future.result(timeout=5) == x * 10
+    batcher.close()
+    assert len(batches) == 1 and sorted(batches[0]) == list(range(8))
+    assert batcher.stats() == {"batches": 1, "mean_batch": 8.0, "largest_batch": 8}
+
+def test_service_matches_pipeline_and_reports_latency(service):
+    results = run_scenarios(calculate_historical_metrics(load_data(ROOT_DIR / "data")), SETTINGS.net_debt)
+    answers = service.value_many([{"scenario": name} for name in SETTINGS.scenarios])
+    for answer, (name, res) in zip(answers, results.items()):
+        assert answer["scenario"] == name and answer["batch_size"] == len(SETTINGS.scenarios)
+        assert np.isclose(answer["enterprise_value"], res.enterprise_value, rtol=1e-12)
+
+    override = service.value({"scenario": "base", "overrides": {"wacc": 0.12}, "net_debt": 0.0})
+    assert override["wacc"] == 0.12 and override["equity_value"] == override["enterprise_value"]
+    assert service.value({"scenario": "base", "overrides": {"wacc": 0.12}, "net_debt": 0.0}) == override
+    assert service.cache.hits >= 1
+
+    with pytest.raises(ValueError, match="Unknown overrides"):
+        service.value({"overrides": {"beta": 1.0}})
+    with pytest.raises(ValueError, match="must be less than WACC"):
+        service.value({"overrides": {"wacc": 0.02}})
+    for bad in [{"overrides": {"wacc": float("nan")}}, {"overrides": {"wacc": "0.1"}}, {"net_debt": float("inf")}]:
+        with pytest.raises(ValueError, match="must be a finite number"):
+            service.parse(bad)
+    stats = service.stats()
+    assert stats["requests"] == 7 and stats["errors"] == 2
+    assert 0 < stats["p50_ms"] <= stats["p99_ms"] and stats["throughput_rps"] > 0
+
+def test_http_round_trip(service):
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    post = lambda body: urllib.request.urlopen(urllib.request.Request(url + "/value", json.dumps(body).encode(), {"Content-Type": "application/json"}))
+    try:
+        answer = json.load(post({"scenario": "upside", "overrides": {"terminal_g": 0.035}}))
+        assert answer["terminal_g"] == 0.035
+        many = json.load(post([{"scenario": "base"}, {"overrides": {"wacc": 0.01}}]))
+        assert "enterprise_value" in many[0] and "must be less than WACC" in many[1]["error"]
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post({"scenario": "unknown"})
+        assert error.value.code == 400
+        for bad in [{"overrides": {"wacc": None}}, {"net_debt": None}, {"overrides": ["wacc"]}, {"scenario": ["base"]}]:
+            with pytest.raises(urllib.error.HTTPError) as error:
+                post(bad)
+            assert error.value.code == 400 and "error" in json.load(error.value)
+        assert json.load(urllib.request.urlopen(url + "/stats"))["requests"] >= 3
+    finally:
+        server.shutdown()
+        server.server_close()
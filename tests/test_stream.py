@@ -0,0 +1,73 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from config import SETTINGS
+from src.finance.batch import iter_batch, run_batch
+from src.finance.metrics import calculate_historical_metrics
+from src.finance.scenarios import run_scenarios
+from src.io.loaders import load_data
+from src.pipeline.orchestrator import run_batch_all
+from src.reporting.stream import StreamWriter, batch_projection_frame, read_projections, read_summary
+from benchmarks.synthetic import make_panel
+
+def test_iter_batch_chunks_match_run_batch():
+    panel = make_panel(7, 6)
+    full = run_batch(panel)
+    chunks = list(iter_batch(panel, chunk_size=3))
+
+    assert [len(c.companies) for c in chunks] == [3, 3, 1]
+    for field in ("enterprise_value", "terminal_share_pct"):
+        assert np.array_equal(np.concatenate([c.valuation[field] for c in chunks]), full.valuation[field])
+    assert np.array_equal(np.concatenate([c.projections["fcf"] for c in chunks]), full.projections["fcf"])
+    with pytest.raises(ValueError):
+        next(iter_batch(panel, chunk_size=0))
+
+@pytest.mark.parametrize("fmt", ["csv", "bin", "arrow", "parquet"])
+def test_streamed_files_round_trip(tmp_path, fmt):
+    if fmt in ("arrow", "parquet"):
+        pytest.importorskip("pyarrow")
+    panel = make_panel(5, 6)
+    with StreamWriter(tmp_path, fmt) as writer:
+        for chunk in iter_batch(panel, chunk_size=2):
+            writer.write_batch(chunk)
+
+    full = run_batch(panel)
+    assert writer.stats.chunks == 3 and writer.stats.companies == 5
+    projections = read_projections(writer.projections_path)
+    pd.testing.assert_frame_equal(projections, batch_projection_frame(full), check_dtype=False)
+
+    summary = read_summary(writer.summary_path)
+    expected = full.to_frame()
+    assert list(summary["company"]) == list(expected["company"])
+    assert np.allclose(summary["enterprise_value"], expected["enterprise_value"], rtol=1e-12)
+
+def test_bin_is_compact(tmp_path):
+    panel = make_panel(20, 6)
+    sizes = {}
+    for fmt in ("csv", "bin"):
+        with StreamWriter(tmp_path / fmt, fmt) as writer:
+            writer.write_batch(run_batch(panel))
+        sizes[fmt] = writer.projections_path.stat().st_size
+    assert sizes["bin"] == 64 * writer.stats.projection_rows
+    assert sizes["bin"] < sizes["csv"] / 2
+
+def test_write_results_single_company(tmp_path, data_dir):
+    results = run_scenarios(calculate_historical_metrics(load_data(data_dir)), SETTINGS.net_debt)
+    with StreamWriter(tmp_path, "csv") as writer:
+        writer.write_results("AMBV", results)
+
+    lines = writer.summary_path.read_text().splitlines()
+    assert [json.loads(line)["scenario"] for line in lines] == list(results)
+    projections = read_projections(writer.projections_path)
+    assert np.allclose(projections.loc[projections["scenario"] == "base", "fcf"], results["base"].projections["fcf"])
+
+def test_run_batch_all_streaming(tmp_path, monkeypatch):
+    monkeypatch.setattr(SETTINGS.export, "streaming", True)
+    monkeypatch.setattr(SETTINGS.export, "chunk_companies", 4)
+    monkeypatch.setattr(SETTINGS.logging, "echo", False)
+    stats = run_batch_all(tmp_path, make_panel(10, 6))
+
+    assert stats.chunks == 3 and stats.summary_rows == 10 * len(SETTINGS.scenarios)
+    assert len(read_summary(tmp_path / "outputs" / "batch_summary.ndjson")) == stats.summary_rows
+    assert not (tmp_path / "outputs" / "batch_results.csv").exists()
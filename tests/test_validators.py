@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.io.loaders import load_data, stack_panel
+from src.io.validators import validate_data, validate_panel, quarantine
+from src.pipeline.orchestrator import run_batch_all
+
+def make_panel(data_dir):
+    """Four copies of the Ambev data; three are corrupted in different ways."""
+    data = load_data(data_dir)
+    companies = {name: {key: df.copy() for key, df in data.items()} for name in ["OK", "NAN", "DUP", "MISSING"]}
+    companies["NAN"]["balance_sheet"].loc[[1, 3], "cash"] = np.nan
+    companies["NAN"]["cash_flow"].loc[0, "capex"] = np.nan
+    companies["DUP"]["income_statement"].loc[2, "year"] = companies["DUP"]["income_statement"].loc[1, "year"]
+    companies["DUP"]["balance_sheet"] = companies["DUP"]["balance_sheet"].iloc[::-1]
+    companies["MISSING"]["cash_flow"] = companies["MISSING"]["cash_flow"].drop(columns="cfo")
+    return companies, stack_panel(companies)
+
+def test_report_collects_every_violation(data_dir):
+    _, panel = make_panel(data_dir)
+    report = validate_panel(panel)
+    
+    assert report.companies == ["OK", "NAN", "DUP", "MISSING"]
+    assert report.bad_companies == ["NAN", "DUP", "MISSING"]
+    found = {(v.company, v.statement, v.column, v.rule) for v in report.violations}
+    assert found == {
+        ("NAN", "balance_sheet", "cash", "nan_values"),
+        ("NAN", "cash_flow", "capex", "nan_values"),
+        ("DUP", "income_statement", "year", "duplicate_year"),
+        ("DUP", "balance_sheet", "year", "unsorted_years"),
+        ("MISSING", "cash_flow", "cfo", "missing_column"),
+    }
+    nan_cash = next(v for v in report.violations if v.column == "cash")
+    assert panel["balance_sheet"].loc[nan_cash.rows, "company"].eq("NAN").all()
+    assert len(nan_cash.rows) == 2
+
+def test_panel_verdict_matches_single_company_validation(data_dir):
+    companies, panel = make_panel(data_dir)
+    report = validate_panel(panel)
+    for name, data in companies.items():
+        try:
+            validate_data(data)
+            valid = True
+        except ValueError:
+            valid = False
+        assert valid == (name in report.valid_companies)
+
+def test_quarantine_and_batch_proceeds(tmp_path, data_dir):
+    _, panel = make_panel(data_dir)
+    clean, quarantined = quarantine(panel, validate_panel(panel))
+    assert clean["income_statement"]["company"].unique().tolist() == ["OK"]
+    assert validate_panel(clean).ok
+    assert set(quarantined["cash_flow"]["company"]) == {"NAN", "DUP", "MISSING"}
+    
+    batch = run_batch_all(tmp_path, panel)
+    assert batch.companies == ["OK"]
+    report = pd.read_csv(tmp_path / "outputs" / "validation_report.csv")
+    assert set(report["company"]) == {"NAN", "DUP", "MISSING"}